@@ -53,14 +53,19 @@ def has_use_zbuffer_attribute():
     except AttributeError:
         return False
 
+# 清除相机关键帧时删除的相机对象通道和相机数据通道
+CAMERA_OBJECT_CHANNELS = {"location", "rotation_euler", "scale"}
+CAMERA_DATA_CHANNELS = {"lens", "ortho_scale", "clip_start", "clip_end", "sensor_width", "sensor_height"}
+
 class AutoRenderer():
     def __init__(self, collections: list, camera_name="Camera", 
                     output_path="./", output_name="", output_format="PNG",
                                          naming_mode='AUTO', focus_each_object=False,
                      focus_only_faces=False, auto_keyframe=False, 
-                     report_callback=None) -> None:
+                     render_as_animation=False, report_callback=None) -> None:
         """
         集合：字符串列表，每个字符串都是一个集合的名称
+        render_as_animation: 将所有分组作为一个动画任务的各帧渲染，而不是逐个渲染静帧
         report_callback: 可选的回调函数，用于向Blender信息窗口报告信息
         """
         # 显示Blender版本兼容性信息 - 全局缓存版本，只检查一次
@@ -87,6 +92,7 @@ class AutoRenderer():
         self.focus_each_object = focus_each_object
         self.focus_only_faces = focus_only_faces
         self.auto_keyframe = auto_keyframe
+        self.render_as_animation = render_as_animation
         self.report_callback = report_callback
         
         # 包围盒缓存，避免重复计算
@@ -99,6 +105,9 @@ class AutoRenderer():
         self.is_rendering = False
         self.intended_collection = None
         
+        # 渲染设置会话，整次运行共享（可重入）
+        self.render_session = RenderSettingsSession(self)
+        
     def generate_filename(self, top_parent_name, object_name):
         """根据命名模式生成文件名"""
         if self.naming_mode == 'AUTO':
@@ -739,22 +748,16 @@ class AutoRenderer():
                 print(f"相机旋转: {camera.rotation_euler}")
                 AutoRenderer._keyframe_added_checked = True
             
-            # 为相机位置添加关键帧
-            camera.keyframe_insert(data_path="location", frame=current_frame)
-            print(f"✓ 位置关键帧添加成功")
-            
-            # 为相机旋转添加关键帧
-            camera.keyframe_insert(data_path="rotation_euler", frame=current_frame)
-            print(f"✓ 旋转关键帧添加成功")
-            
-            # 根据相机类型添加不同的关键帧
+            # 当前帧的取景已由聚焦流程计算好，只在当前帧插入关键帧，不重写其他帧
             if camera_data.type == 'ORTHO':
-                # 正交相机：添加正交缩放关键帧
-                camera_data.keyframe_insert(data_path="ortho_scale", frame=current_frame)
-                print(f"✓ 正交缩放关键帧添加成功: {camera_data.ortho_scale:.2f}")
+                # 正交相机：同时写入正交缩放
+                ortho_scale = camera_data.ortho_scale
             else:
                 # 透视相机：不添加焦距关键帧，保持焦距不变
+                ortho_scale = None
                 print(f"ℹ 透视相机：保持焦距 {camera_data.lens:.2f}mm 不变，不生成焦距关键帧")
+            self.write_camera_keyframe(current_frame, tuple(camera.location),
+                                       tuple(camera.rotation_euler), ortho_scale)
             
             # 验证关键帧是否添加成功
             if camera.animation_data and camera.animation_data.action:
@@ -800,49 +803,9 @@ class AutoRenderer():
             print(f"  - 焦距: {original_lens}")
             print(f"  - 正交缩放: {original_ortho_scale}")
             
-            # 清除相机对象的关键帧
-            if camera.animation_data and camera.animation_data.action:
-                print(f"ℹ 清除相机对象关键帧...")
-                for fcurve in camera.animation_data.action.fcurves:
-                    if fcurve.data_path == "location":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除位置关键帧")
-                    elif fcurve.data_path == "rotation_euler":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除旋转关键帧")
-                    elif fcurve.data_path == "scale":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除缩放关键帧")
-            
-            # 清除相机数据的关键帧
-            if camera.data and camera.data.animation_data and camera.data.animation_data.action:
-                print(f"ℹ 清除相机数据关键帧...")
-                for fcurve in camera.data.animation_data.action.fcurves:
-                    if fcurve.data_path == "lens":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除焦距关键帧")
-                    elif fcurve.data_path == "ortho_scale":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除正交缩放关键帧")
-                    elif fcurve.data_path == "clip_start":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除近裁剪面关键帧")
-                    elif fcurve.data_path == "clip_end":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除远裁剪面关键帧")
-                    elif fcurve.data_path == "sensor_width":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除传感器宽度关键帧")
-                    elif fcurve.data_path == "sensor_height":
-                        fcurve.keyframe_points.clear()
-                        print(f"  ✓ 清除传感器高度关键帧")
-            
-            # 统计清除的关键帧数量
-            total_cleared = 0
-            if camera.animation_data and camera.animation_data.action:
-                total_cleared += len(camera.animation_data.action.fcurves)
-            if camera.data and camera.data.animation_data and camera.data.animation_data.action:
-                total_cleared += len(camera.data.animation_data.action.fcurves)
+            # 按通道一次删除相机对象和相机数据的F曲线
+            total_cleared = self._remove_fcurve_channels(camera, CAMERA_OBJECT_CHANNELS)
+            total_cleared += self._remove_fcurve_channels(camera_data, CAMERA_DATA_CHANNELS)
             
             # 恢复相机位置和参数，确保清除关键帧后相机仍然在正确位置
             print(f"ℹ 恢复相机原始参数...")
@@ -859,7 +822,7 @@ class AutoRenderer():
             if hasattr(camera_data, 'clip_end'):
                 camera_data.clip_end = original_clip_end
             
-            print(f"✓ 已清除相机 '{camera.name}' 的所有关键帧 (共 {total_cleared} 个曲线)")
+            print(f"✓ 已清除相机 '{camera.name}' 的所有关键帧 (共 {total_cleared} 个关键帧)")
             print(f"✓ 相机位置和参数已恢复，确保渲染正常")
             return True
             
@@ -869,6 +832,194 @@ class AutoRenderer():
             traceback.print_exc()
             return False
 
+    def compute_camera_framing(self, object_groups):
+        """
+        批量计算每个物体组的相机取景数据，不修改场景也不调用视图操作符。
+        与 camera_to_view_selected 相同，保持相机朝向，只计算位置和正交缩放。
+        返回 (位置列表, 旋转列表, 正交缩放列表)，透视相机的正交缩放列表为 None。
+        """
+        camera = self.cam
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        is_orthographic = camera.data.type == 'ORTHO'
+        rotation = tuple(camera.rotation_euler)
+        
+        locations = []
+        rotations = []
+        ortho_scales = [] if is_orthographic else None
+        for objects in object_groups:
+            # 收集组内所有物体的世界空间包围盒角点
+            coords = []
+            for obj in objects:
+                matrix = obj.matrix_world
+                for corner in obj.bound_box:
+                    coords.extend(matrix @ mathutils.Vector(corner))
+            
+            if coords:
+                location, scale = camera.camera_fit_coords(depsgraph, coords)
+            else:
+                location, scale = camera.location, camera.data.ortho_scale
+            
+            locations.append(tuple(location))
+            rotations.append(rotation)
+            if is_orthographic:
+                ortho_scales.append(scale)
+        
+        return locations, rotations, ortho_scales
+
+    def _ensure_action(self, id_data):
+        """返回数据块的动作，没有动画数据或动作时创建"""
+        if not id_data.animation_data:
+            id_data.animation_data_create()
+        if not id_data.animation_data.action:
+            id_data.animation_data.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+        return id_data.animation_data.action
+
+    def _find_or_new_fcurve(self, action, data_path, index, group_name=None):
+        fcurve = action.fcurves.find(data_path, index=index)
+        if fcurve is None:
+            if group_name:
+                fcurve = action.fcurves.new(data_path=data_path, index=index, action_group=group_name)
+            else:
+                fcurve = action.fcurves.new(data_path=data_path, index=index)
+        return fcurve
+
+    def _write_fcurve_keys(self, action, data_path, index, frames, values, group_name=None, replace=False):
+        """
+        用一次 foreach_set 写入整条F曲线的关键帧。
+        默认合并到已有关键帧：其他帧的关键帧保留原有的插值和手柄，只有写入的帧被替换并设为常量插值；
+        replace 为真时先丢弃该通道的全部关键帧（调用方需自行备份）。
+        """
+        fcurve = self._find_or_new_fcurve(action, data_path, index, group_name)
+        keyframe_points = fcurve.keyframe_points
+        written = dict(zip(frames, values))
+        
+        existing = None if replace else self._backup_fcurve_keys(fcurve)
+        keys = []
+        if existing:
+            co = existing["co"]
+            handle_left = existing["handle_left"]
+            handle_right = existing["handle_right"]
+            for i in range(len(existing["interpolation"])):
+                frame = co[2 * i]
+                if frame in written:
+                    continue
+                keys.append((frame, co[2 * i + 1], handle_left[2 * i:2 * i + 2], handle_right[2 * i:2 * i + 2],
+                             existing["interpolation"][i], existing["handle_left_type"][i],
+                             existing["handle_right_type"][i]))
+        # 每一帧是独立的取景，写入的关键帧使用常量插值避免帧间过渡
+        # （枚举存储值：CONSTANT 为 0，AUTO_CLAMPED 手柄为 4）
+        for frame, value in written.items():
+            keys.append((frame, value, (frame, value), (frame, value), 0, 4, 4))
+        keys.sort(key=lambda key: key[0])
+        
+        keyframe_points.clear()
+        keyframe_points.add(len(keys))
+        keyframe_points.foreach_set("co", [c for key in keys for c in key[:2]])
+        keyframe_points.foreach_set("handle_left", [c for key in keys for c in key[2]])
+        keyframe_points.foreach_set("handle_right", [c for key in keys for c in key[3]])
+        keyframe_points.foreach_set("interpolation", [key[4] for key in keys])
+        keyframe_points.foreach_set("handle_left_type", [key[5] for key in keys])
+        keyframe_points.foreach_set("handle_right_type", [key[6] for key in keys])
+        fcurve.update()
+        return fcurve
+
+    def _insert_fcurve_key(self, action, data_path, index, frame, value, group_name=None):
+        """在单帧插入或替换一个常量插值关键帧，不读写该通道的其他关键帧"""
+        fcurve = self._find_or_new_fcurve(action, data_path, index, group_name)
+        keyframe = fcurve.keyframe_points.insert(frame, value, options={'FAST'})
+        keyframe.interpolation = 'CONSTANT'
+        return fcurve
+
+    def write_camera_keyframe(self, frame, location, rotation, ortho_scale=None):
+        """为相机在单帧写入位置、旋转和正交缩放关键帧，已有关键帧保持不变"""
+        camera = self.cam
+        action = self._ensure_action(camera)
+        for index in range(3):
+            self._insert_fcurve_key(action, "location", index, frame, location[index], "Object Transforms")
+            self._insert_fcurve_key(action, "rotation_euler", index, frame, rotation[index], "Object Transforms")
+        if ortho_scale is not None:
+            self._insert_fcurve_key(self._ensure_action(camera.data), "ortho_scale", 0, frame, ortho_scale)
+
+    def write_camera_keyframes_batch(self, frames, locations, rotations, ortho_scales=None):
+        """将预先计算好的相机位置、旋转和正交缩放按通道批量合并到动作的F曲线"""
+        camera = self.cam
+        action = self._ensure_action(camera)
+        
+        for index in range(3):
+            self._write_fcurve_keys(action, "location", index, frames,
+                                    [location[index] for location in locations], "Object Transforms")
+            self._write_fcurve_keys(action, "rotation_euler", index, frames,
+                                    [rotation[index] for rotation in rotations], "Object Transforms")
+        
+        if ortho_scales is not None:
+            self._write_fcurve_keys(self._ensure_action(camera.data), "ortho_scale", 0, frames, ortho_scales)
+        
+        print(f"✓ 已批量写入 {len(frames)} 帧相机关键帧")
+    
+    def _remove_fcurve_channels(self, id_data, data_paths):
+        """一次删除数据块动作中指定通道的F曲线，返回删除的关键帧数量"""
+        animation_data = id_data.animation_data if id_data else None
+        if not animation_data or not animation_data.action:
+            return 0
+        fcurves = animation_data.action.fcurves
+        matched = [fcurve for fcurve in fcurves if fcurve.data_path in data_paths]
+        removed_count = sum(len(fcurve.keyframe_points) for fcurve in matched)
+        for fcurve in matched:
+            fcurves.remove(fcurve)
+        return removed_count
+
+    def collect_focus_groups(self, collection_name: str):
+        """
+        收集集合中按顶级父物体分组的聚焦物体列表。
+        返回 [(顶级父物体名称, 分组物体, 聚焦物体), ...]，跳过没有可见物体的分组。
+        """
+        collection = bpy.data.collections[collection_name]
+        
+        # 获取集合中的所有对象，包括嵌套集合中的对象
+        all_objects = []
+        def get_nested_objects(collection):
+            all_objects.extend(collection.objects)
+            for child_collection in collection.children:
+                get_nested_objects(child_collection)
+        get_nested_objects(collection)
+        
+        focus_groups = []
+        for top_parent_name, objects in self.group_objects_by_top_parent(all_objects).items():
+            visible_objects = [obj for obj in objects if obj.hide_render == False]
+            if not visible_objects:
+                print(f"分组 '{top_parent_name}' 中没有可见的物体，跳过")
+                continue
+            
+            focus_objects = visible_objects
+            if self.focus_only_faces:
+                focus_objects = [obj for obj in visible_objects if self.has_faces(obj)]
+                if not focus_objects:
+                    print(f"警告: 分组 '{top_parent_name}' 没有找到有面的物体用于聚焦，跳过")
+                    continue
+            
+            focus_groups.append((top_parent_name, objects, focus_objects))
+        
+        return focus_groups
+
+    def generate_keyframes_batch(self, collection_name: str, start_frame=1):
+        """
+        批量生成相机关键帧：先计算所有分组的取景数据，再按通道一次性写入F曲线。
+        返回 [(帧号, 顶级父物体名称, 分组物体), ...]，供动画渲染等后续流程使用。
+        """
+        start_time = time.time()
+        focus_groups = self.collect_focus_groups(collection_name)
+        if not focus_groups:
+            return []
+        
+        frames = list(range(start_frame, start_frame + len(focus_groups)))
+        locations, rotations, ortho_scales = self.compute_camera_framing(
+            [focus_objects for _, _, focus_objects in focus_groups])
+        self.write_camera_keyframes_batch(frames, locations, rotations, ortho_scales)
+        
+        print(f"✓ 批量关键帧生成完成，共 {len(frames)} 帧，耗时: {time.time() - start_time:.3f}秒")
+        return [(frame, top_parent_name, objects)
+                for frame, (top_parent_name, objects, _) in zip(frames, focus_groups)]
+
     def report_info(self, info_type, message):
         """向控制台和Blender信息窗口报告信息"""
         print(message)
@@ -1018,7 +1169,23 @@ class AutoRenderer():
             self.report_info({'WARNING'}, warning_msg)
             return
 
-        # 渲染每个分组的物体
+        # 整次运行只保存/验证/配置一次渲染设置，结束时统一恢复
+        with self.render_session as session:
+            self._render_groups(groups, session)
+        
+        complete_msg = f"完成渲染集合: {collection_name}"
+        print(f"--- {complete_msg} ---\n")
+        self.report_info({'INFO'}, complete_msg)
+        
+        # 恢复相机标记（如果之前被临时清除）
+        if original_camera_markers:
+            self.restore_camera_markers(original_camera_markers)
+        
+        # 重置渲染状态标志
+        self.is_rendering = False
+
+    def _render_groups(self, groups, session):
+        """在渲染设置会话中逐个渲染分组，每个分组只做可见性切换、相机聚焦和渲染调用"""
         total_groups = len(groups)
         current_group = 0
         for top_parent_name, objects in groups.items():
@@ -1102,145 +1269,15 @@ class AutoRenderer():
                 # 根据输出格式确定文件扩展名和路径
                 file_extension = self.output_format.lower()
                 filepath = os.path.join(self.output_path, "{}.{}".format(filename, file_extension))
-                
-                print(f"命名模式: {self.naming_mode}")
-                print(f"顶级父级名称: {top_parent_name}")
-                print(f"物体名称: {objects[0].name}")
-                print(f"生成的文件名: {filename}")
-                print(f"输出格式: {self.output_format}")
                 print(f"输出路径: {filepath}")
-                print(f"准备保存渲染结果到: {filepath}")
-
-                # 设置渲染输出路径
-                bpy.context.scene.render.filepath = filepath
-                
-                # 使用 Blender 的默认渲染尺寸，不进行任何修改
-                print(f"🔧 使用 Blender 默认渲染尺寸: {bpy.context.scene.render.resolution_x} x {bpy.context.scene.render.resolution_y}")
-                
-                # 根据输出格式设置渲染格式
-                if self.output_format == 'PNG':
-                    print("ℹ 检测到PNG格式，应用PNG设置...")
-                    # 设置PNG格式的渲染设置
-                    bpy.context.scene.render.image_settings.file_format = 'PNG'
-                    # 检查是否有use_zbuffer属性（Blender 4.3+移除了此属性）
-                    if has_use_zbuffer_attribute():
-                        bpy.context.scene.render.image_settings.use_zbuffer = True  # 启用Z缓冲
-                    else:
-                        print("ℹ Blender 4.3+: use_zbuffer属性已移除，跳过Z缓冲设置")
-                    bpy.context.scene.render.image_settings.use_preview = False  # 禁用预览
-                    print("✓ PNG格式设置完成")
-                    
-                elif self.output_format == 'TARGA':
-                    print("ℹ 检测到TGA格式，应用TGA设置...")
-                    # 设置TGA格式的渲染设置
-                    bpy.context.scene.render.image_settings.file_format = 'TARGA'
-                    bpy.context.scene.render.image_settings.use_preview = False  # 禁用预览
-                    # TGA格式强制启用透明背景以支持Alpha通道
-                    bpy.context.scene.render.film_transparent = True
-                    print("✓ TGA格式设置完成，已启用透明背景")
-                
-                # 确保渲染设置一致性
-                original_render_settings = self.ensure_render_settings_consistency()
-                
-                # 检查合成器状态
-                compositor_status = self.check_compositor_status()
-                print(f"合成器状态检查结果:")
-                print(f"  - 启用节点: {compositor_status['use_nodes']}")
-                print(f"  - 节点树存在: {compositor_status['node_tree_exists']}")
-                print(f"  - 节点树类型: {compositor_status['node_tree_type']}")
-                print(f"  - 渲染合成器: {compositor_status['use_compositing']}")
-                print(f"  - 合成器节点数量: {compositor_status['total_nodes']}")
-                print(f"  - 合成器节点: {compositor_status['compositor_nodes']}")
-                
-                # 验证合成器设置
-                # 显示详细的合成器调试信息
-                self.debug_compositor_nodes()
                 
-                is_valid, validation_message = self.validate_compositor_setup()
-                print(f"合成器验证结果: {'✓' if is_valid else '⚠'} {validation_message}")
-                
-                # 始终使用合成器渲染
-                if (compositor_status['use_nodes'] and 
-                    compositor_status['node_tree_exists'] and
-                    compositor_status['node_tree_type'] == 'COMPOSITING' and
-                    compositor_status['total_nodes'] > 0 and
-                    is_valid):
-                    
-                    print("✓ 检测到有效的合成器节点树，使用合成器渲染以包含辉光等效果")
-                    
-                    # 确保合成器设置正确
-                    bpy.context.scene.render.use_compositing = True
-                    bpy.context.scene.render.use_sequencer = False
-                    
-                    # 在渲染前再次确保使用指定的相机（防止相机标记影响）
-                    bpy.context.scene.camera = self.cam
-                    
-                    # 使用合成器渲染，包含所有节点效果
-                    # 注意：write_still=True 会自动保存到指定路径，不需要再次保存
-                    bpy.ops.render.render(write_still=True, use_viewport=False)
-                    print("✓ 合成器渲染完成，包含辉光等效果")
-                    
-                    # 验证渲染结果
-                    if os.path.exists(filepath):
-                        print(f"✓ 渲染文件已保存: {filepath}")
-                        # 检查文件大小，确保不是空文件
-                        file_size = os.path.getsize(filepath)
-                        print(f"  - 文件大小: {file_size} 字节")
-                        if file_size < 1000:
-                            print("⚠ 警告: 文件大小过小，可能渲染失败")
-                    else:
-                        print("⚠ 警告: 渲染文件未找到")
-                        
-                else:
-                    print("⚠ 未检测到有效的合成器节点树，尝试强制启用...")
-                    
-                    # 尝试强制启用合成器
-                    try:
-                        self.force_enable_compositor()
-                        
-                        # 重新验证
-                        is_valid, validation_message = self.validate_compositor_setup()
-                        print(f"强制启用后验证结果: {'✓' if is_valid else '⚠'} {validation_message}")
-                        
-                        if is_valid:
-                            print("✓ 强制启用成功，使用合成器渲染")
-                            # 在渲染前再次确保使用指定的相机（防止相机标记影响）
-                            bpy.context.scene.camera = self.cam
-                            bpy.ops.render.render(write_still=True, use_viewport=False)
-                            print("✓ 合成器渲染完成，包含辉光等效果")
-                            
-                            # 验证渲染结果
-                            if os.path.exists(filepath):
-                                print(f"✓ 渲染文件已保存: {filepath}")
-                                file_size = os.path.getsize(filepath)
-                                print(f"  - 文件大小: {file_size} 字节")
-                                if file_size < 1000:
-                                    print("⚠ 警告: 文件大小过小，可能渲染失败")
-                            else:
-                                print("⚠ 警告: 渲染文件未找到")
-                        else:
-                            print("⚠ 强制启用失败，回退到标准渲染")
-                            bpy.context.scene.render.use_compositing = False
-                            bpy.ops.render.render(write_still=True)
-                            print("✓ 标准渲染完成")
-                            
-                    except Exception as e:
-                        print(f"⚠ 强制启用合成器时出错: {str(e)}")
-                        print("回退到标准渲染")
-                        bpy.context.scene.render.use_compositing = False
-                        # 在渲染前再次确保使用指定的相机（防止相机标记影响）
-                        bpy.context.scene.camera = self.cam
-                        bpy.ops.render.render(write_still=True)
-                        print("✓ 标准渲染完成")
+                # 渲染设置和合成器已在会话开始时统一配置，这里只需设置路径并渲染
+                session.render_still(filepath)
                 
-                print("渲染操作完成")
                 save_msg = f"已保存: {filepath}"
                 print(save_msg)
                 self.report_info({'INFO'}, save_msg)
                 
-                # 恢复原始渲染设置
-                self.restore_render_settings(original_render_settings)
-                
             except Exception as e:
                 error_msg = f"渲染分组 '{top_parent_name}' 失败: {str(e)}"
                 print(error_msg)
@@ -1262,17 +1299,186 @@ class AutoRenderer():
                 other_obj.hide_render = visibility
             
             print(f"完成渲染分组: {top_parent_name}")
+
+    def render_collection_as_animation(self, collection_name: str):
+        """
+        单次动画渲染：每个分组占一帧，写入相机和可见性关键帧后把整个集合作为一个动画任务渲染，
+        渲染结束后按帧-分组清单把各帧输出重命名为分组的文件名。
+        """
+        print(f"\n--- 开始以动画方式渲染集合: {collection_name} ---")
+        
+        try:
+            self.intended_collection = bpy.data.collections[collection_name]
+        except KeyError:
+            error_msg = f"找不到集合 '{collection_name}'"
+            print(f"错误: {error_msg}")
+            self.report_info({'ERROR'}, error_msg)
+            raise KeyError(error_msg)
+        
+        scene = bpy.context.scene
+        camera = self.cam
+        self.is_rendering = True
+        
+        # 检查并处理相机标记
+        original_camera_markers = self.check_and_handle_camera_markers()
+        scene.camera = camera
+        
+        # 保存相机和场景状态，渲染结束后恢复
+        original_camera_state = (camera.location.copy(), camera.rotation_euler.copy(), camera.data.ortho_scale)
+        original_scene_settings = {
+            'frame_start': scene.frame_start,
+            'frame_end': scene.frame_end,
+            'frame_current': scene.frame_current,
+            'filepath': scene.render.filepath,
+            'use_persistent_data': scene.render.use_persistent_data,
+        }
+        
+        # 每个分组对应一帧：聚焦模式下批量写入相机关键帧
+        if self.focus_each_object:
+            frame_manifest = self.generate_keyframes_batch(collection_name, start_frame=1)
+        else:
+            frame_manifest = [(index + 1, top_parent_name, objects)
+                              for index, (top_parent_name, objects, _) in enumerate(self.collect_focus_groups(collection_name))]
+        
+        if not frame_manifest:
+            warning_msg = f"集合 '{collection_name}' 中没有可渲染的对象"
+            print(f"警告: {warning_msg}")
+            self.report_info({'WARNING'}, warning_msg)
+            if original_camera_markers:
+                self.restore_camera_markers(original_camera_markers)
+            self.is_rendering = False
+            return
+        
+        grouped_objects = {obj for _, _, objects in frame_manifest for obj in objects}
+        original_hide_render = {obj: obj.hide_render for obj in self.intended_collection.objects}
+        original_hide_render.update({obj: obj.hide_render for obj in grouped_objects})
+        
+        visibility_keys = []
+        try:
+            # 不属于任何分组的物体在整个动画中都不参与渲染
+            for obj in self.intended_collection.objects:
+                if obj not in grouped_objects:
+                    obj.hide_render = True
+            visibility_keys = self._key_group_visibility(frame_manifest)
+            
+            scene.frame_start = frame_manifest[0][0]
+            scene.frame_end = frame_manifest[-1][0]
+            scene.render.filepath = os.path.join(self.output_path, "__autorender_frame_")
+            # 帧间复用场景数据和已编译的着色器
+            scene.render.use_persistent_data = True
+            
+            self.report_info({'INFO'}, f"以单个动画任务渲染 {len(frame_manifest)} 个分组")
+            with self.render_session as session:
+                session.render_animation()
+            
+            self._rename_animation_frames(frame_manifest)
+        finally:
+            self._clear_group_visibility_keys(visibility_keys, original_hide_render)
+            
+            for key, value in original_scene_settings.items():
+                if key == 'filepath' or key == 'use_persistent_data':
+                    setattr(scene.render, key, value)
+                else:
+                    setattr(scene, key, value)
+            
+            if self.focus_each_object:
+                self.clear_all_camera_keyframes()
+                camera.location, camera.rotation_euler, camera.data.ortho_scale = original_camera_state
+            
+            if original_camera_markers:
+                self.restore_camera_markers(original_camera_markers)
+            self.is_rendering = False
         
         complete_msg = f"完成渲染集合: {collection_name}"
         print(f"--- {complete_msg} ---\n")
         self.report_info({'INFO'}, complete_msg)
+
+    def _key_group_visibility(self, frame_manifest):
+        """为分组物体写入渲染可见性关键帧，物体只在所属分组的帧可见"""
+        visible_frames = {}
+        for frame, _, objects in frame_manifest:
+            for obj in objects:
+                visible_frames.setdefault(obj, set()).add(frame)
+        
+        frame_start = frame_manifest[0][0]
+        visibility_keys = []
+        for obj, frames in visible_frames.items():
+            keys = {} if frame_start in frames else {frame_start: 1.0}
+            for frame in frames:
+                keys[frame] = 0.0
+                if frame + 1 not in frames:
+                    keys[frame + 1] = 1.0
+            key_frames = sorted(keys)
+            
+            created_action = False
+            if not obj.animation_data:
+                obj.animation_data_create()
+            if not obj.animation_data.action:
+                obj.animation_data.action = bpy.data.actions.new(name=f"{obj.name}Action")
+                created_action = True
+            action = obj.animation_data.action
+            
+            # 备份用户原有的可见性关键帧，渲染结束后恢复
+            backup = self._backup_fcurve_keys(action.fcurves.find("hide_render", index=0))
+            fcurve = self._write_fcurve_keys(action, "hide_render", 0, key_frames,
+                                             [keys[frame] for frame in key_frames], replace=True)
+            visibility_keys.append((obj, action, fcurve, created_action, backup))
+        
+        print(f"✓ 已为 {len(visibility_keys)} 个物体写入可见性关键帧")
+        return visibility_keys
+
+    def _backup_fcurve_keys(self, fcurve):
+        """读取F曲线的全部关键帧数据，没有F曲线或没有关键帧时返回None"""
+        if fcurve is None or not len(fcurve.keyframe_points):
+            return None
+        keyframe_points = fcurve.keyframe_points
+        backup = {}
+        for attribute in ("co", "handle_left", "handle_right"):
+            values = [0.0] * (len(keyframe_points) * 2)
+            keyframe_points.foreach_get(attribute, values)
+            backup[attribute] = values
+        for attribute in ("interpolation", "handle_left_type", "handle_right_type"):
+            values = [0] * len(keyframe_points)
+            keyframe_points.foreach_get(attribute, values)
+            backup[attribute] = values
+        return backup
+
+    def _restore_fcurve_keys(self, fcurve, backup):
+        """用备份的关键帧数据整体替换F曲线的关键帧"""
+        keyframe_points = fcurve.keyframe_points
+        keyframe_points.clear()
+        keyframe_points.add(len(backup["interpolation"]))
+        for attribute, values in backup.items():
+            keyframe_points.foreach_set(attribute, values)
+        fcurve.update()
+
+    def _clear_group_visibility_keys(self, visibility_keys, original_hide_render):
+        """移除动画渲染写入的可见性关键帧，恢复用户原有的关键帧和原始渲染可见性"""
+        for obj, action, fcurve, created_action, backup in visibility_keys:
+            if created_action:
+                obj.animation_data.action = None
+                bpy.data.actions.remove(action)
+            elif backup is not None:
+                self._restore_fcurve_keys(fcurve, backup)
+            else:
+                action.fcurves.remove(fcurve)
         
-        # 恢复相机标记（如果之前被临时清除）
-        if original_camera_markers:
-            self.restore_camera_markers(original_camera_markers)
-        
-        # 重置渲染状态标志
-        self.is_rendering = False
+        for obj, visibility in original_hide_render.items():
+            obj.hide_render = visibility
+
+    def _rename_animation_frames(self, frame_manifest):
+        """根据帧-分组清单把动画各帧的输出文件重命名为分组的文件名"""
+        scene = bpy.context.scene
+        for frame, top_parent_name, objects in frame_manifest:
+            frame_path = scene.render.frame_path(frame=frame)
+            if not os.path.exists(frame_path):
+                print(f"⚠ 警告: 第 {frame} 帧的渲染文件未找到: {frame_path}")
+                continue
+            
+            filename = self.generate_filename(top_parent_name, objects[0].name)
+            filepath = os.path.join(self.output_path, filename + os.path.splitext(frame_path)[1])
+            os.replace(frame_path, filepath)
+            self.report_info({'INFO'}, f"已保存: {filepath}")
 
     def generate_keyframes_only(self, collection_name: str):
         """仅生成关键帧，不进行渲染"""
@@ -1299,93 +1505,25 @@ class AutoRenderer():
         bpy.context.scene.camera = self.cam
         print(f"✅ 相机已激活: {bpy.context.scene.camera.name}")
         
-        # 对集合中的物体按顶级父物体分组
-        print("按顶级父物体分组中...")
-        
-        # 在Blender 4.3中，需要确保集合对象列表是最新的
-        # 强制刷新集合对象列表（仅在4.3+版本中可用）
-        if is_blender_4_3_or_later():
-            try:
-                self.intended_collection.objects.update()
-                print("ℹ 已刷新集合对象列表（Blender 4.3+）")
-            except AttributeError:
-                print("ℹ 集合对象列表刷新不可用，使用默认行为")
-        else:
-            print("ℹ 使用Blender 3.6兼容模式")
-        
-        # 获取集合中的所有对象，包括嵌套集合中的对象
-        all_objects = []
-        for obj in self.intended_collection.objects:
-            all_objects.append(obj)
-        
-        # 递归获取嵌套集合中的对象
-        def get_nested_objects(collection):
-            nested_objects = []
-            for obj in collection.objects:
-                nested_objects.append(obj)
-            for child_collection in collection.children:
-                nested_objects.extend(get_nested_objects(child_collection))
-            return nested_objects
-        
-        nested_objects = get_nested_objects(self.intended_collection)
-        all_objects.extend(nested_objects)
-        
-        print(f"集合 '{collection_name}' 包含 {len(all_objects)} 个对象（包括嵌套集合）")
+        # 先批量计算所有分组的取景，再按通道一次性写入相机F曲线
+        frame_manifest = self.generate_keyframes_batch(collection_name)
+        frame_count = len(frame_manifest)
         
-        groups = self.group_objects_by_top_parent(all_objects)
-        print(f"共找到 {len(groups)} 个顶级父物体分组")
-        
-        if not groups:
+        if not frame_manifest:
             warning_msg = f"集合 '{collection_name}' 中没有可渲染的对象"
             print(f"警告: {warning_msg}")
             self.report_info({'WARNING'}, warning_msg)
+            if original_camera_markers:
+                self.restore_camera_markers(original_camera_markers)
             return
         
-        # 为每个分组生成关键帧
-        frame_counter = 1
-        for top_parent_name, objects in groups.items():
-            print(f"\n处理分组: {top_parent_name}，包含 {len(objects)} 个对象")
-            
-            # 检查是否有可见的物体
-            visible_objects = [obj for obj in objects if obj.hide_render == False]
-            if not visible_objects:
-                print(f"分组 '{top_parent_name}' 中没有可见的物体，跳过")
-                continue
-            
-            # 确定要聚焦的物体列表
-            focus_objects = visible_objects
-            if self.focus_only_faces:
-                focus_objects = [obj for obj in visible_objects if self.has_faces(obj)]
-                if not focus_objects:
-                    print("警告: 没有找到有面的物体用于聚焦，跳过")
-                    continue
-            
-            print(f"为 {len(focus_objects)} 个物体生成关键帧")
-            
-            # 设置当前帧
-            bpy.context.scene.frame_current = frame_counter
-            print(f"设置当前帧为: {frame_counter}")
-            
-            # 在设置帧后再次确保使用指定的相机（防止相机标记在帧切换时生效）
-            bpy.context.scene.camera = self.cam
-            
-            # 聚焦到物体并生成关键帧
-            try:
-                self.focus_object(focus_objects)
-                print(f"✓ 已为分组 '{top_parent_name}' 生成关键帧")
-                frame_counter += 1
-            except Exception as e:
-                error_msg = f"为分组 '{top_parent_name}' 生成关键帧时出错: {str(e)}"
-                print(error_msg)
-                self.report_info({'WARNING'}, error_msg)
-        
-        complete_msg = f"完成为集合 '{collection_name}' 生成关键帧，共 {frame_counter - 1} 帧"
+        complete_msg = f"完成为集合 '{collection_name}' 生成关键帧，共 {frame_count} 帧"
         print(f"--- {complete_msg} ---\n")
         self.report_info({'INFO'}, complete_msg)
         
         # 设置场景的帧范围
         bpy.context.scene.frame_start = 1
-        bpy.context.scene.frame_end = frame_counter - 1
+        bpy.context.scene.frame_end = frame_count
         print(f"已设置场景帧范围: {bpy.context.scene.frame_start} - {bpy.context.scene.frame_end}")
         
         # 恢复相机标记（如果之前被临时清除）
@@ -1416,16 +1554,21 @@ class AutoRenderer():
             self.report_info({'WARNING'}, warning_msg)
             return
         
-        for collection_name in self.collections:
-            print(f"处理集合: {collection_name}")
-            try:
-                self.render_collection(collection_name)
-                print(f"集合 {collection_name} 渲染完成")
-            except Exception as e:
-                error_msg = f"渲染集合 {collection_name} 时出错: {str(e)}"
-                print(error_msg)
-                self.report_info({'ERROR'}, error_msg)
-                raise
+        # 所有集合共享同一个渲染设置会话，只验证和恢复一次
+        with self.render_session:
+            for collection_name in self.collections:
+                print(f"处理集合: {collection_name}")
+                try:
+                    if self.render_as_animation:
+                        self.render_collection_as_animation(collection_name)
+                    else:
+                        self.render_collection(collection_name)
+                    print(f"集合 {collection_name} 渲染完成")
+                except Exception as e:
+                    error_msg = f"渲染集合 {collection_name} 时出错: {str(e)}"
+                    print(error_msg)
+                    self.report_info({'ERROR'}, error_msg)
+                    raise
         
         complete_msg = "所有集合渲染完成"
         print(f"=== {complete_msg} ===\n")
@@ -1501,6 +1644,25 @@ class AutoRenderer():
         
         return related_objects
     
+    def apply_output_format_settings(self):
+        """根据输出格式设置渲染图像格式"""
+        image_settings = bpy.context.scene.render.image_settings
+        if self.output_format == 'PNG':
+            image_settings.file_format = 'PNG'
+            # 检查是否有use_zbuffer属性（Blender 4.3+移除了此属性）
+            if has_use_zbuffer_attribute():
+                image_settings.use_zbuffer = True  # 启用Z缓冲
+            else:
+                print("ℹ Blender 4.3+: use_zbuffer属性已移除，跳过Z缓冲设置")
+            image_settings.use_preview = False  # 禁用预览
+            print("✓ PNG格式设置完成")
+        elif self.output_format == 'TARGA':
+            image_settings.file_format = 'TARGA'
+            image_settings.use_preview = False  # 禁用预览
+            # TGA格式强制启用透明背景以支持Alpha通道
+            bpy.context.scene.render.film_transparent = True
+            print("✓ TGA格式设置完成，已启用透明背景")
+
     def check_compositor_status(self):
         """检查合成器状态，返回详细的合成器信息"""
         scene = bpy.context.scene
@@ -1771,6 +1933,123 @@ class AutoRenderer():
 
 
 
+class RenderSettingsSession():
+    """
+    渲染设置会话：整次渲染运行只保存、验证、配置一次渲染设置和合成器，结束时统一恢复。
+    可重入，嵌套使用时只有最外层负责配置和恢复。
+    """
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.depth = 0
+        self.original_settings = None
+        self.use_compositor = False
+
+    def __enter__(self):
+        if self.depth == 0:
+            self._setup()
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.depth -= 1
+        if self.depth == 0 and self.original_settings is not None:
+            # 恢复原始渲染设置
+            self.renderer.restore_render_settings(self.original_settings)
+            self.original_settings = None
+        return False
+
+    def _setup(self):
+        """保存原始设置，应用输出格式，并缓存合成器验证结果"""
+        renderer = self.renderer
+        print("ℹ 初始化渲染设置会话...")
+        
+        # 先保存原始设置，再应用输出格式，保证结束时能完整恢复
+        self.original_settings = renderer.ensure_render_settings_consistency()
+        renderer.apply_output_format_settings()
+        print(f"🔧 使用 Blender 默认渲染尺寸: {bpy.context.scene.render.resolution_x} x {bpy.context.scene.render.resolution_y}")
+        
+        self.use_compositor = self._prepare_compositor()
+        print(f"✓ 渲染设置会话就绪，{'使用合成器渲染' if self.use_compositor else '使用标准渲染'}")
+
+    def _prepare_compositor(self):
+        """检查并验证合成器，必要时强制启用一次，返回是否使用合成器渲染"""
+        renderer = self.renderer
+        scene = bpy.context.scene
+        
+        compositor_status = renderer.check_compositor_status()
+        print(f"合成器状态检查结果:")
+        print(f"  - 启用节点: {compositor_status['use_nodes']}")
+        print(f"  - 节点树存在: {compositor_status['node_tree_exists']}")
+        print(f"  - 节点树类型: {compositor_status['node_tree_type']}")
+        print(f"  - 渲染合成器: {compositor_status['use_compositing']}")
+        print(f"  - 合成器节点数量: {compositor_status['total_nodes']}")
+        print(f"  - 合成器节点: {compositor_status['compositor_nodes']}")
+        
+        # 显示详细的合成器调试信息
+        renderer.debug_compositor_nodes()
+        
+        is_valid, validation_message = renderer.validate_compositor_setup()
+        print(f"合成器验证结果: {'✓' if is_valid else '⚠'} {validation_message}")
+        
+        if (compositor_status['use_nodes'] and 
+            compositor_status['node_tree_exists'] and
+            compositor_status['node_tree_type'] == 'COMPOSITING' and
+            compositor_status['total_nodes'] > 0 and
+            is_valid):
+            print("✓ 检测到有效的合成器节点树，使用合成器渲染以包含辉光等效果")
+            scene.render.use_compositing = True
+            scene.render.use_sequencer = False
+            return True
+        
+        print("⚠ 未检测到有效的合成器节点树，尝试强制启用...")
+        try:
+            renderer.force_enable_compositor()
+            is_valid, validation_message = renderer.validate_compositor_setup()
+            print(f"强制启用后验证结果: {'✓' if is_valid else '⚠'} {validation_message}")
+            if is_valid:
+                print("✓ 强制启用成功，使用合成器渲染")
+                return True
+            print("⚠ 强制启用失败，回退到标准渲染")
+        except Exception as e:
+            print(f"⚠ 强制启用合成器时出错: {str(e)}")
+            print("回退到标准渲染")
+        
+        scene.render.use_compositing = False
+        return False
+
+    def render_animation(self):
+        """以动画方式渲染场景帧范围，使用会话缓存的合成器设置"""
+        scene = bpy.context.scene
+        scene.camera = self.renderer.cam
+        
+        if self.use_compositor:
+            bpy.ops.render.render(animation=True, use_viewport=False)
+        else:
+            bpy.ops.render.render(animation=True)
+
+    def render_still(self, filepath):
+        """渲染单张静帧到指定路径，使用会话缓存的合成器设置"""
+        scene = bpy.context.scene
+        scene.render.filepath = filepath
+        
+        # 在渲染前再次确保使用指定的相机（防止相机标记影响）
+        scene.camera = self.renderer.cam
+        
+        # 注意：write_still=True 会自动保存到指定路径，不需要再次保存
+        if self.use_compositor:
+            bpy.ops.render.render(write_still=True, use_viewport=False)
+        else:
+            bpy.ops.render.render(write_still=True)
+        
+        # 验证渲染结果
+        if os.path.exists(filepath):
+            file_size = os.path.getsize(filepath)
+            if file_size < 1000:
+                print(f"⚠ 警告: 文件大小过小 ({file_size} 字节)，可能渲染失败")
+        else:
+            print("⚠ 警告: 渲染文件未找到")
+
+
 class AUTO_RENDER_OneClick(bpy.types.Operator):
     bl_idname = "auto_render.oneclick"
     bl_label = "一键处理导入模型"
@@ -1849,6 +2128,11 @@ class AutoRenderSettings(bpy.types.PropertyGroup):
         description="Enable to automatically keyframe the camera's position, rotation, and focal length when focusing on objects.",
         default=False
     ) # type: ignore
+    render_as_animation: bpy.props.BoolProperty(
+        name="Render As Animation",
+        description="将每个分组作为一帧，整个集合作为一个动画任务渲染，帧间复用场景数据和着色器，渲染后按分组重命名输出文件",
+        default=False
+    ) # type: ignore
     
 
 class AUTO_RENDER_OT_Execute(bpy.types.Operator):
@@ -1871,6 +2155,7 @@ class AUTO_RENDER_OT_Execute(bpy.types.Operator):
         print(f"聚焦到每个物体: {auto_render_settings.focus_each_object}")
         print(f"仅聚焦有面的物体: {auto_render_settings.focus_only_faces}")
         print(f"自动关键帧: {auto_render_settings.auto_keyframe}")
+        print(f"单次动画渲染: {auto_render_settings.render_as_animation}")
         print(f"合成器效果: 始终启用（可通过Blender的合成器开关控制）")
 
         try:
@@ -1937,6 +2222,7 @@ class AUTO_RENDER_OT_Execute(bpy.types.Operator):
                                         focus_each_object=focus_each_object,
                                         focus_only_faces=focus_only_faces, 
                                         auto_keyframe=auto_keyframe,
+                                        render_as_animation=auto_render_settings.render_as_animation,
                                         report_callback=self.report)
             
             print("开始执行渲染...")
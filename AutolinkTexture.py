@@ -50,41 +50,98 @@ def load_textures_to_dict(texture_dir, ignore_fields=None):
         print(f"Error processing texture directory: {str(e)}")
         return texture_mapping
 
+# 贴图模板中图像纹理节点的名称，用于识别已经按模板构建的材质
+TEXTURE_NODE_NAME = "MixTools Texture"
+
+# 图像缓存: 规范化的绝对路径 -> (文件修改时间, 图像名称)
+# 只保存名称，每次通过 bpy.data.images 重新查找，撤销或打开文件后不会持有失效的图像引用
+_image_cache = {}
+
+def find_cached_image(cache_key, image_name):
+    """按名称重新查找缓存的图像，图像已被删除、改名或路径不同时返回None"""
+    image = bpy.data.images.get(image_name)
+    if image is None or not image.filepath:
+        return None
+    if os.path.normcase(os.path.abspath(bpy.path.abspath(image.filepath))) != cache_key:
+        return None
+    return image
+
+def get_cached_image(image_path):
+    """按绝对路径和文件修改时间复用已加载的图像，同一贴图只加载一次"""
+    image_path = os.path.abspath(image_path)
+    cache_key = os.path.normcase(image_path)
+    mtime = os.path.getmtime(image_path)
+
+    cached = _image_cache.get(cache_key)
+    if cached:
+        cached_mtime, image_name = cached
+        image = find_cached_image(cache_key, image_name)
+        if image is not None:
+            # 文件被修改过时重新读取，仍使用同一个图像数据块
+            if cached_mtime != mtime:
+                image.reload()
+                _image_cache[cache_key] = (mtime, image.name)
+            return image
+        del _image_cache[cache_key]
+
+    image = bpy.data.images.load(image_path, check_existing=True)
+
+    # Set alpha mode for TGA images
+    if image_path.lower().endswith('.tga'):
+        image.alpha_mode = 'CHANNEL_PACKED'  # Set alpha mode to Channel Packed
+
+    _image_cache[cache_key] = (mtime, image.name)
+    return image
+
+def clear_image_cache():
+    _image_cache.clear()
+
+def is_texture_template(mat, image):
+    """材质是否已经是使用该图像的贴图模板（图像纹理 -> 原理化BSDF -> 输出）"""
+    if not mat.use_nodes or not mat.node_tree:
+        return False
+    nodes = mat.node_tree.nodes
+    tex_node = nodes.get(TEXTURE_NODE_NAME)
+    return (len(nodes) == 3 and tex_node is not None and tex_node.image == image
+            and len(mat.node_tree.links) == 2)
+
+def build_texture_nodes(mat, image):
+    """按贴图模板构建材质节点，已是相同模板的材质不重复构建"""
+    if is_texture_template(mat, image):
+        return
+
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+
+    # 清除默认节点
+    nodes.clear()
+
+    # 添加必要节点
+    tex_node = nodes.new(type='ShaderNodeTexImage')
+    tex_node.name = TEXTURE_NODE_NAME
+    tex_node.image = image
+    bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
+    output_node = nodes.new(type='ShaderNodeOutputMaterial')
+
+    # 设置节点位置（可选）
+    tex_node.location = (-300, 300)
+    bsdf_node.location = (0, 300)
+    output_node.location = (200, 300)
+
+    # 连接节点
+    links.new(tex_node.outputs['Color'], bsdf_node.inputs['Base Color'])
+    links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
+
+    # 打印连接信息
+    print(f"连接: {tex_node.outputs['Color']} -> {bsdf_node.inputs['Base Color']}")
+    print(f"连接: {bsdf_node.outputs['BSDF']} -> {output_node.inputs['Surface']}")
+
 def apply_texture_to_material(mat, image_path):
     """应用纹理到材质"""
     try:
-        image_path = os.path.abspath(image_path)  # Ensure the path is absolute
-        image = bpy.data.images.load(image_path)
-
-        # Set alpha mode for TGA images
-        if image_path.lower().endswith('.tga'):
-            image.alpha_mode = 'CHANNEL_PACKED'  # Set alpha mode to Channel Packed
-
-        mat.use_nodes = True
-        nodes = mat.node_tree.nodes
-        links = mat.node_tree.links
-
-        # 清除默认节点
-        nodes.clear()
-
-        # 添加必要节点
-        tex_node = nodes.new(type='ShaderNodeTexImage')
-        tex_node.image = image
-        bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
-        output_node = nodes.new(type='ShaderNodeOutputMaterial')
-
-        # 设置节点位置（可选）
-        tex_node.location = (-300, 300)
-        bsdf_node.location = (0, 300)
-        output_node.location = (200, 300)
-
-        # 连接节点
-        links.new(tex_node.outputs['Color'], bsdf_node.inputs['Base Color'])
-        links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
-
-        # 打印连接信息
-        print(f"连接: {tex_node.outputs['Color']} -> {bsdf_node.inputs['Base Color']}")
-        print(f"连接: {bsdf_node.outputs['BSDF']} -> {output_node.inputs['Surface']}")
+        image = get_cached_image(image_path)
+        build_texture_nodes(mat, image)
 
     except Exception as e:
         print(f"无法加载纹理 '{image_path}': {e}")
@@ -92,43 +149,14 @@ def apply_texture_to_material(mat, image_path):
 def apply_texture(obj, image_path):
     """应用纹理到对象的每个材质"""
     try:
-        image_path = os.path.abspath(image_path)  # Ensure the path is absolute
-        image = bpy.data.images.load(image_path)
-
-        # Set alpha mode for TGA images
-        if image_path.lower().endswith('.tga'):
-            image.alpha_mode = 'CHANNEL_PACKED'  # Set alpha mode to Channel Packed
+        image = get_cached_image(image_path)
 
         for mat_slot in obj.material_slots:
             mat = mat_slot.material
             if not mat:
                 continue
 
-            mat.use_nodes = True
-            nodes = mat.node_tree.nodes
-            links = mat.node_tree.links
-
-            # 清除默认节点
-            nodes.clear()
-
-            # 添加必要节点
-            tex_node = nodes.new(type='ShaderNodeTexImage')
-            tex_node.image = image
-            bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
-            output_node = nodes.new(type='ShaderNodeOutputMaterial')
-
-            # 设置节点位置（可选）
-            tex_node.location = (-300, 300)
-            bsdf_node.location = (0, 300)
-            output_node.location = (200, 300)
-
-            # 连接节点
-            links.new(tex_node.outputs['Color'], bsdf_node.inputs['Base Color'])
-            links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
-
-            # 打印连接信息
-            print(f"连接: {tex_node.outputs['Color']} -> {bsdf_node.inputs['Base Color']}")
-            print(f"连接: {bsdf_node.outputs['BSDF']} -> {output_node.inputs['Surface']}")
+            build_texture_nodes(mat, image)
 
     except Exception as e:
         print(f"无法加载纹理 '{image_path}': {e}")
@@ -510,5 +538,7 @@ def unregister():
     bpy.utils.unregister_class(ApplyTextureByObjectNameOperator)
     bpy.utils.unregister_class(ApplyTextureBySimilarityOperator)
 
+    clear_image_cache()
+
     del bpy.types.Scene.texture_dir
     del bpy.types.Scene.ignore_fields_input
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""
+MixTools 通用后台批处理
+
+对一组 .blend 文件逐个执行同一个操作符（任意 bl_idname 及其参数），
+每个文件在单独的后台Blender进程中打开和处理：
+
+- 同时运行的进程数有上限，每个文件有独立的超时；
+- 进程崩溃或超时（没有写回结果）时自动重试；
+- 全部结束后可写出 JSON 结果清单，逐个文件记录操作符返回值、保存路径和错误信息。
+
+默认不保存处理结果（save_mode='NONE'）；覆盖原文件必须显式选择 'OVERWRITE'。
+
+脚本调用示例::
+
+    from MixTools import BatchJobRunner
+    summary = BatchJobRunner.run_batch_operator(
+        files, "outliner.orphans_purge", {'do_recursive': True},
+        save_mode='COPY', output_dir="/tmp/cleaned",
+        timeout=600, retries=1, manifest_path="/tmp/cleanup.json")
+"""
+
+import os
+import json
+import time
+
+import bpy
+from bpy.props import StringProperty, IntProperty, EnumProperty, BoolProperty
+from bpy.types import Operator
+
+from . import HeadlessWorker
+
+
+# 处理后的保存方式
+SAVE_MODE_ITEMS = [
+    ('COPY', "另存到输出目录", "处理后以原文件名保存到输出目录，不修改原文件"),
+    ('NONE', "不保存", "只执行操作符，不保存文件（用于检查、导出等任务）"),
+    ('OVERWRITE', "覆盖原文件", "处理后保存回原文件，原文件会被修改"),
+]
+
+# 默认保存方式：不修改任何原文件
+DEFAULT_SAVE_MODE = 'NONE'
+
+
+def resolve_operator(idname):
+    """把 'category.name' 形式的 bl_idname 解析为 bpy.ops 中的操作符"""
+    category, separator, name = idname.partition('.')
+    if not separator or not category or not name:
+        raise ValueError(f"无效的操作符: {idname}")
+    operator = getattr(getattr(bpy.ops, category), name)
+    # 访问不存在的操作符不会立即报错，需要检查其RNA定义
+    try:
+        operator.get_rna_type()
+    except (KeyError, AttributeError):
+        raise ValueError(f"操作符不存在: {idname}")
+    return operator
+
+
+def get_source_root(blend_files):
+    """所有 .blend 文件共同的上级目录，作为另存时镜像目录结构的根目录"""
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in blend_files])
+
+
+def get_output_path(blend_path, save_mode, output_dir=None, source_root=None):
+    """按保存方式计算处理后的文件路径，不保存时返回None
+
+    另存到输出目录时保留文件相对 source_root 的子目录结构，
+    不同子目录中的同名文件不会写到同一个输出文件。
+    """
+    if save_mode == 'OVERWRITE':
+        return blend_path
+    if save_mode == 'COPY':
+        source_root = source_root or os.path.dirname(blend_path)
+        return os.path.join(output_dir, os.path.relpath(blend_path, source_root))
+    return None
+
+
+def _path_key(path):
+    return os.path.normcase(os.path.realpath(path))
+
+
+def check_copy_output_paths(jobs):
+    """检查另存任务的输出路径：不能指向任何源文件，也不能有两个任务写到同一个文件
+
+    Raises:
+        ValueError: 输出路径与源文件相同或互相重复
+    """
+    source_paths = {_path_key(job['blend_path']) for job in jobs}
+    output_sources = {}
+    for job in jobs:
+        output_key = _path_key(job['output_path'])
+        if output_key in source_paths:
+            raise ValueError(f"输出路径与源文件相同，另存会覆盖源文件: {job['output_path']}")
+        if output_key in output_sources:
+            raise ValueError(f"多个文件的输出路径相同: {output_sources[output_key]} 和 "
+                             f"{job['blend_path']} -> {job['output_path']}")
+        output_sources[output_key] = job['blend_path']
+
+
+def run_operator_job(job):
+    """后台工作进程中执行的任务：工作进程已打开 job['blend_path']，执行操作符后按保存方式保存"""
+    blend_path = job['blend_path']
+    try:
+        scene = bpy.context.scene
+        for name, value in job.get('scene_properties', {}).items():
+            setattr(scene, name, value)
+
+        operator = resolve_operator(job['operator'])
+        result = operator(**job.get('properties', {}))
+        success = 'FINISHED' in result
+
+        save_mode = job.get('save_mode', DEFAULT_SAVE_MODE)
+        output_path = job.get('output_path') or get_output_path(blend_path, save_mode, job.get('output_dir'))
+        if success and output_path:
+            if save_mode == 'OVERWRITE':
+                bpy.ops.wm.save_mainfile()
+            else:
+                bpy.ops.wm.save_as_mainfile(filepath=output_path, copy=True, check_existing=False)
+
+        item = {'name': blend_path, 'success': success, 'result': sorted(result),
+                'file': output_path if success else None}
+        if not success:
+            item['error'] = f"操作符返回 {sorted(result)}"
+        return [item]
+    except Exception as e:
+        return [{'name': blend_path, 'success': False, 'error': str(e)}]
+
+
+def build_operator_jobs(blend_files, operator, properties=None, scene_properties=None,
+                        save_mode=DEFAULT_SAVE_MODE, output_dir=None, source_root=None):
+    """每个 .blend 文件生成一个任务，工作进程启动时直接打开该文件
+
+    输出路径在主进程中统一计算后写入任务，source_root 默认为所有文件共同的上级目录。
+    """
+    blend_paths = [os.path.abspath(blend_path) for blend_path in blend_files]
+    if save_mode == 'COPY' and blend_paths:
+        source_root = os.path.abspath(source_root) if source_root else get_source_root(blend_paths)
+    return [{'type': 'run_operator', 'register_addon': True,
+             'operator': operator, 'properties': properties or {},
+             'scene_properties': scene_properties or {},
+             'save_mode': save_mode, 'output_dir': output_dir,
+             'output_path': get_output_path(blend_path, save_mode, output_dir, source_root),
+             'blend_path': blend_path}
+            for blend_path in blend_paths]
+
+
+def run_batch_operator(blend_files, operator, properties=None, scene_properties=None,
+                       save_mode=DEFAULT_SAVE_MODE, output_dir=None, max_workers=None,
+                       timeout=None, retries=1, manifest_path=None, source_root=None):
+    """在后台进程池中对每个 .blend 文件执行操作符。
+
+    Args:
+        blend_files: list[str] - .blend 文件路径
+        operator: str - 操作符 bl_idname，如 'outliner.orphans_purge'
+        properties: dict | None - 操作符参数
+        scene_properties: dict | None - 执行前设置到场景上的属性（如插件的场景设置）
+        save_mode: str - 'NONE'（默认）、'COPY' 或 'OVERWRITE'（覆盖原文件，需显式指定）
+        output_dir: str | None - save_mode 为 'COPY' 时的输出目录
+        max_workers: int | None - 最大并发进程数，默认自动
+        timeout: float | None - 单个文件的超时秒数
+        retries: int - 进程崩溃或超时后的重试次数
+        manifest_path: str | None - JSON 结果清单路径，None 时不写出
+        source_root: str | None - 扫描的根目录，另存时在输出目录下镜像文件相对它的路径，
+            默认为所有文件共同的上级目录
+
+    Returns:
+        dict - {'succeeded', 'failed', 'results', 'elapsed'}
+    """
+    if save_mode == 'COPY' and not output_dir:
+        raise ValueError("另存到输出目录时必须指定输出目录")
+
+    start_time = time.time()
+    jobs = build_operator_jobs(blend_files, operator, properties, scene_properties,
+                               save_mode, output_dir, source_root)
+    if save_mode == 'COPY':
+        check_copy_output_paths(jobs)
+        for job in jobs:
+            os.makedirs(os.path.dirname(job['output_path']), exist_ok=True)
+    results = HeadlessWorker.run_worker_pool(jobs, max_workers=max_workers,
+                                             timeout=timeout, retries=retries)
+    elapsed = time.time() - start_time
+    succeeded, failed = HeadlessWorker.collect_items(results)
+
+    if manifest_path:
+        HeadlessWorker.write_result_manifest(manifest_path, jobs, results, elapsed)
+
+    return {'succeeded': succeeded, 'failed': failed, 'results': results, 'elapsed': elapsed}
+
+
+def collect_blend_files(directory, recursive=False):
+    """收集目录中的 .blend 文件（不包含 .blend1 等备份文件）"""
+    if not recursive:
+        with os.scandir(directory) as entries:
+            return sorted(entry.path for entry in entries
+                          if entry.is_file() and entry.name.lower().endswith(".blend"))
+    found_files = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.lower().endswith(".blend"):
+                found_files.append(os.path.join(root, file))
+    return sorted(found_files)
+
+
+class MIXTOOLS_OT_batch_run_operator(Operator):
+    """在后台Blender进程中对目录内每个.blend文件执行指定操作符"""
+    bl_idname = "mixtools.batch_run_operator"
+    bl_label = "后台批量执行操作符"
+    bl_description = "对目录中的每个.blend文件在后台Blender进程中执行指定操作符，不影响当前会话"
+
+    directory: StringProperty(
+        name="目录",
+        description="包含.blend文件的目录",
+        subtype='DIR_PATH'
+    )
+    recursive: BoolProperty(
+        name="包含子目录",
+        default=False
+    )
+    operator_idname: StringProperty(
+        name="操作符",
+        description="要执行的操作符 bl_idname，例如 outliner.orphans_purge",
+        default=""
+    )
+    properties_json: StringProperty(
+        name="参数(JSON)",
+        description="操作符参数，JSON对象格式，例如 {\"do_recursive\": true}",
+        default="{}"
+    )
+    save_mode: EnumProperty(
+        name="保存方式",
+        items=SAVE_MODE_ITEMS,
+        default='COPY'
+    )
+    output_dir: StringProperty(
+        name="输出目录",
+        description="另存到输出目录时使用",
+        subtype='DIR_PATH'
+    )
+    worker_count: IntProperty(
+        name="进程数",
+        description="同时运行的后台Blender进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64
+    )
+    timeout: IntProperty(
+        name="单文件超时(秒)",
+        description="单个文件的处理超时，0为不限制",
+        default=600,
+        min=0
+    )
+    retries: IntProperty(
+        name="崩溃重试次数",
+        description="后台进程崩溃或超时后重新处理该文件的次数",
+        default=1,
+        min=0,
+        max=5
+    )
+    manifest_path: StringProperty(
+        name="结果清单",
+        description="JSON结果清单的保存路径，留空则保存到目录下的 mixtools_batch_result.json",
+        subtype='FILE_PATH'
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=450)
+
+    def execute(self, context):
+        directory = bpy.path.abspath(self.directory)
+        if not directory or not os.path.isdir(directory):
+            self.report({'ERROR'}, "请选择有效的目录")
+            return {'CANCELLED'}
+
+        try:
+            properties = json.loads(self.properties_json or "{}")
+            if not isinstance(properties, dict):
+                raise ValueError("参数必须是JSON对象")
+        except ValueError as e:
+            self.report({'ERROR'}, f"操作符参数格式错误: {e}")
+            return {'CANCELLED'}
+
+        try:
+            resolve_operator(self.operator_idname)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        blend_files = collect_blend_files(directory, self.recursive)
+        # 不处理当前打开的文件
+        current_file = os.path.normcase(os.path.abspath(bpy.data.filepath)) if bpy.data.filepath else None
+        blend_files = [path for path in blend_files if os.path.normcase(os.path.abspath(path)) != current_file]
+        if not blend_files:
+            self.report({'WARNING'}, "目录中没有找到.blend文件")
+            return {'CANCELLED'}
+
+        manifest_path = (bpy.path.abspath(self.manifest_path) if self.manifest_path
+                         else os.path.join(directory, "mixtools_batch_result.json"))
+        try:
+            summary = run_batch_operator(
+                blend_files, self.operator_idname, properties,
+                save_mode=self.save_mode,
+                output_dir=bpy.path.abspath(self.output_dir) if self.output_dir else None,
+                source_root=directory,
+                max_workers=HeadlessWorker.resolve_worker_count(self.worker_count),
+                timeout=self.timeout or None,
+                retries=self.retries,
+                manifest_path=manifest_path)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        for item in summary['failed']:
+            print(f"处理失败: {item['name']}: {item.get('error')}")
+
+        message = (f"批量执行完成! 耗时: {summary['elapsed']:.2f}秒, 成功{len(summary['succeeded'])}个, "
+                   f"失败{len(summary['failed'])}个, 结果清单: {manifest_path}")
+        self.report({'WARNING'} if summary['failed'] else {'INFO'}, message)
+        return {'FINISHED'}
+
+
+classes = (
+    MIXTOOLS_OT_batch_run_operator,
+)
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
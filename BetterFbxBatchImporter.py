@@ -2,14 +2,15 @@ import bpy
 import os
 import sys
 import importlib
-import subprocess
 import platform
-import uuid
 import time
 from bpy.props import StringProperty, BoolProperty, EnumProperty, FloatProperty, IntProperty
 from bpy.types import Operator
 from bpy_extras.io_utils import ImportHelper
 
+from . import BetterFbxConverter
+from . import ImportLedger
+
 # 添加BetterFBX插件路径到sys.path
 better_fbx_path = os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "Blender Foundation", "Blender", "3.6", "scripts", "addons", "better_fbx")
 if better_fbx_path not in sys.path:
@@ -45,6 +46,69 @@ def get_better_fbx_executable_path():
             return os.path.join(better_fbx_path, "bin", platform.system(), "fbx-utility3")
     return None
 
+def get_converter_output_dir():
+    """转换阶段中间数据文件的目录"""
+    return os.path.join(better_fbx_path, "data")
+
+def ingest_converted_file(output_path, settings):
+    """
+    读入阶段：在主线程中读取转换生成的中间数据并创建物体，读取后删除中间文件
+    
+    返回:
+    (success, message, imported_objects)
+    """
+    # 记录导入前的对象
+    objects_before = set(bpy.context.scene.objects)
+    
+    # 调用BetterFBX的数据读取函数
+    try:
+        # 这里需要调用BetterFBX的read_some_data函数
+        # 由于无法直接访问，我们使用反射或者重新实现
+        read_result = read_better_fbx_data(
+            bpy.context,
+            output_path,
+            settings['my_leaf_bone'],
+            settings['my_import_normal'],
+            settings['my_shade_mode'],
+            settings['use_auto_smooth'],
+            settings['my_angle'],
+            settings['use_auto_bone_orientation'],
+            settings['my_bone_length'],
+            settings['my_calculate_roll'],
+            settings['use_vertex_animation'],
+            settings['use_edge_crease'],
+            settings['my_edge_crease_scale'],
+            settings['my_edge_smoothing'],
+            settings['use_import_materials'],
+            None,  # obj_name
+            settings['my_rotation_mode'],
+            settings['use_detect_deform_bone'],
+            settings['use_fix_bone_poses'],
+            settings['my_animation_offset'],
+            settings['use_animation_prefix'],
+            settings['primary_bone_axis'],
+            settings['secondary_bone_axis']
+        )
+        
+        if read_result != {'FINISHED'}:
+            return False, "BetterFBX数据读取失败", []
+        
+    except Exception as e:
+        return False, f"BetterFBX数据读取出错: {str(e)}", []
+    finally:
+        # 清理输出文件
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    
+    # 获取新导入的对象
+    objects_after = set(bpy.context.scene.objects)
+    imported_objects = list(objects_after - objects_before)
+    
+    if len(imported_objects) == 0:
+        return False, "没有检测到新导入的对象", []
+    
+    return True, f"成功导入 {len(imported_objects)} 个对象", imported_objects
+
 def import_fbx_with_better_fbx(file_path, import_settings=None):
     """
     使用BetterFBX插件导入FBX文件
@@ -59,145 +123,22 @@ def import_fbx_with_better_fbx(file_path, import_settings=None):
     if not BETTER_FBX_AVAILABLE:
         return False, "BetterFBX插件不可用", []
     
-    if not os.path.exists(file_path):
-        return False, f"文件不存在: {file_path}", []
-    
-    # 默认导入设置
-    default_settings = {
-        'my_scale': 1.0,
-        'use_only_deform_bones': False,
-        'use_animation': True,
-        'use_reset_mesh_origin': False,
-        'use_reset_mesh_rotation': False,
-        'use_fix_attributes': True,
-        'use_triangulate': False,
-        'use_optimize_for_blender': False,
-        'my_edge_smoothing': 'FBXSDK',
-        'my_fbx_unit': 'cm',
-        'my_rotation_mode': 'QUATERNION',
-        'my_import_normal': 'Import',
-        'use_auto_smooth': True,
-        'my_angle': 60.0,
-        'my_shade_mode': 'Smooth',
-        'use_auto_bone_orientation': True,
-        'primary_bone_axis': 'Y',
-        'secondary_bone_axis': 'X',
-        'my_calculate_roll': 'None',
-        'my_bone_length': 10.0,
-        'my_leaf_bone': 'Long',
-        'use_detect_deform_bone': True,
-        'use_fix_bone_poses': False,
-        'my_animation_offset': 0,
-        'use_animation_prefix': False,
-        'use_vertex_animation': True,
-        'use_edge_crease': True,
-        'my_edge_crease_scale': 1.0,
-        'use_import_materials': True,
-        'use_rename_by_filename': False
-    }
-    
-    # 合并用户设置
-    if import_settings:
-        default_settings.update(import_settings)
+    settings = BetterFbxConverter.merge_import_settings(import_settings)
     
     try:
-        # 记录导入前的对象
-        objects_before = set(bpy.context.scene.objects)
-        
         # 获取BetterFBX可执行文件路径
-        executable_path = get_better_fbx_executable_path()
+        executable_path = BetterFbxConverter.resolve_executable(get_better_fbx_executable_path())
         if not executable_path or not os.path.exists(executable_path):
             return False, "BetterFBX可执行文件不存在", []
         
-        # 设置输出路径
-        output_path = os.path.join(better_fbx_path, "data", uuid.uuid4().hex + ".txt")
-        
-        # 构建命令行参数
-        cmd_args = [
-            executable_path,
-            file_path,
-            output_path,
-            str(default_settings['my_scale']),
-            "None", "None", "None",
-            "True" if default_settings['use_only_deform_bones'] else "False",
-            "True" if default_settings['use_animation'] else "False",
-            "None", "None",
-            "True" if default_settings['use_reset_mesh_origin'] else "False",
-            "True" if default_settings['use_reset_mesh_rotation'] else "False",
-            "True" if default_settings['use_fix_attributes'] else "False",
-            "True" if default_settings['use_triangulate'] else "False",
-            "True" if default_settings['use_optimize_for_blender'] else "False",
-            default_settings['my_edge_smoothing'],
-            "None", "None", "None", "None", "None",
-            default_settings['my_fbx_unit'],
-            "None", "None"
-        ]
-        
-        # 执行BetterFBX导入
-        print(f"执行BetterFBX导入命令: {' '.join(cmd_args)}")
-        result = subprocess.run(cmd_args, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            return False, f"BetterFBX导入失败: {result.stderr}", []
-        
-        # 读取导入数据
-        if not os.path.exists(output_path):
-            return False, "BetterFBX输出文件不存在", []
-        
-        # 调用BetterFBX的数据读取函数
-        try:
-            # 这里需要调用BetterFBX的read_some_data函数
-            # 由于无法直接访问，我们使用反射或者重新实现
-            read_result = read_better_fbx_data(
-                bpy.context,
-                output_path,
-                default_settings['my_leaf_bone'],
-                default_settings['my_import_normal'],
-                default_settings['my_shade_mode'],
-                default_settings['use_auto_smooth'],
-                default_settings['my_angle'],
-                default_settings['use_auto_bone_orientation'],
-                default_settings['my_bone_length'],
-                default_settings['my_calculate_roll'],
-                default_settings['use_vertex_animation'],
-                default_settings['use_edge_crease'],
-                default_settings['my_edge_crease_scale'],
-                default_settings['my_edge_smoothing'],
-                default_settings['use_import_materials'],
-                None,  # obj_name
-                default_settings['my_rotation_mode'],
-                default_settings['use_detect_deform_bone'],
-                default_settings['use_fix_bone_poses'],
-                default_settings['my_animation_offset'],
-                default_settings['use_animation_prefix'],
-                default_settings['primary_bone_axis'],
-                default_settings['secondary_bone_axis']
-            )
-            
-            if read_result != {'FINISHED'}:
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                return False, "BetterFBX数据读取失败", []
-            
-        except Exception as e:
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            return False, f"BetterFBX数据读取出错: {str(e)}", []
-        finally:
-            # 清理输出文件
-            if os.path.exists(output_path):
-                os.remove(output_path)
-        
-        # 获取新导入的对象
-        objects_after = set(bpy.context.scene.objects)
-        imported_objects = list(objects_after - objects_before)
-        
-        if len(imported_objects) == 0:
-            return False, "没有检测到新导入的对象", []
+        # 执行BetterFBX转换
+        print(f"执行BetterFBX转换: {file_path}")
+        conversion = BetterFbxConverter.convert_fbx_file(
+            file_path, settings, executable_path, get_converter_output_dir())
+        if not conversion['success']:
+            return False, conversion['error'], []
         
-        return True, f"成功导入 {len(imported_objects)} 个对象", imported_objects
+        return ingest_converted_file(conversion['output'], settings)
         
     except Exception as e:
         return False, f"导入过程出错: {str(e)}", []
@@ -221,13 +162,18 @@ def read_better_fbx_data(context, output_path, my_leaf_bone, my_import_normal, m
         print(f"读取BetterFBX数据时出错: {e}")
         return {'CANCELLED'}
 
-def batch_import_fbx_files_with_better_fbx(file_paths, import_settings=None):
+def batch_import_fbx_files_with_better_fbx(file_paths, import_settings=None, max_workers=None, ledger=None):
     """
     使用BetterFBX插件批量导入FBX文件
     
+    转换阶段在后台同时运行最多 max_workers 个转换子进程，
+    主线程按转换完成的顺序逐个读入，读入期间其余文件继续转换。
+    
     参数:
     file_paths: FBX文件路径列表
     import_settings: 导入设置字典
+    max_workers: 同时运行的转换子进程数，None为自动（CPU核心数-1）
+    ledger: 导入台账，不为None时只导入新增或变化的文件，并记录每个文件导入的顶级物体
     
     返回:
     (success, message)
@@ -238,17 +184,35 @@ def batch_import_fbx_files_with_better_fbx(file_paths, import_settings=None):
     if not BETTER_FBX_AVAILABLE:
         return False, "BetterFBX插件不可用，请先安装并启用BetterFBX插件"
     
+    executable_path = BetterFbxConverter.resolve_executable(get_better_fbx_executable_path())
+    if not executable_path or not os.path.exists(executable_path):
+        return False, "BetterFBX可执行文件不存在"
+    
     print(f"\n=== 使用BetterFBX插件批量导入 {len(file_paths)} 个FBX文件 ===")
     
+    settings = BetterFbxConverter.merge_import_settings(import_settings)
     success_count = 0
     error_count = 0
     error_messages = []
     
-    for i, file_path in enumerate(file_paths):
+    # 同步导入：跳过未变化的文件，删除变化文件的旧物体
+    sync_message = ""
+    if ledger is not None:
+        file_paths, skipped_count, replaced_count = ledger.prepare_sync(file_paths)
+        sync_message = f", 跳过未变化: {skipped_count}, 替换: {replaced_count}"
+    
+    conversions = BetterFbxConverter.iter_converted_files(
+        file_paths, settings, executable_path, get_converter_output_dir(), max_workers=max_workers)
+    
+    for i, conversion in enumerate(conversions):
+        file_path = conversion['file']
         print(f"\n进度: {(i + 1)}/{len(file_paths)} - 导入: {os.path.basename(file_path)}")
         
         try:
-            success, message, imported_objects = import_fbx_with_better_fbx(file_path, import_settings)
+            if conversion['success']:
+                success, message, imported_objects = ingest_converted_file(conversion['output'], settings)
+            else:
+                success, message, imported_objects = False, conversion['error'], []
             
             if success:
                 print(f"✓ 成功导入: {os.path.basename(file_path)} - {message}")
@@ -258,6 +222,8 @@ def batch_import_fbx_files_with_better_fbx(file_paths, import_settings=None):
                 if imported_objects:
                     file_name = os.path.splitext(os.path.basename(file_path))[0]
                     rename_armature_to_filename(file_name, imported_objects)
+                    if ledger is not None:
+                        ledger.record(file_path, imported_objects)
             else:
                 print(f"✗ 导入失败: {os.path.basename(file_path)} - {message}")
                 error_count += 1
@@ -269,12 +235,15 @@ def batch_import_fbx_files_with_better_fbx(file_paths, import_settings=None):
             error_messages.append(error_msg)
             error_count += 1
     
+    if ledger is not None:
+        ledger.save()
+    
     # 生成结果消息
-    result_message = f"批量导入完成！成功: {success_count}, 失败: {error_count}"
+    result_message = f"批量导入完成！成功: {success_count}, 失败: {error_count}{sync_message}"
     if error_messages:
         result_message += f"\n错误详情:\n" + "\n".join(error_messages)
     
-    return success_count > 0, result_message
+    return success_count > 0 or error_count == 0, result_message
 
 def rename_armature_to_filename(file_name, imported_objects):
     """重命名导入的骨架为文件名"""
@@ -336,6 +305,14 @@ class BETTER_FBX_OT_BatchImportWithBetterFBX(Operator):
         default=True
     )
     
+    converter_workers: IntProperty(
+        name="并发转换数",
+        description="同时运行的BetterFBX转换进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64
+    )
+    
     my_rotation_mode: EnumProperty(
         name="旋转模式",
         description="所有对象的旋转模式",
@@ -387,7 +364,9 @@ class BETTER_FBX_OT_BatchImportWithBetterFBX(Operator):
         }
         
         # 执行批量导入
-        success, message = batch_import_fbx_files_with_better_fbx(fbx_files, import_settings)
+        success, message = batch_import_fbx_files_with_better_fbx(
+            fbx_files, import_settings, max_workers=self.converter_workers or None,
+            ledger=ImportLedger.create_import_ledger(context.scene))
         
         if success:
             self.report({'INFO'}, message)
@@ -445,6 +424,14 @@ class BETTER_FBX_OT_BatchImportFilesWithBetterFBX(Operator, ImportHelper):
         default=True
     )
     
+    converter_workers: IntProperty(
+        name="并发转换数",
+        description="同时运行的BetterFBX转换进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64
+    )
+    
     my_rotation_mode: EnumProperty(
         name="旋转模式",
         description="所有对象的旋转模式",
@@ -486,7 +473,9 @@ class BETTER_FBX_OT_BatchImportFilesWithBetterFBX(Operator, ImportHelper):
         }
         
         # 执行批量导入
-        success, message = batch_import_fbx_files_with_better_fbx(file_paths, import_settings)
+        success, message = batch_import_fbx_files_with_better_fbx(
+            file_paths, import_settings, max_workers=self.converter_workers or None,
+            ledger=ImportLedger.create_import_ledger(context.scene))
         
         if success:
             self.report({'INFO'}, message)
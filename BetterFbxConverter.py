@@ -0,0 +1,164 @@
+"""
+BetterFBX 外部转换阶段
+
+BetterFBX 导入分为两个阶段：
+
+- 转换阶段：对每个FBX文件运行 BetterFBX 的 fbx-utility 可执行文件，生成中间数据文件。
+  各文件互不依赖，本模块用有上限的线程池同时驱动多个转换子进程；
+- 读入阶段：在Blender主线程中逐个读取中间数据并创建物体（见 BetterFbxBatchImporter）。
+
+本模块不依赖 bpy，可以脱离Blender运行。转换程序可以是可执行文件路径，也可以是命令前缀列表；
+以 ``.py`` 结尾的路径用当前Python解释器运行。设置环境变量 ``MIXTOOLS_BETTER_FBX_EXECUTABLE``
+可以用替身转换脚本代替 fbx-utility，在Linux上单独验证转换阶段
+（tests/stub_fbx_converter.py 是一个替身脚本，见 tests/test_better_fbx_converter.py）::
+
+    import sys
+    import BetterFbxConverter as c
+    results = list(c.iter_converted_files(
+        ['a.fbx'], c.merge_import_settings(),
+        [sys.executable, 'tests/stub_fbx_converter.py'], '/tmp'))
+"""
+
+import os
+import sys
+import uuid
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# 替换转换可执行文件的环境变量
+EXECUTABLE_ENV_VAR = "MIXTOOLS_BETTER_FBX_EXECUTABLE"
+
+# 默认导入设置
+DEFAULT_IMPORT_SETTINGS = {
+    'my_scale': 1.0,
+    'use_only_deform_bones': False,
+    'use_animation': True,
+    'use_reset_mesh_origin': False,
+    'use_reset_mesh_rotation': False,
+    'use_fix_attributes': True,
+    'use_triangulate': False,
+    'use_optimize_for_blender': False,
+    'my_edge_smoothing': 'FBXSDK',
+    'my_fbx_unit': 'cm',
+    'my_rotation_mode': 'QUATERNION',
+    'my_import_normal': 'Import',
+    'use_auto_smooth': True,
+    'my_angle': 60.0,
+    'my_shade_mode': 'Smooth',
+    'use_auto_bone_orientation': True,
+    'primary_bone_axis': 'Y',
+    'secondary_bone_axis': 'X',
+    'my_calculate_roll': 'None',
+    'my_bone_length': 10.0,
+    'my_leaf_bone': 'Long',
+    'use_detect_deform_bone': True,
+    'use_fix_bone_poses': False,
+    'my_animation_offset': 0,
+    'use_animation_prefix': False,
+    'use_vertex_animation': True,
+    'use_edge_crease': True,
+    'my_edge_crease_scale': 1.0,
+    'use_import_materials': True,
+    'use_rename_by_filename': False
+}
+
+
+def get_default_worker_count():
+    """默认并发转换数：保留一个核心给Blender主线程的读入阶段。"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def merge_import_settings(import_settings=None):
+    """把用户设置合并到默认导入设置上。"""
+    settings = dict(DEFAULT_IMPORT_SETTINGS)
+    if import_settings:
+        settings.update(import_settings)
+    return settings
+
+
+def resolve_executable(executable_path=None):
+    """环境变量指定的替身转换程序优先于插件自带的可执行文件。"""
+    return os.environ.get(EXECUTABLE_ENV_VAR) or executable_path
+
+
+def get_executable_prefix(executable_path):
+    """转换程序的命令前缀：列表原样使用，.py 脚本用当前Python解释器运行。"""
+    if isinstance(executable_path, (list, tuple)):
+        return list(executable_path)
+    if executable_path.lower().endswith(".py"):
+        return [sys.executable, executable_path]
+    return [executable_path]
+
+
+def build_converter_command(executable_path, file_path, output_path, settings):
+    """构建 fbx-utility 的命令行参数。"""
+    def flag(key):
+        return "True" if settings[key] else "False"
+
+    return get_executable_prefix(executable_path) + [
+        file_path,
+        output_path,
+        str(settings['my_scale']),
+        "None", "None", "None",
+        flag('use_only_deform_bones'),
+        flag('use_animation'),
+        "None", "None",
+        flag('use_reset_mesh_origin'),
+        flag('use_reset_mesh_rotation'),
+        flag('use_fix_attributes'),
+        flag('use_triangulate'),
+        flag('use_optimize_for_blender'),
+        settings['my_edge_smoothing'],
+        "None", "None", "None", "None", "None",
+        settings['my_fbx_unit'],
+        "None", "None"
+    ]
+
+
+def convert_fbx_file(file_path, settings, executable_path, output_dir, timeout=None):
+    """运行一次转换子进程，生成中间数据文件。
+
+    Returns:
+        dict - {'file', 'output', 'success', 'error'}；失败时中间文件已被删除
+    """
+    output_path = os.path.join(output_dir, uuid.uuid4().hex + ".txt")
+    result = {'file': file_path, 'output': output_path, 'success': False, 'error': None}
+
+    if not os.path.exists(file_path):
+        result['error'] = f"文件不存在: {file_path}"
+        return result
+
+    command = build_converter_command(executable_path, file_path, output_path, settings)
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        if completed.returncode != 0:
+            result['error'] = f"BetterFBX转换失败: {completed.stderr}"
+        elif not os.path.exists(output_path):
+            result['error'] = "BetterFBX输出文件不存在"
+        else:
+            result['success'] = True
+    except subprocess.TimeoutExpired:
+        result['error'] = f"BetterFBX转换超时 ({timeout}秒)"
+    except OSError as e:
+        result['error'] = f"无法启动BetterFBX转换程序: {e}"
+
+    if not result['success'] and os.path.exists(output_path):
+        os.remove(output_path)
+    return result
+
+
+def iter_converted_files(file_paths, settings, executable_path, output_dir,
+                         max_workers=None, timeout=None):
+    """并发转换多个文件，按完成顺序逐个产出转换结果。
+
+    同时运行的转换子进程不超过 max_workers 个；调用方在读入上一个结果时，
+    其余文件的转换仍在后台继续。
+    """
+    max_workers = max_workers or get_default_worker_count()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(convert_fbx_file, file_path, settings,
+                                   executable_path, output_dir, timeout)
+                   for file_path in file_paths]
+        for future in as_completed(futures):
+            yield future.result()
@@ -1,8 +1,12 @@
 import bpy
 import os
+import shutil
+import tempfile
 from pathlib import Path
 from bpy.types import Operator
 
+from . import HeadlessWorker
+
 def check_better_fbx_export_available():
     """检查BetterFBX导出器是否可用"""
     try:
@@ -281,6 +285,52 @@ def batch_export_by_top_level_objects(export_directory, export_settings=None):
     
     return success_count > 0, result_message, exported_files
 
+def run_export_job(job):
+    """后台工作进程中执行的按顶级物体导出任务，job['targets'] 为顶级物体名称列表"""
+    export_directory = job['export_directory']
+    export_settings = get_better_fbx_export_settings()
+    
+    items = []
+    for name in job['targets']:
+        root_obj = bpy.data.objects.get(name)
+        if root_obj is None:
+            items.append({'name': name, 'success': False, 'error': "物体不存在"})
+            continue
+        success, message, file_path = export_object_group_as_fbx(root_obj, export_directory, export_settings)
+        items.append({'name': name, 'success': success, 'file': file_path, 'error': None if success else message})
+    return items
+
+def batch_export_with_worker_pool(export_directory, worker_count):
+    """
+    按顶级物体并行导出：当前场景另存为临时快照后，把顶级物体列表分发到多个后台Blender进程。
+    
+    返回:
+    (success, message, exported_files)
+    """
+    top_level_names = [obj.name for obj in bpy.context.scene.objects if obj.parent is None]
+    if not top_level_names:
+        return False, "场景中没有找到顶级物体", []
+    
+    snapshot_dir = tempfile.mkdtemp(prefix="mixtools_export_")
+    try:
+        snapshot_path = HeadlessWorker.save_snapshot(snapshot_dir)
+        jobs = [{'type': 'better_fbx_export', 'targets': shard, 'export_directory': export_directory}
+                for shard in HeadlessWorker.split_into_shards(top_level_names, worker_count)]
+        print(f"并行导出: {len(top_level_names)} 个顶级物体分配到 {len(jobs)} 个后台进程")
+        results = HeadlessWorker.run_worker_pool(jobs, max_workers=worker_count, blend_path=snapshot_path)
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+    
+    succeeded, failed = HeadlessWorker.collect_items(results)
+    exported_files = [item['file'] for item in succeeded]
+    
+    result_message = f"批量导出完成！成功: {len(succeeded)}, 失败: {len(failed)}"
+    if failed:
+        result_message += f"\n错误详情:\n" + "\n".join(f"导出 {item['name']} 失败: {item.get('error')}" for item in failed)
+    print(result_message)
+    
+    return len(succeeded) > 0, result_message, exported_files
+
 # BetterFBX批量导出操作器
 class BETTER_FBX_OT_BatchExportByTopLevel(Operator):
     """按顶级物体批量导出FBX文件"""
@@ -314,13 +364,16 @@ class BETTER_FBX_OT_BatchExportByTopLevel(Operator):
             self.report({'ERROR'}, f"路径验证失败: {str(e)}")
             return {'CANCELLED'}
         
-        # 获取BetterFBX导出设置
-        export_settings = get_better_fbx_export_settings()
-        
         # 执行批量导出
-        success, message, exported_files = batch_export_by_top_level_objects(
-            export_directory, export_settings
-        )
+        if getattr(context.scene, 'export_use_worker_pool', False):
+            worker_count = HeadlessWorker.resolve_worker_count(context.scene.export_worker_count)
+            success, message, exported_files = batch_export_with_worker_pool(export_directory, worker_count)
+        else:
+            # 获取BetterFBX导出设置
+            export_settings = get_better_fbx_export_settings()
+            success, message, exported_files = batch_export_by_top_level_objects(
+                export_directory, export_settings
+            )
         
         if success:
             self.report({'INFO'}, message)
@@ -5,6 +5,9 @@ from bpy.props import StringProperty, EnumProperty
 from bpy_extras.io_utils import ImportHelper
 from bpy.types import Operator
 
+from . import ImportLedger
+from . import FileIndex
+
 # 检查BetterFBX插件是否可用
 def check_better_fbx_available():
     """检查BetterFBX插件是否可用"""
@@ -16,13 +19,14 @@ def check_better_fbx_available():
     except:
         return False
 
-def batch_import_with_better_fbx(file_paths, rename_top_level=False):
+def batch_import_with_better_fbx(file_paths, rename_top_level=False, ledger=None):
     """
     使用BetterFBX插件批量导入FBX文件列表 - 简单逐个导入
     
     参数:
     file_paths: FBX文件路径列表
     rename_top_level: 是否重命名顶级父级为文件名
+    ledger: 导入台账，不为None时记录每个文件导入的顶级物体
     
     返回:
     (success, message)
@@ -51,6 +55,7 @@ def batch_import_with_better_fbx(file_paths, rename_top_level=False):
         try:
             # 记录导入前的对象数量
             objects_before = len(bpy.context.scene.objects)
+            existing_objects = set(bpy.context.scene.objects) if ledger is not None else None
             
             # 直接调用BetterFBX导入器，使用默认设置
             result = bpy.ops.better_import.fbx(filepath=file_path)
@@ -226,6 +231,10 @@ def batch_import_with_better_fbx(file_paths, rename_top_level=False):
                     else:
                         print(f"  → 警告: 导入后对象数量没有增加")
                 
+                if ledger is not None:
+                    ledger.record(file_path, [obj for obj in bpy.context.scene.objects
+                                              if obj not in existing_objects])
+                
                 success_count += 1
             else:
                 print(f"✗ 导入失败: {os.path.basename(file_path)} - Better FBX导入器返回: {result}")
@@ -252,6 +261,36 @@ def batch_import_with_better_fbx(file_paths, rename_top_level=False):
     else:
         return False, f"导入失败，错误: {error_messages[0] if error_messages else '未知错误'}"
 
+def run_batch_import(operator, context, file_paths):
+    """导入操作符的公共流程：同步模式下先按导入台账筛选文件，再批量导入"""
+    scene = context.scene
+    
+    # 获取重命名选项
+    rename_top_level = getattr(scene, 'fbx_rename_top_level', False)
+    
+    # 同步导入：跳过未变化的文件，删除变化文件的旧物体
+    ledger = ImportLedger.create_import_ledger(scene)
+    sync_message = ""
+    if ledger is not None:
+        file_paths, skipped_count, replaced_count = ledger.prepare_sync(file_paths)
+        sync_message = f"，跳过未变化 {skipped_count} 个，替换 {replaced_count} 个"
+        if not file_paths:
+            ledger.save()
+            operator.report({'INFO'}, f"所有文件都没有变化{sync_message}")
+            return {'FINISHED'}
+    
+    # 执行批量导入
+    success, message = batch_import_with_better_fbx(file_paths, rename_top_level, ledger)
+    if ledger is not None:
+        ledger.save()
+    
+    if success:
+        operator.report({'INFO'}, message + sync_message)
+        return {'FINISHED'}
+    else:
+        operator.report({'ERROR'}, message)
+        return {'CANCELLED'}
+
 class BetterFbxBatchImportOperator(Operator):
     """批量导入FBX文件"""
     bl_idname = "better_fbx.batch_import_with_better_fbx"
@@ -295,18 +334,7 @@ class BetterFbxBatchImportOperator(Operator):
             self.report({'WARNING'}, f"在目录 {directory} 中没有找到 {extension} 文件")
             return {'CANCELLED'}
         
-        # 获取重命名选项
-        rename_top_level = getattr(scene, 'fbx_rename_top_level', False)
-        
-        # 执行批量导入
-        success, message = batch_import_with_better_fbx(file_paths, rename_top_level)
-        
-        if success:
-            self.report({'INFO'}, message)
-            return {'FINISHED'}
-        else:
-            self.report({'ERROR'}, message)
-            return {'CANCELLED'}
+        return run_batch_import(self, context, file_paths)
 
 class BetterFbxBatchImportFilesOperator(Operator, ImportHelper):
     """选择多个文件批量导入"""
@@ -337,19 +365,7 @@ class BetterFbxBatchImportFilesOperator(Operator, ImportHelper):
             file_path = os.path.join(os.path.dirname(self.filepath), file.name)
             file_paths.append(file_path)
         
-        # 获取重命名选项
-        scene = context.scene
-        rename_top_level = getattr(scene, 'fbx_rename_top_level', False)
-        
-        # 执行批量导入
-        success, message = batch_import_with_better_fbx(file_paths, rename_top_level)
-        
-        if success:
-            self.report({'INFO'}, message)
-            return {'FINISHED'}
-        else:
-            self.report({'ERROR'}, message)
-            return {'CANCELLED'}
+        return run_batch_import(self, context, file_paths)
 
 class BetterFbxBatchImportByNameListOperator(Operator):
     """按名称列表批量导入"""
@@ -401,33 +417,18 @@ class BetterFbxBatchImportByNameListOperator(Operator):
         else:
             extension = '.fbx'
         
-        # 搜索匹配的文件
-        file_paths = []
-        for root, dirs, files in os.walk(search_directory):
-            for file in files:
-                if file.lower().endswith(extension.lower()):
-                    file_name = os.path.splitext(file)[0]
-                    for name in names:
-                        if name in file_name:
-                            file_paths.append(os.path.join(root, file))
-                            break
+        # 通过缓存的文件名索引查找匹配的文件，目录未变化时不再遍历目录树
+        match_mode = getattr(scene, 'fbx_name_match_mode', FileIndex.MATCH_CONTAINS)
+        file_index = FileIndex.get_file_index(search_directory, extension)
+        file_paths, missing_names = file_index.lookup_many(names, match_mode)
+        if missing_names:
+            print(f"没有找到匹配文件的名称: {', '.join(missing_names)}")
         
         if not file_paths:
             self.report({'WARNING'}, f"在目录 {search_directory} 中没有找到匹配的文件")
             return {'CANCELLED'}
         
-        # 获取重命名选项
-        rename_top_level = getattr(scene, 'fbx_rename_top_level', False)
-        
-        # 执行批量导入
-        success, message = batch_import_with_better_fbx(file_paths, rename_top_level)
-        
-        if success:
-            self.report({'INFO'}, message)
-            return {'FINISHED'}
-        else:
-            self.report({'ERROR'}, message)
-            return {'CANCELLED'}
+        return run_batch_import(self, context, file_paths)
 
 # 为了兼容面板中的操作符ID，添加别名操作符
 class BetterFbxBatchImportAliasOperator(Operator):
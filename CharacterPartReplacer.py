@@ -1,13 +1,23 @@
 import bpy
 import os
+import re
 import random
 from pathlib import Path
 import json
+from collections import OrderedDict
+
+from . import utils
 
 # 定义关键词列表
 GENDER_KEYWORDS = ['male', 'female', 'm', 'f']
 BODY_PART_KEYWORDS = ['Upper', 'Lower', 'Hair', 'Nose', 'Eyes', 'Mouse', 'Bottom', 'Top', 'Feet','Eyebrow']
 
+# 同时保留在内存中的已加载部件数，超出时释放最久未使用的部件
+MAX_LOADED_VARIANTS = 16
+
+# Blender自动添加的序号后缀（如 .001），共享材质时忽略
+SERIAL_SUFFIX_PATTERN = re.compile(r'\.\d{3}$')
+
 class CharacterPartReplacer:
     """角色部件替换器"""
     
@@ -15,32 +25,32 @@ class CharacterPartReplacer:
         self.source_file_path = source_file_path
         self.source_objects = {}
         self.current_indices = {}  # 存储每个组合的当前索引
+        self.loaded_variants = OrderedDict()  # 已加载网格的部件，按最近使用排序
+        self.pinned_variants = set()  # 批量替换计划正在使用、不能释放的部件名称
+        self.shared_materials = {}  # (材质基础名称, 节点签名) -> 共享材质
+        self.material_keys = {}  # 源材质 session_uid -> 共享材质键
         self.load_source_objects()
     
     def cleanup(self):
         """清理资源，释放内存 - 优化版本"""
         try:
-            # 快速清理，减少打印和检查
-            for (gender, body_part), objects in self.source_objects.items():
-                for obj_data in objects:
-                    # 直接清理网格数据
-                    if 'mesh_data' in obj_data and obj_data['mesh_data']:
-                        try:
-                            mesh = obj_data['mesh_data']
-                            bpy.data.meshes.remove(mesh, do_unlink=True)
-                        except:
-                            pass
-                    
-                    # 直接清理材质数据
-                    if 'materials' in obj_data:
-                        for mat in obj_data['materials']:
-                            try:
-                                if mat:
-                                    bpy.data.materials.remove(mat, do_unlink=True)
-                            except:
-                                pass
+            # 只有已加载的部件持有网格和材质数据
+            self.pinned_variants.clear()
+            for obj_data in list(self.loaded_variants.values()):
+                self.unload_variant(obj_data)
+            
+            # 共享材质仍被场景中替换后的对象使用时保留
+            for mat in self.shared_materials.values():
+                try:
+                    if mat.users == 0:
+                        bpy.data.materials.remove(mat, do_unlink=True)
+                except ReferenceError:
+                    pass
             
             # 清空数据字典
+            self.shared_materials.clear()
+            self.material_keys.clear()
+            self.loaded_variants.clear()
             self.source_objects.clear()
             self.current_indices.clear()
             
@@ -59,60 +69,128 @@ class CharacterPartReplacer:
         try:
             print(f"开始加载源文件: {self.source_file_path}")
             
-            # 使用链接方式加载源文件
+            # 只读取对象名称，网格和材质在第一次使用时再追加
             with bpy.data.libraries.load(self.source_file_path, link=False) as (data_from, data_to):
-                # 加载所有网格对象
-                data_to.objects = [name for name in data_from.objects if name in data_from.meshes]
-            
-            print(f"从源文件加载了 {len(data_to.objects)} 个对象")
-            
-            # 收集源文件中的对象数据
-            for obj in data_to.objects:
-                if obj and obj.type == 'MESH':
-                    try:
-                        keywords = self.extract_keywords(obj.name)
-                        if keywords:
-                            gender, body_part = keywords
-                            key = (gender, body_part)
-                            if key not in self.source_objects:
-                                self.source_objects[key] = []
-                            
-                            # 复制对象数据 - 简化版本
-                            mesh_data = obj.data.copy()
-                            
-                            # 复制材质数据 - 简化版本
-                            materials = []
-                            for mat in obj.data.materials:
-                                if mat:
-                                    # 简单复制，不创建复杂的独立副本
-                                    materials.append(mat.copy())
-                            
-                            self.source_objects[key].append({
-                                'name': obj.name,
-                                'mesh_data': mesh_data,
-                                'materials': materials,
-                                'original_obj': obj
-                            })
-                            print(f"  添加对象: {obj.name} -> {gender} {body_part}")
-                    except Exception as e:
-                        print(f"处理对象 {obj.name} 时出错: {str(e)}")
-                        continue
+                mesh_object_names = [name for name in data_from.objects if name in data_from.meshes]
+            
+            print(f"源文件中有 {len(mesh_object_names)} 个网格对象")
+            
+            for name in mesh_object_names:
+                keywords = self.extract_keywords(name)
+                if keywords:
+                    gender, body_part = keywords
+                    key = (gender, body_part)
+                    if key not in self.source_objects:
+                        self.source_objects[key] = []
+                    
+                    self.source_objects[key].append({
+                        'name': name,
+                        'mesh_data': None,
+                        'materials': None
+                    })
+                    print(f"  添加对象: {name} -> {gender} {body_part}")
             
             print(f"成功处理了 {sum(len(objs) for objs in self.source_objects.values())} 个对象")
             
-            # 清理临时对象
-            for obj in data_to.objects:
-                if obj:
-                    try:
-                        bpy.data.objects.remove(obj, do_unlink=True)
-                    except Exception as e:
-                        print(f"清理对象 {obj.name} 时出错: {str(e)}")
-                        
         except Exception as e:
             print(f"加载源文件时出错: {str(e)}")
             import traceback
             traceback.print_exc()
     
+    def is_variant_loaded(self, obj_data):
+        """部件的网格数据已加载且未被删除（例如被清理孤立数据）"""
+        mesh = obj_data.get('mesh_data')
+        if mesh is None:
+            return False
+        try:
+            mesh.name
+            return True
+        except ReferenceError:
+            return False
+    
+    def load_variant(self, obj_data):
+        """确保部件的网格和材质已加载，返回部件数据；加载失败返回None"""
+        name = obj_data['name']
+        if self.is_variant_loaded(obj_data):
+            self.loaded_variants.move_to_end(name)
+            return obj_data
+        
+        self.loaded_variants.pop(name, None)
+        try:
+            # 只追加这一个对象，网格和材质随之追加
+            with bpy.data.libraries.load(self.source_file_path, link=False) as (data_from, data_to):
+                data_to.objects = [name]
+            
+            obj = data_to.objects[0] if data_to.objects else None
+            if obj is None or obj.type != 'MESH':
+                print(f"无法从源文件加载对象: {name}")
+                return None
+            
+            obj_data['mesh_data'] = obj.data
+            obj_data['materials'] = [mat for mat in obj.data.materials if mat]
+            
+            # 只保留网格和材质，移除临时对象
+            bpy.data.objects.remove(obj, do_unlink=True)
+        except Exception as e:
+            print(f"加载对象 {name} 时出错: {str(e)}")
+            return None
+        
+        self.loaded_variants[name] = obj_data
+        print(f"  已加载部件: {name}")
+        
+        # 刚加载的部件即将被使用，不参与释放
+        self.evict_variants(keep=name)
+        return obj_data
+    
+    def evict_variants(self, keep=None):
+        """释放超出上限的最久未使用部件，被替换计划固定的部件暂不释放"""
+        for name in list(self.loaded_variants):
+            if len(self.loaded_variants) <= MAX_LOADED_VARIANTS:
+                break
+            if name != keep and name not in self.pinned_variants:
+                self.unload_variant(self.loaded_variants[name])
+    
+    def unload_variant(self, obj_data):
+        """释放部件的网格和材质，之后再使用时重新加载"""
+        self.loaded_variants.pop(obj_data['name'], None)
+        mesh = obj_data.get('mesh_data')
+        materials = obj_data.get('materials') or []
+        obj_data['mesh_data'] = None
+        obj_data['materials'] = None
+        
+        try:
+            if mesh is not None and mesh.users == 0:
+                bpy.data.meshes.remove(mesh, do_unlink=True)
+        except ReferenceError:
+            pass
+        
+        # 材质可能被其他部件共用，只删除已没有用户的
+        for mat in materials:
+            try:
+                if mat.users == 0:
+                    bpy.data.materials.remove(mat, do_unlink=True)
+            except ReferenceError:
+                pass
+    
+    def get_shared_material(self, mat):
+        """按材质基础名称和节点签名返回共享的材质副本，相同材质只复制一次"""
+        key = self.material_keys.get(mat.session_uid)
+        if key is None:
+            key = (SERIAL_SUFFIX_PATTERN.sub('', mat.name), utils.get_material_signature(mat))
+            self.material_keys[mat.session_uid] = key
+        
+        shared = self.shared_materials.get(key)
+        if shared is not None:
+            try:
+                shared.name
+                return shared
+            except ReferenceError:
+                pass
+        
+        shared = mat.copy()
+        self.shared_materials[key] = shared
+        return shared
+    
     def extract_keywords(self, object_name):
         """从对象名称中提取性别和部位关键词（不区分大小写）"""
         name_lower = object_name.lower()
@@ -175,7 +253,7 @@ class CharacterPartReplacer:
             current_index = (current_index - 1) % len(objects)
         
         self.current_indices[key] = current_index
-        return objects[current_index]
+        return self.load_variant(objects[current_index])
     
     def get_replacement_object_random(self, gender, body_part):
         """随机获取替换对象"""
@@ -184,12 +262,10 @@ class CharacterPartReplacer:
             return None
         
         objects = self.source_objects[key]
-        return random.choice(objects)
+        return self.load_variant(random.choice(objects))
     
-    def get_safe_object_name(self, desired_name):
-        """生成安全的对象名称，避免冲突和特殊字符"""
-        import re
-        
+    def sanitize_object_name(self, desired_name):
+        """清理名称中的特殊字符，得到合法的对象名称（不检查重名）"""
         # 清理名称中的特殊字符
         safe_name = re.sub(r'[^\w\-_.]', '_', desired_name)
         
@@ -201,10 +277,13 @@ class CharacterPartReplacer:
         if not safe_name:
             safe_name = 'ReplacedObject'
         
-        # 检查名称是否已存在，如果存在则添加后缀
+        return safe_name
+    
+    def allocate_unique_name(self, safe_name, taken_names):
+        """在已占用名称之外分配名称，已存在时添加后缀"""
         counter = 1
         original_name = safe_name
-        while safe_name in bpy.data.objects:
+        while safe_name in taken_names:
             safe_name = f"{original_name}_{counter:03d}"
             counter += 1
             # 防止无限循环
@@ -214,15 +293,31 @@ class CharacterPartReplacer:
         
         return safe_name
     
-
+    def get_safe_object_name(self, desired_name):
+        """生成安全的对象名称，避免冲突和特殊字符"""
+        return self.allocate_unique_name(self.sanitize_object_name(desired_name), bpy.data.objects)
     
-    def verify_object_independence(self, obj):
+    def build_new_materials(self, replacement_data, share_materials):
+        """为一次替换准备材质列表：共享模式下相同材质只复制一次，否则每次替换单独复制"""
+        new_materials = []
+        for mat in replacement_data.get('materials') or []:
+            if mat:
+                if share_materials:
+                    new_materials.append(self.get_shared_material(mat))
+                else:
+                    new_materials.append(mat.copy())
+        return new_materials
+    
+    def verify_object_independence(self, obj, check_materials=True):
         """验证对象数据的独立性 - 简化版本"""
         try:
             # 简化检查，只检查基本的数据独立性
             if obj.data.users > 1:
                 return False
             
+            if not check_materials:
+                return True
+            
             for mat in obj.data.materials:
                 if mat and mat.users > 1:
                     return False
@@ -289,6 +384,91 @@ class CharacterPartReplacer:
             print(f"随机替换对象 {target_obj.name} 时出错: {str(e)}")
             return False
     
+    def build_replacement_plan(self, target_objs, direction=0):
+        """为一批对象计算替换计划
+        
+        计划中用到的部件会被固定，执行完计划前不会被LRU释放，
+        调用方需要在执行后调用 release_pinned_variants。
+        
+        Returns:
+            tuple: ([(目标对象, 替换数据), ...], 能提取到关键词的对象数量)
+        """
+        plan = []
+        matched_count = 0
+        for target_obj in target_objs:
+            # 设置当前对象用于父级名称检查
+            self.current_obj = target_obj
+            keywords = self.extract_keywords(target_obj.name)
+            if not keywords:
+                continue
+            matched_count += 1
+            replacement_data = self.get_replacement_object(*keywords, direction)
+            if replacement_data:
+                self.pinned_variants.add(replacement_data['name'])
+                plan.append((target_obj, replacement_data))
+            else:
+                print(f"未找到匹配的替换对象: {keywords[0]}, {keywords[1]}")
+        return plan, matched_count
+    
+    def apply_replacement_plan(self, plan, replace_name=True):
+        """批量执行替换计划
+        
+        与逐个调用 perform_replacement 相比：新名称从一次名称快照中统一分配，
+        网格数据逐个交换后只更新一次视图层，替换下来的旧网格最后一次性删除。
+        
+        Returns:
+            int: 成功替换的对象数量
+        """
+        share_materials = getattr(bpy.context.scene, 'share_replacement_materials', False)
+        taken_names = set(bpy.data.objects.keys())
+        old_meshes = set()
+        replaced = []
+        
+        for target_obj, replacement_data in plan:
+            try:
+                new_mesh = replacement_data['mesh_data'].copy()
+                new_materials = self.build_new_materials(replacement_data, share_materials)
+                
+                old_meshes.add(target_obj.data)
+                target_obj.data = new_mesh
+                new_mesh.materials.clear()
+                for mat in new_materials:
+                    new_mesh.materials.append(mat)
+                replaced.append((target_obj, replacement_data))
+            except Exception as e:
+                print(f"替换对象 {target_obj.name} 时出错: {str(e)}")
+        
+        # 预先分配所有新名称，避免逐个在 bpy.data.objects 中探测
+        if replace_name:
+            for target_obj, replacement_data in replaced:
+                taken_names.discard(target_obj.name)
+                new_name = self.allocate_unique_name(
+                    self.sanitize_object_name(replacement_data['name']), taken_names)
+                taken_names.add(new_name)
+                target_obj.name = new_name
+        
+        # 只删除不再被使用的旧网格
+        unused_meshes = [mesh for mesh in old_meshes if mesh.users == 0]
+        if unused_meshes:
+            bpy.data.batch_remove(unused_meshes)
+        
+        bpy.context.view_layer.update()
+        print(f"批量替换完成: {len(replaced)}/{len(plan)} 个对象, 删除旧网格 {len(unused_meshes)} 个")
+        return len(replaced)
+    
+    def replace_objects_batch(self, target_objs, direction=0, replace_name=True):
+        """计算整批替换计划后一次性执行，返回 (成功数量, 能提取到关键词的对象数量)"""
+        try:
+            plan, matched_count = self.build_replacement_plan(target_objs, direction)
+            return self.apply_replacement_plan(plan, replace_name), matched_count
+        finally:
+            self.release_pinned_variants()
+    
+    def release_pinned_variants(self):
+        """取消部件固定，并释放超出上限的部件"""
+        self.pinned_variants.clear()
+        self.evict_variants()
+    
     def perform_replacement(self, target_obj, replacement_data, replace_name=True):
         """执行实际的替换操作"""
         try:
@@ -316,16 +496,9 @@ class CharacterPartReplacer:
                 if new_mesh.users > 1:
                     new_mesh = new_mesh.copy()
                 
-                # 创建新的材质列表 - 简化版本
-                new_materials = []
-                if 'materials' in replacement_data and replacement_data['materials']:
-                    for mat in replacement_data['materials']:
-                        if mat:
-                            # 简单复制材质
-                            new_materials.append(mat.copy())
-                
-                # 清除目标对象的材质
-                target_obj.data.materials.clear()
+                # 创建新的材质列表
+                share_materials = getattr(bpy.context.scene, 'share_replacement_materials', False)
+                new_materials = self.build_new_materials(replacement_data, share_materials)
                 
                 # 保存旧网格数据用于清理
                 old_mesh = target_obj.data
@@ -333,7 +506,8 @@ class CharacterPartReplacer:
                 # 替换网格数据
                 target_obj.data = new_mesh
                 
-                # 应用新材质
+                # 用新材质替换网格副本上的源材质
+                target_obj.data.materials.clear()
                 for mat in new_materials:
                     target_obj.data.materials.append(mat)
                 
@@ -373,7 +547,7 @@ class CharacterPartReplacer:
                 print(f"更新对象时出错: {str(e)}")
             
             # 验证替换后对象的独立性
-            if self.verify_object_independence(target_obj):
+            if self.verify_object_independence(target_obj, check_materials=not share_materials):
                 print(f"对象数据独立性验证通过: {original_name}")
             else:
                 print(f"警告: 对象数据独立性验证失败: {original_name}")
@@ -427,6 +601,7 @@ class CharacterPartReplacerPanel(bpy.types.Panel):
         box = layout.box()
         box.prop(scene, "source_file_path", text="源文件路径")
         box.prop(scene, "replace_object_name", text="同时替换对象名称")
+        box.prop(scene, "share_replacement_materials", text="共享相同材质")
         row = box.row()
         row.operator("object.load_source_objects", text="加载源文件", icon='FILE_REFRESH')
         
@@ -569,19 +744,11 @@ class ReplaceAllPartsOperator(bpy.types.Operator):
             return {'CANCELLED'}
         
         replacer = _character_replacer_instance
-        success_count = 0
-        total_count = 0
         
-        for obj in bpy.data.objects:
-            if obj.type == 'MESH':
-                keywords = replacer.extract_keywords(obj.name)
-                if keywords:
-                    total_count += 1
-                    try:
-                        if replacer.replace_object(obj):
-                            success_count += 1
-                    except Exception as e:
-                        print(f"替换对象 {obj.name} 时出错: {str(e)}")
+        # 先计算整批替换计划，再一次性执行
+        mesh_objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+        success_count, total_count = replacer.replace_objects_batch(
+            mesh_objects, replace_name=getattr(context.scene, 'replace_object_name', True))
         
         if total_count == 0:
             self.report({'WARNING'}, "场景中未找到匹配的对象")
@@ -703,6 +870,12 @@ def register():
         default=True
     )
     
+    bpy.types.Scene.share_replacement_materials = bpy.props.BoolProperty(
+        name="共享相同材质",
+        description="替换时名称（忽略.001等后缀）和节点内容都相同的材质只复制一份，由所有替换后的对象共用",
+        default=False
+    )
+    
     # 注册退出时的清理函数
     import atexit
     atexit.register(cleanup_on_exit)
@@ -719,6 +892,7 @@ def unregister():
     # 删除场景属性
     del bpy.types.Scene.source_file_path
     del bpy.types.Scene.replace_object_name
+    del bpy.types.Scene.share_replacement_materials
     
     # 清理全局变量
     global _character_replacer_instance
@@ -2,7 +2,17 @@ import bpy
 import os
 import math
 import time  # 添加时间模块以便测量性能
+import json
+import shutil
+import hashlib
+import tempfile
 import mathutils
+import numpy as np
+from bpy.app.handlers import persistent
+
+from . import HeadlessWorker
+from . import ObjWriter
+from .utils import get_material_signature
 
 # 检测Blender版本
 def get_blender_version():
@@ -81,6 +91,10 @@ EXPORT_CONFIGS = {
 # 批处理大小常量
 BATCH_SIZE = 10
 
+# 增量导出清单文件名（保存在导出目录中）
+EXPORT_MANIFEST_NAME = ".mixtools_export_manifest.json"
+EXPORT_MANIFEST_VERSION = 2
+
 def check_dir(self, context):
     dest_path = bpy.path.abspath(context.scene.export_directory)
     if not os.path.isabs(dest_path):
@@ -120,7 +134,11 @@ def get_unit_scale(unit):
     }
     return unit_scales.get(unit, 1.0)
 
-def export_fbx(obj, dest_path, config_name='default'):
+def export_fbx(obj, dest_path, config_name='default', hide_lights=True):
+    """
+    应用配置中的旋转和缩放后导出FBX，导出后恢复根物体的变换。
+    批量导出时由调用方统一隐藏灯光，传入 hide_lights=False。
+    """
     fbx_file_ext = ".fbx"
     fbx_file_path = os.path.join(dest_path, obj.name + fbx_file_ext)
 
@@ -134,16 +152,10 @@ def export_fbx(obj, dest_path, config_name='default'):
     original_matrix = obj.matrix_world.copy()
     
     # 临时隐藏灯光对象以避免Blender 4.3的API兼容性问题
-    hidden_lights = []
-    if is_blender_4_3_or_newer():
-        for light_obj in bpy.context.scene.objects:
-            if light_obj.type in {'LIGHT', 'LAMP'}:
-                if light_obj.hide_viewport == False:
-                    light_obj.hide_viewport = True
-                    hidden_lights.append(light_obj)
+    hidden_lights = hide_scene_lights() if hide_lights else []
     
     # 如果需要排除顶级空物体
-    if bpy.context.scene.clear_parent_on_export and obj.type == 'EMPTY' and obj.parent is None:
+    if is_export_root_excluded(obj):
         # 保存所有子物体的世界空间变换
         child_matrices = {}
         for child in obj.children:
@@ -189,31 +201,11 @@ def export_fbx(obj, dest_path, config_name='default'):
         else:
             fbx_file_path = os.path.join(dest_path, obj.name + "_children" + fbx_file_ext)
         
-        # 更新导出参数
-        export_params = config.fbx_params.copy()
-        # 移除自定义参数
-        export_params.pop('rotation', None)
-        export_params.pop('apply_rotation', None)
-        export_params.pop('apply_unit_scale', None)
-        export_params.pop('global_scale', None)
-        
-        # 设置导出参数，不再使用FBX的缩放功能
-        export_params.update({
-            'bake_space_transform': True,  # 烘焙空间变换
-            'use_space_transform': True,  # 使用空间变换
-            'global_scale': 1.0,  # 设为1.0，因为我们已经手动应用了缩放
-            'apply_scale_options': 'FBX_SCALE_ALL'  # 应用所有缩放
-        })
-        
-        # 在Blender 4.3+版本中添加object_types参数来排除灯光对象
-        if is_blender_4_3_or_newer():
-            export_params['object_types'] = {'MESH', 'ARMATURE', 'EMPTY'}
-
-        # 使用配置参数导出
+        # 使用配置参数导出，不再使用FBX的缩放功能
         bpy.ops.export_scene.fbx(
             filepath=fbx_file_path,
             use_selection=True,
-            **export_params
+            **get_fbx_export_params(config)
         )
         
         # 恢复子物体的原始变换
@@ -247,31 +239,11 @@ def export_fbx(obj, dest_path, config_name='default'):
         # 重新选择对象
         obj.select_set(True)
 
-    # 更新导出参数
-    export_params = config.fbx_params.copy()
-    # 移除自定义参数
-    export_params.pop('rotation', None)
-    export_params.pop('apply_rotation', None)
-    export_params.pop('apply_unit_scale', None)
-    export_params.pop('global_scale', None)
-    
-    # 设置导出参数，不再使用FBX的缩放功能
-    export_params.update({
-        'bake_space_transform': True,  # 烘焙空间变换
-        'use_space_transform': True,  # 使用空间变换
-        'global_scale': 1.0,  # 设为1.0，因为我们已经手动应用了缩放
-        'apply_scale_options': 'FBX_SCALE_ALL'  # 应用所有缩放
-    })
-    
-    # 在Blender 4.3+版本中添加object_types参数来排除灯光对象
-    if is_blender_4_3_or_newer():
-        export_params['object_types'] = {'MESH', 'ARMATURE', 'EMPTY'}
-
-    # 使用配置参数导出
+    # 使用配置参数导出，不再使用FBX的缩放功能
     bpy.ops.export_scene.fbx(
         filepath=fbx_file_path,
         use_selection=True,
-        **export_params
+        **get_fbx_export_params(config)
     )
 
     # 恢复原始变换和父级关系
@@ -282,15 +254,193 @@ def export_fbx(obj, dest_path, config_name='default'):
         obj.matrix_world = original_matrix
     
     # 恢复灯光对象的可见性
-    if is_blender_4_3_or_newer():
-        for light_obj in hidden_lights:
-            light_obj.hide_viewport = False
+    restore_scene_lights(hidden_lights)
 
     return fbx_file_path
 
 def export_fbx_max(obj, dest_path):
     return export_fbx(obj, dest_path, config_name='max')
 
+def is_export_root_excluded(obj):
+    """启用了清除父级且根物体为顶级空物体时，只导出其直接子物体"""
+    return bpy.context.scene.clear_parent_on_export and obj.type == 'EMPTY' and obj.parent is None
+
+def get_fbx_export_params(config):
+    """把导出配置转换为 export_scene.fbx 的参数，缩放和旋转已由导出流程处理"""
+    export_params = config.fbx_params.copy()
+    # 移除自定义参数
+    export_params.pop('rotation', None)
+    export_params.pop('apply_rotation', None)
+    export_params.pop('apply_unit_scale', None)
+    export_params.pop('global_scale', None)
+    
+    export_params.update({
+        'bake_space_transform': True,
+        'use_space_transform': True,
+        'global_scale': 1.0,
+        'apply_scale_options': 'FBX_SCALE_ALL'
+    })
+    
+    # 在Blender 4.3+版本中添加object_types参数来排除灯光对象
+    if is_blender_4_3_or_newer():
+        export_params['object_types'] = {'MESH', 'ARMATURE', 'EMPTY'}
+    return export_params
+
+# 非破坏性导出支持的物体类型：数据可以直接用矩阵变换
+NON_DESTRUCTIVE_EXPORT_TYPES = {'MESH', 'ARMATURE', 'EMPTY'}
+
+# 非破坏性导出时原物体和原数据的临时名称前缀，导出文件中使用原名称。
+# 临时名称必须足够短：在原名称后加后缀可能超过Blender的63字节名称上限而被截断
+EXPORT_SOURCE_PLACEHOLDER = "__mx"
+
+def can_export_non_destructive(objects):
+    """
+    判断层级能否走非破坏性导出。
+    带动画、约束、骨骼/顶点父级或其他类型物体的层级，导出结果依赖场景求值，仍使用原有流程。
+    """
+    for obj in objects:
+        if obj.type not in NON_DESTRUCTIVE_EXPORT_TYPES:
+            return False
+        if obj.parent is not None and obj.parent_type != 'OBJECT':
+            return False
+        if obj.constraints:
+            return False
+        if obj.animation_data and obj.animation_data.action:
+            return False
+    return True
+
+def compute_export_matrices(root, objects, config, exclude_root):
+    """
+    计算每个物体导出时的世界矩阵和需要烘焙进物体数据的矩阵。
+    结果与 prepare_obj_export + export_fbx 的 transform_apply 流程一致：
+    根物体旋转先被替换为 X-90° 并连同缩放烘焙进数据，再套用配置中的旋转和单位缩放，
+    apply_rotation 为真时配置旋转烘焙进数据，否则保留在物体上。
+
+    Returns:
+        dict - {物体: (导出世界矩阵, 烘焙矩阵)}
+    """
+    fbx_params = config.fbx_params
+    rotation = fbx_params.get('rotation', (0, 0, 0))
+    rotation_matrix = mathutils.Euler([math.radians(angle) for angle in rotation]).to_matrix().to_4x4()
+    scale_factor = fbx_params.get('global_scale', 1.0) if fbx_params.get('apply_unit_scale', False) else 1.0
+    if fbx_params.get('apply_rotation', True):
+        bake_rotation, keep_rotation = rotation_matrix, mathutils.Matrix.Identity(4)
+    else:
+        bake_rotation, keep_rotation = mathutils.Matrix.Identity(4), rotation_matrix
+    
+    root_location, _, root_scale = root.matrix_world.decompose()
+    prepared_root = (mathutils.Matrix.Translation(root_location) @
+                     mathutils.Matrix.Rotation(math.radians(-90), 4, 'X') @
+                     mathutils.Matrix.Diagonal(root_scale.to_4d()))
+    prepared_from_original = prepared_root @ root.matrix_world.inverted_safe()
+    
+    # 排除根物体时缩放作用在每个子物体自身，位置不随缩放变化
+    position_scale = 1.0 if exclude_root else scale_factor
+    object_matrix = keep_rotation @ mathutils.Matrix.Scale(scale_factor, 4)
+    
+    matrices = {}
+    for obj in objects:
+        prepared = prepared_from_original @ obj.matrix_world
+        offset = (prepared.to_translation() - root_location) * position_scale
+        location = root_location + rotation_matrix.to_3x3() @ offset
+        world = mathutils.Matrix.Translation(location) @ object_matrix
+        bake = bake_rotation @ prepared.to_3x3().to_4x4()
+        matrices[obj] = (world, bake)
+    return matrices
+
+def create_export_copies(objects, matrices, collection):
+    """为导出物体创建临时副本：复制数据并烘焙矩阵，重建副本之间的父子关系"""
+    copies = {}
+    for obj in objects:
+        copy = obj.copy()
+        if obj.data is not None:
+            copy.data = obj.data.copy()
+        collection.objects.link(copy)
+        copies[obj] = copy
+    
+    for obj, copy in copies.items():
+        world, bake = matrices[obj]
+        if copy.type == 'MESH':
+            copy.data.transform(bake, shape_keys=True)
+        elif copy.type == 'ARMATURE':
+            copy.data.transform(bake)
+        
+        parent_copy = copies.get(obj.parent)
+        copy.parent = parent_copy
+        copy.matrix_parent_inverse = mathutils.Matrix.Identity(4)
+        if parent_copy is not None:
+            copy.matrix_basis = matrices[obj.parent][0].inverted_safe() @ world
+        else:
+            copy.matrix_basis = world
+        
+        # 修改器引用层级内物体（如骨骼修改器）时改为引用副本
+        for modifier in copy.modifiers:
+            target = getattr(modifier, 'object', None)
+            if target in copies:
+                modifier.object = copies[target]
+    return copies
+
+def export_fbx_non_destructive(obj, dest_path, config_name='Unity'):
+    """
+    不修改场景的层级导出：在临时集合中创建烘焙了导出变换的副本，
+    副本临时使用原物体和原数据的名称，导出后删除副本并恢复名称。
+    没有可导出物体时返回None。
+    """
+    config = EXPORT_CONFIGS[config_name]
+    exclude_root = is_export_root_excluded(obj)
+    if exclude_root:
+        objects = list(obj.children)
+        if len(objects) == 1:
+            fbx_file_path = os.path.join(dest_path, objects[0].name + ".fbx")
+        else:
+            fbx_file_path = os.path.join(dest_path, obj.name + "_children.fbx")
+    else:
+        objects = [obj] + list(obj.children_recursive)
+        fbx_file_path = os.path.join(dest_path, obj.name + ".fbx")
+    if not objects:
+        return None
+    
+    matrices = compute_export_matrices(obj, objects, config, exclude_root)
+    collection = bpy.data.collections.new("MixTools_Export_Temp")
+    bpy.context.scene.collection.children.link(collection)
+    renamed = {}  # 数据块指针 -> (数据块, 原名称)
+    copies = {}
+    try:
+        copies = create_export_copies(objects, matrices, collection)
+        
+        # 原物体和原数据改用短的临时名称，副本使用原名称，保证导出文件中的物体和网格名称不变
+        for source, copy in copies.items():
+            name = source.name
+            renamed[source.as_pointer()] = (source, name)
+            source.name = f"{EXPORT_SOURCE_PLACEHOLDER}{len(renamed)}"
+            copy.name = name
+            # 多个物体共用数据时只有第一个副本使用原数据名称
+            if source.data is not None and source.data.as_pointer() not in renamed:
+                data_name = source.data.name
+                renamed[source.data.as_pointer()] = (source.data, data_name)
+                source.data.name = f"{EXPORT_SOURCE_PLACEHOLDER}{len(renamed)}"
+                copy.data.name = data_name
+        
+        bpy.ops.object.select_all(action='DESELECT')
+        for copy in copies.values():
+            copy.select_set(True)
+        
+        bpy.ops.export_scene.fbx(
+            filepath=fbx_file_path,
+            use_selection=True,
+            **get_fbx_export_params(config)
+        )
+    finally:
+        temporary_ids = [collection]
+        for copy in copies.values():
+            temporary_ids.append(copy)
+            if copy.data is not None:
+                temporary_ids.append(copy.data)
+        bpy.data.batch_remove(temporary_ids)
+        for source, name in renamed.values():
+            source.name = name
+    return fbx_file_path
+
 def apply_transform_to_descendants(obj):
     # 创建一个副本而不是每次都深度复制数据
     if obj.data and obj.data.users > 1:
@@ -304,16 +454,447 @@ def apply_transform_to_descendants(obj):
     # 递归处理子对象
     for child in obj.children:
         apply_transform_to_descendants(child)
+
+def export_parent_hierarchy(obj, dest_path, config_name='Unity'):
+    """
+    导出顶级父物体及其所有子物体，没有可导出物体时返回None。
+    层级支持时使用非破坏性导出，否则选择层级、应用导出变换后导出。
+    灯光由调用方在整批导出前统一隐藏。
+    """
+    if can_export_non_destructive([obj] + list(obj.children_recursive)):
+        return export_fbx_non_destructive(obj, dest_path, config_name)
+    
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    for child in obj.children_recursive:
+        child.select_set(True)
+
+    prepare_obj_export(obj, True)
+
+    if not bpy.context.selected_objects:
+        return None
+    return export_fbx(obj, dest_path, config_name, hide_lights=False)
+
+def export_mesh_with_parent(parent, obj, dest_path):
+    """导出单个网格物体（连同场景中的骨骼等非网格物体），文件名为 父级名_物体名"""
+    # 取消选择所有对象
+    bpy.ops.object.select_all(action='DESELECT')
+    
+    # 选择当前的 mesh 对象
+    obj.select_set(True)
+
+    # 选择非 mesh 类型的对象 (骨骼等)
+    for other_obj in bpy.context.scene.objects:
+        if other_obj.type != 'MESH':
+            other_obj.select_set(True)
+
+    # 设置导出文件路径
+    file_path = os.path.join(dest_path, f"{parent.name}_{obj.name}.fbx")
+
+    # 使用优化的参数导出
+    export_params = {
+        'filepath': file_path,
+        'use_selection': True,
+        'global_scale': 0.01,
+        'apply_unit_scale': True,
+        'axis_forward': '-Z',
+        'axis_up': 'Y',
+        'use_space_transform': True,
+        'bake_space_transform': True,
+        'mesh_smooth_type': 'FACE',
+        'use_custom_props': False,  # 不导出自定义属性
+        'add_leaf_bones': False     # 不添加叶骨骼
+    }
+    
+    # 在Blender 4.3+版本中添加object_types参数来排除灯光对象
+    if is_blender_4_3_or_newer():
+        export_params['object_types'] = {'MESH', 'ARMATURE', 'EMPTY'}
+    
+    bpy.ops.export_scene.fbx(**export_params)
+    return file_path
+
+def export_collection_object(obj, collection_dir):
+    """把集合中的单个物体导出到集合对应的文件夹"""
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    fbx_path = os.path.join(collection_dir, obj.name + ".fbx")
+    bpy.ops.export_scene.fbx(
+        filepath=fbx_path, 
+        use_selection=True, 
+        global_scale=0.01,
+        object_types={'MESH', 'ARMATURE', 'EMPTY'}
+    )
+    return fbx_path
+
+def hide_scene_lights():
+    """临时隐藏灯光对象以避免Blender 4.3的API兼容性问题，返回被隐藏的灯光列表"""
+    hidden_lights = []
+    if is_blender_4_3_or_newer():
+        for light_obj in bpy.context.scene.objects:
+            if light_obj.type in {'LIGHT', 'LAMP'}:
+                if light_obj.hide_viewport == False:
+                    light_obj.hide_viewport = True
+                    hidden_lights.append(light_obj)
+    return hidden_lights
+
+def restore_scene_lights(hidden_lights):
+    """恢复灯光对象的可见性"""
+    for light_obj in hidden_lights:
+        light_obj.hide_viewport = False
+
+def get_target_name(target):
+    """导出条目的显示名称：顶级物体名称，或 父级/物体、集合/物体"""
+    return target if isinstance(target, str) else "/".join(target)
+
+def get_target_objects(mode, target):
+    """导出条目实际包含的物体列表"""
+    objects = bpy.data.objects
+    if mode in ('parent', 'parent_max'):
+        root = objects[target]
+        return [root] + list(root.children_recursive)
+    if mode == 'mesh':
+        # 网格模式会连同场景中的骨骼等非网格物体一起导出
+        return [objects[target[1]]] + [obj for obj in bpy.context.scene.objects if obj.type != 'MESH']
+    return [objects[target[1]]]
+
+def get_export_signature(mode, config_name):
+    """导出模式和导出配置参数的签名，配置改变时所有条目都需要重新导出"""
+    signature = {'mode': mode, 'version': EXPORT_MANIFEST_VERSION}
+    if mode == 'parent':
+        signature['fbx_params'] = EXPORT_CONFIGS[config_name].fbx_params
+    elif mode == 'parent_max':
+        signature['fbx_params'] = EXPORT_CONFIGS['max'].fbx_params
+    if mode in ('parent', 'parent_max'):
+        signature['clear_parent_on_export'] = bool(bpy.context.scene.clear_parent_on_export)
+    return json.dumps(signature, sort_keys=True, default=str)
+
+def _update_digest_with_array(digest, collection, attribute, size, dtype):
+    """用 foreach_get 读取整块属性数据并写入哈希"""
+    data = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attribute, data)
+    digest.update(data.tobytes())
+
+# 网格属性数据类型 -> (foreach_get 字段, 每个元素的分量数, numpy 类型)
+MESH_ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, np.bool_),
+    'FLOAT2': ("vector", 2, np.float32),
+    'INT32_2D': ("value", 2, np.int32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'QUATERNION': ("value", 4, np.float32),
+    'FLOAT4X4': ("value", 16, np.float32),
+}
+
+def _rna_properties_repr(struct):
+    """结构体（如修改器）所有 RNA 属性和自定义属性值的文本表示，ID 引用只记录名称"""
+    parts = []
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier == 'rna_type' or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, identifier, None)
+        if prop.type == 'POINTER':
+            # 只记录引用的数据块（如骨架、镜像物体），不展开嵌套结构
+            if not isinstance(value, bpy.types.ID):
+                continue
+            value = value.name
+        elif getattr(prop, 'is_array', False):
+            value = np.asarray(value, dtype=np.float64).ravel().tolist()
+        elif isinstance(value, set):
+            # 多选枚举返回集合，排序后才稳定
+            value = sorted(value)
+        parts.append(f"{identifier}={value!r}")
+    # 几何节点修改器的输入保存在自定义属性中
+    for key in struct.keys():
+        value = struct[key]
+        if hasattr(value, 'to_list'):
+            value = value.to_list()
+        elif isinstance(value, bpy.types.ID):
+            value = value.name
+        parts.append(f"[{key}]={value!r}")
+    return "|".join(parts)
+
+def _iter_action_fcurves(action):
+    """遍历动作的所有F曲线，兼容分层动作（Blender 4.4+）"""
+    layers = getattr(action, 'layers', None)
+    if layers:
+        for layer in layers:
+            for strip in layer.strips:
+                for channelbag in getattr(strip, 'channelbags', ()):
+                    yield from channelbag.fcurves
+    else:
+        yield from getattr(action, 'fcurves', ())
+
+def _update_digest_with_action(digest, action):
+    """动作名称和所有关键帧的位置与手柄"""
+    digest.update(action.name.encode('utf-8'))
+    for fcurve in _iter_action_fcurves(action):
+        digest.update(f"{fcurve.data_path}[{fcurve.array_index}]|{fcurve.mute}".encode('utf-8'))
+        keyframes = fcurve.keyframe_points
+        for attribute in ("co", "handle_left", "handle_right"):
+            _update_digest_with_array(digest, keyframes, attribute, 2, np.float32)
+
+# 本会话中网格的更新次数：网格 session_uid -> 计数，由依赖图更新处理器递增
+_mesh_update_counters = {}
+
+# 顶点组权重摘要缓存：网格 session_uid -> (读取时的更新次数, 摘要)
+_vertex_weight_digests = {}
+
+@persistent
+def _count_mesh_updates(scene, depsgraph):
+    """记录发生更新的网格（网格数据更新，或使用它的物体几何更新）"""
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object):
+            if not update.is_updated_geometry:
+                continue
+            id_data = id_data.data
+        if isinstance(id_data, bpy.types.Mesh):
+            _mesh_update_counters[id_data.session_uid] = _mesh_update_counters.get(id_data.session_uid, 0) + 1
+
+@persistent
+def _clear_mesh_update_cache(*args):
+    """打开文件或撤销后 session_uid 与缓存的数据不再对应，清空缓存"""
+    _mesh_update_counters.clear()
+    _vertex_weight_digests.clear()
+
+def _get_vertex_weight_digest(mesh):
+    """顶点组权重的摘要。权重没有批量读取接口，只能逐顶点遍历，
+    网格在本会话中没有更新时复用上次的结果，未变化的蒙皮物体不再重复遍历"""
+    update_count = _mesh_update_counters.get(mesh.session_uid, 0)
+    cached = _vertex_weight_digests.get(mesh.session_uid)
+    if cached is not None and cached[0] == update_count:
+        return cached[1]
+    weights = [(vertex.index, element.group, element.weight)
+               for vertex in mesh.vertices for element in vertex.groups]
+    weight_digest = hashlib.md5(np.array(weights, dtype=np.float64).tobytes()).digest()
+    _vertex_weight_digests[mesh.session_uid] = (update_count, weight_digest)
+    return weight_digest
+
+def _update_digest_with_mesh(digest, obj, mesh):
+    """网格几何、所有属性层、顶点组权重、形态键和自定义法线"""
+    _update_digest_with_array(digest, mesh.vertices, "co", 3, np.float32)
+    _update_digest_with_array(digest, mesh.edges, "vertices", 2, np.int32)
+    _update_digest_with_array(digest, mesh.polygons, "loop_total", 1, np.int32)
+    _update_digest_with_array(digest, mesh.polygons, "material_index", 1, np.int32)
+    _update_digest_with_array(digest, mesh.polygons, "use_smooth", 1, np.bool_)
+    _update_digest_with_array(digest, mesh.loops, "vertex_index", 1, np.int32)
+    for uv_layer in mesh.uv_layers:
+        _update_digest_with_array(digest, uv_layer.data, "uv", 2, np.float32)
+    
+    # 通用属性层：折痕、锐边、倒角权重、顶点色等（以 "." 开头的内部属性如选择状态除外）
+    for attribute in sorted(mesh.attributes, key=lambda a: a.name):
+        layout = MESH_ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+        if layout is None or attribute.name.startswith('.'):
+            continue
+        digest.update(f"{attribute.name}|{attribute.domain}|{attribute.data_type}".encode('utf-8'))
+        field, size, dtype = layout
+        _update_digest_with_array(digest, attribute.data, field, size, dtype)
+    
+    # 顶点组名称和权重
+    digest.update("|".join(group.name for group in obj.vertex_groups).encode('utf-8'))
+    if obj.vertex_groups:
+        digest.update(_get_vertex_weight_digest(mesh))
+    
+    # 形态键
+    if mesh.shape_keys:
+        for key_block in mesh.shape_keys.key_blocks:
+            relative_name = key_block.relative_key.name if key_block.relative_key else ""
+            digest.update(f"{key_block.name}|{key_block.value}|{key_block.mute}|{relative_name}".encode('utf-8'))
+            _update_digest_with_array(digest, key_block.data, "co", 3, np.float32)
+    
+    # 自定义拆边法线
+    if mesh.has_custom_normals:
+        if hasattr(mesh, 'corner_normals'):
+            _update_digest_with_array(digest, mesh.corner_normals, "vector", 3, np.float32)
+        else:
+            mesh.calc_normals_split()
+            _update_digest_with_array(digest, mesh.loops, "normal", 3, np.float32)
+
+def compute_export_hash(objects, signature):
+    """计算导出条目的内容哈希：网格数据、材质、变换、修改器设置、动画和导出配置"""
+    digest = hashlib.md5(signature.encode('utf-8'))
+    for obj in sorted(objects, key=lambda o: o.name):
+        parent_name = obj.parent.name if obj.parent else ""
+        digest.update(f"{obj.name}|{obj.type}|{parent_name}|{obj.parent_bone}".encode('utf-8'))
+        digest.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+        
+        for modifier in obj.modifiers:
+            digest.update(_rna_properties_repr(modifier).encode('utf-8'))
+        for slot in obj.material_slots:
+            digest.update(get_material_signature(slot.material).encode('utf-8'))
+        if obj.animation_data and obj.animation_data.action:
+            _update_digest_with_action(digest, obj.animation_data.action)
+        
+        if obj.type == 'MESH' and obj.data:
+            _update_digest_with_mesh(digest, obj, obj.data)
+        elif obj.type == 'ARMATURE' and obj.data:
+            _update_digest_with_array(digest, obj.data.bones, "head_local", 3, np.float32)
+            _update_digest_with_array(digest, obj.data.bones, "tail_local", 3, np.float32)
+            _update_digest_with_array(digest, obj.data.bones, "use_deform", 1, np.bool_)
+            digest.update("|".join(bone.name for bone in obj.data.bones).encode('utf-8'))
+    return digest.hexdigest()
+
+class ExportManifest:
+    """
+    导出目录中的增量导出清单，记录每个导出条目的内容哈希和输出文件。
+    内容哈希和输出文件都没有变化的条目在下次导出时跳过。
+    """
+    def __init__(self, directory, mode, config_name='Unity'):
+        self.directory = directory
+        self.mode = mode
+        self.path = os.path.join(directory, EXPORT_MANIFEST_NAME)
+        self.signature = get_export_signature(mode, config_name)
+        self.entries = {}
+        # 先执行待处理的依赖图更新，让网格更新计数包含脚本中刚做的修改
+        bpy.context.view_layer.update()
+        self.pending_hashes = {}
+        
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == EXPORT_MANIFEST_VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError) as e:
+                print(f"读取导出清单失败，将完整导出: {e}")
+
+    def _key(self, target):
+        return f"{self.mode}:{get_target_name(target)}"
+
+    def is_unchanged(self, target):
+        """条目内容和输出文件都未变化时返回True，否则记下新哈希等待导出后写入"""
+        content_hash = compute_export_hash(get_target_objects(self.mode, target), self.signature)
+        key = self._key(target)
+        entry = self.entries.get(key)
+        if (entry and entry.get('hash') == content_hash and
+                os.path.exists(os.path.join(self.directory, entry.get('file', '')))):
+            return True
+        self.pending_hashes[key] = content_hash
+        return False
+
+    def filter_changed(self, targets):
+        """返回 (需要导出的条目, 跳过的条目数)"""
+        changed = [target for target in targets if not self.is_unchanged(target)]
+        return changed, len(targets) - len(changed)
+
+    def _record_key(self, key, file_path):
+        content_hash = self.pending_hashes.pop(key, None)
+        if content_hash is None or not file_path:
+            return
+        self.entries[key] = {
+            'hash': content_hash,
+            'file': os.path.relpath(file_path, self.directory),
+        }
+
+    def record(self, target, file_path):
+        """导出成功后记录条目的哈希和输出文件"""
+        self._record_key(self._key(target), file_path)
+
+    def record_items(self, items):
+        """记录工作进程返回的成功条目"""
+        for item in items:
+            self._record_key(f"{self.mode}:{item['name']}", item.get('file'))
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': EXPORT_MANIFEST_VERSION, 'entries': self.entries},
+                      f, ensure_ascii=False, indent=1)
+
+def run_export_job(job):
+    """
+    后台工作进程中执行的导出任务。
+    job['targets'] 为导出条目：parent/parent_max 模式为顶级物体名称，
+    mesh 模式为 [父级名称, 网格名称]，collection 模式为 [集合名称, 物体名称]。
+    """
+    mode = job['mode']
+    dest_path = job['dest_path']
+    config_name = job.get('config_name', 'Unity')
+    objects = bpy.data.objects
+
+    # 工作进程中的场景不会保存，整批只隐藏一次灯光
+    hide_scene_lights()
+
+    items = []
+    for target in job['targets']:
+        name = get_target_name(target)
+        try:
+            if mode == 'parent':
+                file_path = export_parent_hierarchy(objects[target], dest_path, config_name)
+            elif mode == 'parent_max':
+                file_path = export_parent_hierarchy(objects[target], dest_path, 'max')
+            elif mode == 'mesh':
+                parent_name, obj_name = target
+                file_path = export_mesh_with_parent(objects[parent_name], objects[obj_name], dest_path)
+            elif mode == 'collection':
+                collection_name, obj_name = target
+                collection_dir = os.path.join(dest_path, collection_name)
+                os.makedirs(collection_dir, exist_ok=True)
+                file_path = export_collection_object(objects[obj_name], collection_dir)
+            else:
+                raise ValueError(f"未知的导出模式: {mode}")
+            items.append({'name': name, 'success': file_path is not None, 'file': file_path})
+        except Exception as e:
+            items.append({'name': name, 'success': False, 'error': str(e)})
+    return items
+
+def export_with_worker_pool(context, mode, targets, dest_path, config_name='Unity', manifest=None):
+    """
+    把导出列表分发到多个后台Blender进程并行导出。
+    先把当前会话另存为临时快照，每个工作进程打开快照导出自己的分片，当前会话不受影响。
+    传入增量导出清单时，未变化的条目不会分发。
+    返回 (成功条目, 失败条目, 跳过数量)。
+    """
+    skipped_count = 0
+    if manifest is not None:
+        targets, skipped_count = manifest.filter_changed(targets)
+        if not targets:
+            return [], [], skipped_count
+    
+    worker_count = HeadlessWorker.resolve_worker_count(context.scene.export_worker_count)
+    snapshot_dir = tempfile.mkdtemp(prefix="mixtools_export_")
+    try:
+        snapshot_path = HeadlessWorker.save_snapshot(snapshot_dir)
+        jobs = [{'type': 'export_fbx', 'mode': mode, 'targets': shard,
+                 'dest_path': dest_path, 'config_name': config_name}
+                for shard in HeadlessWorker.split_into_shards(targets, worker_count)]
+        print(f"并行导出: {len(targets)} 个条目分配到 {len(jobs)} 个后台进程")
+        results = HeadlessWorker.run_worker_pool(jobs, max_workers=worker_count, blend_path=snapshot_path)
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+    
+    succeeded, failed = HeadlessWorker.collect_items(results)
+    if manifest is not None:
+        manifest.record_items(succeeded)
+        manifest.save()
+    return succeeded, failed, skipped_count
+
+def report_worker_pool_export(operator, succeeded, failed, skipped_count, start_time):
+    """向操作器报告并行导出结果"""
+    for item in failed:
+        print(f"导出失败: {item['name']}: {item.get('error')}")
+    elapsed_time = time.time() - start_time
+    skipped_message = f", 跳过未变化{skipped_count}个" if skipped_count else ""
+    if failed:
+        operator.report({'WARNING'}, f"并行导出完成! 耗时: {elapsed_time:.2f}秒, 成功{len(succeeded)}个, 失败{len(failed)}个{skipped_message}")
+    else:
+        operator.report({'INFO'}, f"并行导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{len(succeeded)}个物体{skipped_message}")
+
+def create_export_manifest(context, dest_path, mode, config_name='Unity'):
+    """启用增量导出时返回导出清单，否则返回None"""
+    if context.scene.export_incremental:
+        return ExportManifest(dest_path, mode, config_name)
+    return None
         
 class ExportFbxByParent(bpy.types.Operator):
     bl_idname = "scene.export_fbx_by_parent"
     bl_label = "按照顶级父物体导出FBX"
 
-    def select_children(self, obj):
-        for child in obj.children:
-            child.select_set(True)
-            self.select_children(child)
-
     def execute(self, context):
         start_time = time.time()  # 记录开始时间
         
@@ -328,50 +909,62 @@ class ExportFbxByParent(bpy.types.Operator):
         # 获取选择的导出配置
         config_name = context.scene.export_config
         
+        # 增量导出清单
+        manifest = create_export_manifest(context, dest_path, 'parent', config_name)
+        
+        # 并行模式：分发到后台Blender进程
+        if context.scene.export_use_worker_pool:
+            succeeded, failed, skipped_count = export_with_worker_pool(
+                context, 'parent', [obj.name for obj in parents], dest_path, config_name, manifest)
+            report_worker_pool_export(self, succeeded, failed, skipped_count, start_time)
+            return {'FINISHED'}
+        
         # 禁用不必要的自动更新，提高性能
         bpy.context.view_layer.update()
         
         # 批处理导出
         processed_count = 0
+        skipped_count = 0
         total_count = len(parents)
         
+        # 整批导出前统一隐藏灯光
+        hidden_lights = hide_scene_lights()
+        
         for i in range(0, total_count, BATCH_SIZE):
             batch = parents[i:i+BATCH_SIZE]
             self.report({'INFO'}, f"处理批次 {i//BATCH_SIZE + 1}/{math.ceil(total_count/BATCH_SIZE)}")
             
             for obj in batch:
-                bpy.ops.object.select_all(action='DESELECT')
-                obj.select_set(True)
-                self.select_children(obj)
-
-                prepare_obj_export(obj, True)
-                
-                selected_objects = [o.name for o in bpy.context.selected_objects]
-                if not selected_objects:
+                if manifest and manifest.is_unchanged(obj.name):
+                    skipped_count += 1
+                    continue
+                file_path = export_parent_hierarchy(obj, dest_path, config_name)
+                if file_path is None:
                     continue
-                    
-                file_path = export_fbx(obj, dest_path, config_name)
                 processed_count += 1
+                if manifest:
+                    manifest.record(obj.name, file_path)
                 
                 # 每导出一个物体，更新进度
                 self.report({'INFO'}, f"已导出 {processed_count}/{total_count}: {obj.name}")
                 
             # 每批次后强制更新视图并释放内存
             bpy.context.view_layer.update()
+        
+        # 恢复灯光对象的可见性
+        restore_scene_lights(hidden_lights)
+        
+        if manifest:
+            manifest.save()
             
         elapsed_time = time.time() - start_time
-        self.report({'INFO'}, f"导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{processed_count}个物体")
+        self.report({'INFO'}, f"导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{processed_count}个物体, 跳过未变化{skipped_count}个")
         return {'FINISHED'}
 
 class ExportFbxByParentMax(bpy.types.Operator):
     bl_idname = "scene.export_fbx_by_parent_max"
     bl_label = "按照顶级父物体导出3ds Max兼容FBX"
 
-    def select_children(self, obj):
-        for child in obj.children:
-            child.select_set(True)
-            self.select_children(child)
-
     def execute(self, context):
         start_time = time.time()
         
@@ -383,39 +976,56 @@ class ExportFbxByParentMax(bpy.types.Operator):
         # 获取所有顶级父物体
         parents = [obj for obj in bpy.context.scene.objects if obj.parent is None]
         
+        # 增量导出清单
+        manifest = create_export_manifest(context, dest_path, 'parent_max')
+        
+        # 并行模式：分发到后台Blender进程
+        if context.scene.export_use_worker_pool:
+            succeeded, failed, skipped_count = export_with_worker_pool(
+                context, 'parent_max', [obj.name for obj in parents], dest_path, manifest=manifest)
+            report_worker_pool_export(self, succeeded, failed, skipped_count, start_time)
+            return {'FINISHED'}
+        
         # 禁用不必要的自动更新
         bpy.context.view_layer.update()
         
         # 批处理导出
         processed_count = 0
+        skipped_count = 0
         total_count = len(parents)
         
+        # 整批导出前统一隐藏灯光
+        hidden_lights = hide_scene_lights()
+        
         for i in range(0, total_count, BATCH_SIZE):
             batch = parents[i:i+BATCH_SIZE]
             self.report({'INFO'}, f"处理批次 {i//BATCH_SIZE + 1}/{math.ceil(total_count/BATCH_SIZE)}")
             
             for obj in batch:
-                bpy.ops.object.select_all(action='DESELECT')
-                obj.select_set(True)
-                self.select_children(obj)
-
-                prepare_obj_export(obj, True)
-                
-                selected_objects = [o.name for o in bpy.context.selected_objects]
-                if not selected_objects:
+                if manifest and manifest.is_unchanged(obj.name):
+                    skipped_count += 1
+                    continue
+                file_path = export_parent_hierarchy(obj, dest_path, 'max')
+                if file_path is None:
                     continue
-                    
-                file_path = export_fbx_max(obj, dest_path)
                 processed_count += 1
+                if manifest:
+                    manifest.record(obj.name, file_path)
                 
                 # 每导出一个物体，更新进度
                 self.report({'INFO'}, f"已导出 {processed_count}/{total_count}: {obj.name}")
                 
             # 每批次后强制更新视图并释放内存
             bpy.context.view_layer.update()
+        
+        # 恢复灯光对象的可见性
+        restore_scene_lights(hidden_lights)
+        
+        if manifest:
+            manifest.save()
 
         elapsed_time = time.time() - start_time
-        self.report({'INFO'}, f"导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{processed_count}个物体")
+        self.report({'INFO'}, f"导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{processed_count}个物体, 跳过未变化{skipped_count}个")
         return {'FINISHED'}
 
 class ExportFbxByMesh(bpy.types.Operator):
@@ -430,15 +1040,6 @@ class ExportFbxByMesh(bpy.types.Operator):
         if not check_result:
             return {'CANCELLED'}
 
-        # 临时隐藏灯光对象以避免Blender 4.3的API兼容性问题
-        hidden_lights = []
-        if is_blender_4_3_or_newer():
-            for light_obj in bpy.context.scene.objects:
-                if light_obj.type in {'LIGHT', 'LAMP'}:
-                    if light_obj.hide_viewport == False:
-                        light_obj.hide_viewport = True
-                        hidden_lights.append(light_obj)
-
         # 获取所有顶级父物体
         parents = [obj for obj in bpy.context.scene.objects if obj.parent is None]
         
@@ -449,8 +1050,22 @@ class ExportFbxByMesh(bpy.types.Operator):
                 if obj.type == 'MESH':
                     mesh_objects.append((parent, obj))
         
+        # 增量导出清单
+        manifest = create_export_manifest(context, dest_path, 'mesh')
+        
+        # 并行模式：分发到后台Blender进程
+        if context.scene.export_use_worker_pool:
+            succeeded, failed, skipped_count = export_with_worker_pool(
+                context, 'mesh', [[parent.name, obj.name] for parent, obj in mesh_objects], dest_path, manifest=manifest)
+            report_worker_pool_export(self, succeeded, failed, skipped_count, start_time)
+            return {'FINISHED'}
+
+        # 临时隐藏灯光对象以避免Blender 4.3的API兼容性问题
+        hidden_lights = hide_scene_lights()
+        
         # 批处理导出
         processed_count = 0
+        skipped_count = 0
         total_count = len(mesh_objects)
         
         for i in range(0, total_count, BATCH_SIZE):
@@ -458,42 +1073,14 @@ class ExportFbxByMesh(bpy.types.Operator):
             self.report({'INFO'}, f"处理批次 {i//BATCH_SIZE + 1}/{math.ceil(total_count/BATCH_SIZE)}")
             
             for parent, obj in batch:
-                # 取消选择所有对象
-                bpy.ops.object.select_all(action='DESELECT')
-                
-                # 选择当前的 mesh 对象
-                obj.select_set(True)
-
-                # 选择非 mesh 类型的对象 (骨骼等)
-                for other_obj in bpy.context.scene.objects:
-                    if other_obj.type != 'MESH':
-                        other_obj.select_set(True)
-
-                # 设置导出文件路径
-                file_path = os.path.join(dest_path, f"{parent.name}_{obj.name}.fbx")
-
-                # 使用优化的参数导出
-                export_params = {
-                    'filepath': file_path,
-                    'use_selection': True,
-                    'global_scale': 0.01,
-                    'apply_unit_scale': True,
-                    'axis_forward': '-Z',
-                    'axis_up': 'Y',
-                    'use_space_transform': True,
-                    'bake_space_transform': True,
-                    'mesh_smooth_type': 'FACE',
-                    'use_custom_props': False,  # 不导出自定义属性
-                    'add_leaf_bones': False     # 不添加叶骨骼
-                }
-                
-                # 在Blender 4.3+版本中添加object_types参数来排除灯光对象
-                if is_blender_4_3_or_newer():
-                    export_params['object_types'] = {'MESH', 'ARMATURE', 'EMPTY'}
-                
-                bpy.ops.export_scene.fbx(**export_params)
-                
+                target = [parent.name, obj.name]
+                if manifest and manifest.is_unchanged(target):
+                    skipped_count += 1
+                    continue
+                file_path = export_mesh_with_parent(parent, obj, dest_path)
                 processed_count += 1
+                if manifest:
+                    manifest.record(target, file_path)
                 
                 # 每导出一个物体，更新进度
                 self.report({'INFO'}, f"已导出 {processed_count}/{total_count}: {parent.name}_{obj.name}")
@@ -504,11 +1091,12 @@ class ExportFbxByMesh(bpy.types.Operator):
         elapsed_time = time.time() - start_time
         
         # 恢复灯光对象的可见性
-        if is_blender_4_3_or_newer():
-            for light_obj in hidden_lights:
-                light_obj.hide_viewport = False
+        restore_scene_lights(hidden_lights)
+        
+        if manifest:
+            manifest.save()
             
-        self.report({'INFO'}, f"导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{processed_count}个物体")
+        self.report({'INFO'}, f"导出完成! 耗时: {elapsed_time:.2f}秒, 共导出{processed_count}个物体, 跳过未变化{skipped_count}个")
         return {'FINISHED'}
 
 # 导出碰撞盒
@@ -556,19 +1144,29 @@ class ExportFbxByCollection(bpy.types.Operator):
     bl_label = "按集合导出FBX"
 
     def execute(self, context):
+        start_time = time.time()
+        
         # 设置导出FBX文件的路径
         check_result, export_dir = check_dir(self, context)
         if not check_result:
             return {'CANCELLED'}
 
+        # 增量导出清单
+        manifest = create_export_manifest(context, export_dir, 'collection')
+
+        # 并行模式：分发到后台Blender进程
+        if context.scene.export_use_worker_pool:
+            targets = [[collection.name, obj.name]
+                       for collection in bpy.data.collections
+                       for obj in collection.objects
+                       if obj.type in {'MESH', 'ARMATURE'}]
+            succeeded, failed, skipped_count = export_with_worker_pool(
+                context, 'collection', targets, export_dir, manifest=manifest)
+            report_worker_pool_export(self, succeeded, failed, skipped_count, start_time)
+            return {'FINISHED'}
+
         # 临时隐藏灯光对象以避免Blender 4.3的API兼容性问题
-        hidden_lights = []
-        if is_blender_4_3_or_newer():
-            for light_obj in bpy.context.scene.objects:
-                if light_obj.type in {'LIGHT', 'LAMP'}:
-                    if light_obj.hide_viewport == False:
-                        light_obj.hide_viewport = True
-                        hidden_lights.append(light_obj)
+        hidden_lights = hide_scene_lights()
 
         for collection in bpy.data.collections:
             collection_dir = os.path.join(export_dir, collection.name)
@@ -577,24 +1175,21 @@ class ExportFbxByCollection(bpy.types.Operator):
             for obj in collection.objects:
                 if obj.type not in {'MESH', 'ARMATURE'}:
                     continue
-                bpy.ops.object.select_all(action='DESELECT')
-                obj.select_set(True)
-                bpy.context.view_layer.objects.active = obj
-                fbx_path = os.path.join(collection_dir, obj.name + ".fbx")
-                bpy.ops.export_scene.fbx(
-                    filepath=fbx_path, 
-                    use_selection=True, 
-                    global_scale=0.01,
-                    object_types={'MESH', 'ARMATURE', 'EMPTY'}
-                )
+                target = [collection.name, obj.name]
+                if manifest and manifest.is_unchanged(target):
+                    continue
+                file_path = export_collection_object(obj, collection_dir)
+                if manifest:
+                    manifest.record(target, file_path)
 
         # 最后统一更新视图
         bpy.context.view_layer.update()
         
         # 恢复灯光对象的可见性
-        if is_blender_4_3_or_newer():
-            for light_obj in hidden_lights:
-                light_obj.hide_viewport = False
+        restore_scene_lights(hidden_lights)
+        
+        if manifest:
+            manifest.save()
             
         print("All objects in collections have been exported as FBX files to " + export_dir)
         return {'FINISHED'}
@@ -605,8 +1200,9 @@ class ExporteObjOperator(bpy.types.Operator):
   bl_idname = "object.export_objs"
 
   def execute(self, context):
+    start_time = time.time()
     
-    output_dir = context.scene.export_directory
+    output_dir = bpy.path.abspath(context.scene.export_directory)
     
     selected_objects = context.selected_objects
     
@@ -614,41 +1210,28 @@ class ExporteObjOperator(bpy.types.Operator):
       self.report({'INFO'}, "No objects selected")
       return {'FINISHED'}
 
-    for obj in selected_objects:
-        
-      obj_name = obj.name
-      export_path = os.path.join(output_dir, obj_name + ".obj")
+    # 直接读取网格数组写出OBJ/MTL，不需要逐个切换选择调用导出操作符
+    combined_name = None
+    if context.scene.obj_export_combined:
+      combined_name = context.active_object.name if context.active_object else "combined"
+    max_threads = os.cpu_count() if context.scene.obj_export_use_threads else 0
     
-      bpy.ops.object.select_all(action='DESELECT')
-      obj.select_set(True)
-      bpy.context.view_layer.objects.active = obj
-      bpy.ops.export_scene.obj(
-        filepath = export_path,
-        check_existing=True, 
-        axis_forward='-Z', 
-        axis_up='Y', 
-        use_selection=True, 
-        use_animation=False, 
-        use_mesh_modifiers=True, 
-        use_edges=True, 
-        use_smooth_groups=False, 
-        use_smooth_groups_bitflags=False, 
-        use_normals=True, 
-        use_uvs=True, 
-        use_materials=True, 
-        use_triangles=False, 
-        use_nurbs=False, 
-        use_vertex_groups=False, 
-        use_blen_objects=True, 
-        group_by_object=False, 
-        group_by_material=False, 
-        keep_vertex_order=True, 
-        global_scale=1, 
-        path_mode='COPY',
-      )
-
-      self.report({'INFO'}, f"Exported {obj_name} to {export_path}")
-      
+    exported_files = ObjWriter.export_objects(
+      selected_objects,
+      output_dir,
+      combined_name=combined_name,
+      axis_forward='-Z',
+      axis_up='Y',
+      use_materials=True,
+      copy_textures=True,
+      max_threads=max_threads,
+    )
+    
+    for export_path in exported_files:
+      print(f"Exported {export_path}")
+    
+    elapsed_time = time.time() - start_time
+    self.report({'INFO'}, f"OBJ导出完成! 耗时: {elapsed_time:.2f}秒, 共写出{len(exported_files)}个文件")
     return {'FINISHED'}
 
 def register():
@@ -666,6 +1249,28 @@ def register():
         description="选择导出配置",
         items=[(key, config.name, config.description) for key, config in EXPORT_CONFIGS.items()],
         default='Unity')
+    bpy.types.Scene.export_use_worker_pool = bpy.props.BoolProperty(
+        name="并行导出",
+        description="把当前场景另存为临时快照，分发到多个后台Blender进程并行导出，导出期间不修改当前场景",
+        default=False)
+    bpy.types.Scene.export_incremental = bpy.props.BoolProperty(
+        name="增量导出",
+        description="在导出目录保存导出清单，记录每个导出条目的网格、材质、变换和导出配置哈希，跳过未变化的条目",
+        default=False)
+    bpy.types.Scene.obj_export_combined = bpy.props.BoolProperty(
+        name="合并为单个OBJ",
+        description="把所有选中物体写入同一个OBJ文件（以活动物体命名），否则每个物体一个文件",
+        default=False)
+    bpy.types.Scene.obj_export_use_threads = bpy.props.BoolProperty(
+        name="多线程写出",
+        description="读取网格数据后，使用线程池并行格式化和写出OBJ文件",
+        default=True)
+    bpy.types.Scene.export_worker_count = bpy.props.IntProperty(
+        name="进程数",
+        description="并行导出使用的后台Blender进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64)
 
     bpy.utils.register_class(ExportFbxByParent)
     bpy.utils.register_class(ExportFbxByColMark)
@@ -674,7 +1279,20 @@ def register():
     bpy.utils.register_class(ExportFbxByMesh)
     bpy.utils.register_class(ExporteObjOperator)
 
+    bpy.app.handlers.depsgraph_update_post.append(_count_mesh_updates)
+    bpy.app.handlers.load_post.append(_clear_mesh_update_cache)
+    bpy.app.handlers.undo_post.append(_clear_mesh_update_cache)
+    bpy.app.handlers.redo_post.append(_clear_mesh_update_cache)
+
 def unregister():
+    for handlers, handler in ((bpy.app.handlers.depsgraph_update_post, _count_mesh_updates),
+                              (bpy.app.handlers.load_post, _clear_mesh_update_cache),
+                              (bpy.app.handlers.undo_post, _clear_mesh_update_cache),
+                              (bpy.app.handlers.redo_post, _clear_mesh_update_cache)):
+        if handler in handlers:
+            handlers.remove(handler)
+    _clear_mesh_update_cache()
+
     bpy.utils.unregister_class(ExporteObjOperator)
     bpy.utils.unregister_class(ExportFbxByMesh)
     bpy.utils.unregister_class(ExportFbxByParentMax)
@@ -683,7 +1301,9 @@ def unregister():
     bpy.utils.unregister_class(ExportFbxByParent)
 
     # 清理场景属性
-    for attr in ('export_directory', 'clear_parent_on_export', 'export_config'):
+    for attr in ('export_directory', 'clear_parent_on_export', 'export_config',
+                 'export_use_worker_pool', 'export_worker_count', 'export_incremental',
+                 'obj_export_combined', 'obj_export_use_threads'):
         if hasattr(bpy.types.Scene, attr):
             delattr(bpy.types.Scene, attr)
 
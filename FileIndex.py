@@ -0,0 +1,167 @@
+"""
+MixTools 文件名索引
+
+按名称查找资产文件时，不再为每个名称遍历一次目录树：
+用 ``os.scandir`` 递归扫描一次目录，建立 规范化文件名 -> 文件路径列表 的索引并缓存。
+扫描时记录每个子目录的修改时间，任何子目录增删文件后索引会在下次使用时重建。
+完全一致用字典查找，前缀用有序列表二分查找，包含用三字符片段（trigram）倒排索引，
+每个名称的查找不需要遍历所有已索引的文件名。
+
+本模块不依赖 bpy。
+"""
+
+import os
+import bisect
+import difflib
+
+
+# 查找方式
+MATCH_EXACT = 'EXACT'
+MATCH_PREFIX = 'PREFIX'
+MATCH_CONTAINS = 'CONTAINS'
+MATCH_FUZZY = 'FUZZY'
+
+# 包含查找的倒排索引片段长度，比它短的名称退回逐个比较
+CONTAINS_GRAM_SIZE = 3
+
+# 模糊查找时每个名称最多返回的候选数和相似度下限
+FUZZY_MAX_MATCHES = 3
+FUZZY_CUTOFF = 0.8
+
+
+def normalize_name(name):
+    """规范化名称：去掉首尾空白并忽略大小写"""
+    return name.strip().casefold()
+
+
+class FileNameIndex:
+    """目录中指定扩展名文件的名称索引（文件名不含扩展名）"""
+
+    def __init__(self, directory, extension):
+        self.directory = directory
+        self.extension = extension.lower()
+        self.entries = {}
+        self.directory_mtimes = {}
+        self.names = []
+        self._gram_index = None
+        self._build()
+
+    def _build(self):
+        pending = [self.directory]
+        while pending:
+            path = pending.pop()
+            try:
+                self.directory_mtimes[path] = os.stat(path).st_mtime
+                with os.scandir(path) as iterator:
+                    for entry in iterator:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.lower().endswith(self.extension):
+                            stem = os.path.splitext(entry.name)[0]
+                            self.entries.setdefault(normalize_name(stem), []).append(entry.path)
+            except OSError as e:
+                print(f"扫描目录失败: {path}: {e}")
+        self.names = sorted(self.entries)
+
+    def _get_gram_index(self):
+        """三字符片段 -> 包含该片段的名称集合，第一次包含查找时建立"""
+        if self._gram_index is None:
+            gram_index = {}
+            for indexed in self.names:
+                for start in range(len(indexed) - CONTAINS_GRAM_SIZE + 1):
+                    gram_index.setdefault(indexed[start:start + CONTAINS_GRAM_SIZE], set()).add(indexed)
+            self._gram_index = gram_index
+        return self._gram_index
+
+    def _find_containing(self, key):
+        """包含 key 的已索引名称（按名称排序）"""
+        if len(key) < CONTAINS_GRAM_SIZE:
+            return [indexed for indexed in self.names if key in indexed]
+        
+        gram_index = self._get_gram_index()
+        postings = []
+        for start in range(len(key) - CONTAINS_GRAM_SIZE + 1):
+            names = gram_index.get(key[start:start + CONTAINS_GRAM_SIZE])
+            if not names:
+                return []
+            postings.append(names)
+        # 从最小的集合开始求交集，再确认片段按顺序连续出现
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return sorted(indexed for indexed in candidates if key in indexed)
+
+    @property
+    def file_count(self):
+        return sum(len(paths) for paths in self.entries.values())
+
+    def is_stale(self):
+        """任一已扫描目录被修改或删除时索引失效"""
+        for path, mtime in self.directory_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def lookup(self, name, mode=MATCH_EXACT):
+        """查找一个名称对应的文件路径列表"""
+        key = normalize_name(name)
+        if not key:
+            return []
+
+        if mode == MATCH_EXACT:
+            return list(self.entries.get(key, []))
+
+        if mode == MATCH_PREFIX:
+            matched_names = []
+            index = bisect.bisect_left(self.names, key)
+            while index < len(self.names) and self.names[index].startswith(key):
+                matched_names.append(self.names[index])
+                index += 1
+        elif mode == MATCH_CONTAINS:
+            matched_names = self._find_containing(key)
+        elif mode == MATCH_FUZZY:
+            # 有完全相同的名称时不再做模糊匹配
+            if key in self.entries:
+                matched_names = [key]
+            else:
+                matched_names = difflib.get_close_matches(
+                    key, self.names, n=FUZZY_MAX_MATCHES, cutoff=FUZZY_CUTOFF)
+        else:
+            raise ValueError(f"未知的查找方式: {mode}")
+
+        return [path for matched in matched_names for path in self.entries[matched]]
+
+    def lookup_many(self, names, mode=MATCH_EXACT):
+        """查找多个名称，返回 (去重后的文件路径列表, 没有找到的名称列表)"""
+        found_paths = []
+        seen = set()
+        missing_names = []
+        for name in names:
+            paths = self.lookup(name, mode)
+            if not paths:
+                missing_names.append(name)
+            for path in paths:
+                if path not in seen:
+                    seen.add(path)
+                    found_paths.append(path)
+        return found_paths, missing_names
+
+
+# (目录, 扩展名) -> FileNameIndex
+_index_cache = {}
+
+
+def get_file_index(directory, extension):
+    """获取目录的文件名索引，目录未变化时复用缓存"""
+    key = (os.path.normcase(os.path.abspath(directory)), extension.lower())
+    index = _index_cache.get(key)
+    if index is None or index.is_stale():
+        index = FileNameIndex(directory, extension)
+        _index_cache[key] = index
+    return index
+
+
+def clear_index_cache():
+    _index_cache.clear()
@@ -0,0 +1,338 @@
+"""
+MixTools 后台 Blender 工作进程
+
+本模块同时承担两个角色：
+
+- 主进程侧：把任务列表拆分为分片，为每个分片写入任务 JSON，
+  并发启动 ``blender -b`` 工作进程并汇总各进程写回的结果 JSON。
+- 工作进程侧：作为 ``blender -b <file.blend> --python HeadlessWorker.py -- <job.json>``
+  运行，按任务类型调用插件中已有的处理函数，不经过界面会话。
+
+任务类型与处理函数的对应关系登记在 ``JOB_HANDLERS`` 中，
+处理函数接收任务字典，返回每个条目的结果列表。
+"""
+
+import os
+import sys
+import json
+import shutil
+import time
+import tempfile
+import traceback
+import types
+import importlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+
+# 任务类型 -> (插件模块名, 处理函数名)
+JOB_HANDLERS = {
+    'export_fbx': ('Exporter', 'run_export_job'),
+    'better_fbx_export': ('BetterFbxExport', 'run_export_job'),
+    'import_files': ('Importer', 'run_import_job'),
+    'batch_resolution': ('renderconfig', 'run_resolution_job'),
+    'run_operator': ('BatchJobRunner', 'run_operator_job'),
+}
+
+# 结果清单格式版本
+RESULT_MANIFEST_VERSION = 1
+
+# 工作进程中是否已由 ensure_addon_registered 注册整个插件
+_addon_registered = False
+
+# 工作进程中插件的包名，由主进程通过任务 JSON 传入（扩展形式为 bl_ext.<仓库>.<名称>）
+_addon_package = None
+
+
+# ---------------------------------------------------------------------------
+# 主进程侧：分片与进程池
+# ---------------------------------------------------------------------------
+
+def get_default_worker_count():
+    """默认工作进程数：保留一个核心给界面会话。"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def resolve_worker_count(requested):
+    """把界面上的进程数设置（0 表示自动）转换为实际进程数。"""
+    return requested if requested > 0 else get_default_worker_count()
+
+
+def split_into_shards(items, shard_count):
+    """把条目轮询分配到若干分片，使各分片工作量接近。
+
+    Args:
+        items: list - 任务条目
+        shard_count: int - 期望的分片数
+
+    Returns:
+        list[list] - 非空分片列表
+    """
+    shard_count = max(1, min(shard_count, len(items)))
+    return [items[i::shard_count] for i in range(shard_count) if items[i::shard_count]]
+
+
+def save_snapshot(directory, name="snapshot.blend"):
+    """把当前会话另存一份 .blend 快照供工作进程读取，不改变当前文件路径。
+
+    Returns:
+        str - 快照文件路径
+    """
+    snapshot_path = os.path.join(directory, name)
+    bpy.ops.wm.save_as_mainfile(filepath=snapshot_path, copy=True, check_existing=False)
+    return snapshot_path
+
+
+def build_worker_command(job_path, blend_path=None):
+    """构建启动后台工作进程的命令行。
+
+    使用 --factory-startup，用户的启动文件和其他插件不会在每个工作进程中运行。
+    """
+    command = [bpy.app.binary_path, "-b", "--factory-startup"]
+    if blend_path:
+        command.append(blend_path)
+    command += ["--python", os.path.abspath(__file__), "--", job_path]
+    return command
+
+
+def run_worker(job, work_dir, index, blend_path=None, timeout=None):
+    """运行单个工作进程并读取其结果。
+
+    工作进程崩溃或超时时返回带错误信息的结果（'crashed' 为 True），不抛出异常。
+
+    Returns:
+        dict - {'success', 'items', 'error', 'returncode', 'crashed', ...}
+    """
+    job_path = os.path.join(work_dir, f"job_{index:03d}.json")
+    result_path = os.path.join(work_dir, f"result_{index:03d}.json")
+    # 传入主进程中的插件包名，工作进程以同一包名导入，不会产生第二份插件
+    job = dict(job, result_path=result_path, addon_package=__package__)
+    with open(job_path, 'w', encoding='utf-8') as f:
+        json.dump(job, f, ensure_ascii=False)
+
+    command = build_worker_command(job_path, blend_path or job.get('blend_path'))
+    returncode = None
+    error = None
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True,
+                                   encoding='utf-8', errors='replace', timeout=timeout)
+        returncode = completed.returncode
+        if returncode != 0:
+            error = completed.stderr[-2000:] or completed.stdout[-2000:]
+    except subprocess.TimeoutExpired:
+        error = f"工作进程超时 ({timeout}秒)"
+    except OSError as e:
+        error = f"无法启动工作进程: {e}"
+
+    result = None
+    if os.path.exists(result_path):
+        try:
+            with open(result_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            error = error or f"无法读取工作进程结果: {e}"
+
+    crashed = result is None
+    if crashed:
+        result = {'success': False, 'items': [], 'error': error or "工作进程没有写回结果"}
+    result['crashed'] = crashed
+    result['returncode'] = returncode
+    result['shard'] = index
+    return result
+
+
+def run_worker_with_retries(job, work_dir, index, blend_path=None, timeout=None, retries=0):
+    """运行单个工作进程，进程崩溃或超时（没有写回结果）时最多重试 retries 次。
+
+    任务本身报告的失败不会重试。
+    """
+    attempts = 0
+    while True:
+        attempts += 1
+        result = run_worker(job, work_dir, index, blend_path, timeout)
+        if not result['crashed'] or attempts > retries:
+            break
+        print(f"HeadlessWorker: 任务 {index} 的工作进程异常退出，重试 ({attempts}/{retries})")
+    result['attempts'] = attempts
+    return result
+
+
+def run_worker_pool(jobs, max_workers=None, blend_path=None, timeout=None, retries=0):
+    """并发运行一组工作进程任务。
+
+    Args:
+        jobs: list[dict] - 任务字典列表，每个任务至少包含 'type'
+        max_workers: int | None - 最大并发进程数，默认自动
+        blend_path: str | None - 所有任务共享的 .blend 文件（任务内可用 'blend_path' 单独指定）
+        timeout: float | None - 单个工作进程的超时秒数
+        retries: int - 工作进程崩溃或超时后的重试次数
+
+    Returns:
+        list[dict] - 与 jobs 顺序一致的结果列表
+    """
+    if not jobs:
+        return []
+
+    max_workers = max_workers or get_default_worker_count()
+    work_dir = tempfile.mkdtemp(prefix="mixtools_jobs_")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_worker_with_retries, job, work_dir, index,
+                                       blend_path, timeout, retries)
+                       for index, job in enumerate(jobs)]
+            return [future.result() for future in futures]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def collect_items(results):
+    """汇总所有分片的条目结果，返回 (成功条目, 失败条目)。
+
+    整个分片失败（进程崩溃、超时）时，为该分片追加一条失败记录。
+    """
+    succeeded = []
+    failed = []
+    for result in results:
+        for item in result.get('items', []):
+            (succeeded if item.get('success') else failed).append(item)
+        if not result.get('success'):
+            failed.append({'name': f"分片 {result.get('shard')}", 'success': False,
+                           'error': result.get('error')})
+    return succeeded, failed
+
+
+def write_result_manifest(manifest_path, jobs, results, elapsed=None):
+    """把任务与结果逐一对应写入 JSON 结果清单，返回清单中的汇总信息。"""
+    succeeded, failed = collect_items(results)
+    summary = {
+        'jobs': len(jobs),
+        'succeeded': len(succeeded),
+        'failed': len(failed),
+        'crashed': sum(1 for result in results if result.get('crashed')),
+        'retried': sum(1 for result in results if result.get('attempts', 1) > 1),
+    }
+    manifest = {
+        'version': RESULT_MANIFEST_VERSION,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'elapsed': elapsed,
+        'summary': summary,
+        'jobs': [
+            {'job': {key: value for key, value in job.items() if key != 'result_path'},
+             'result': result}
+            for job, result in zip(jobs, results)
+        ],
+    }
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(directory, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# 工作进程侧
+# ---------------------------------------------------------------------------
+
+def ensure_parent_package(package_name, path):
+    """保证包可以导入且搜索路径包含 path，不存在时按目录补建（如工作进程中的 bl_ext.<仓库>）。"""
+    try:
+        module = importlib.import_module(package_name)
+    except ImportError:
+        parent_name = package_name.rpartition('.')[0]
+        if parent_name:
+            ensure_parent_package(parent_name, os.path.dirname(path))
+        module = types.ModuleType(package_name)
+        module.__path__ = []
+        sys.modules[package_name] = module
+    if path not in module.__path__:
+        module.__path__.append(path)
+
+
+def get_addon_package_name():
+    """插件包名，并保证插件可以用该包名导入。
+
+    优先使用主进程传入的包名（工作进程）或本模块所在的包（主进程），
+    Blender 4.2+ 扩展的包名为 bl_ext.<仓库>.<名称>，与目录名不同。
+    """
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    package_name = _addon_package or __package__
+    if package_name:
+        parent_name = package_name.rpartition('.')[0]
+        if parent_name:
+            ensure_parent_package(parent_name, os.path.dirname(addon_dir))
+            return package_name
+    else:
+        package_name = os.path.basename(addon_dir)
+
+    parent_dir = os.path.dirname(addon_dir)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    return package_name
+
+
+def ensure_addon_registered():
+    """插件未在该Blender中启用时注册整个插件，使全部操作符和场景属性可用。"""
+    global _addon_registered
+    package_name = get_addon_package_name()
+    if _addon_registered or package_name in bpy.context.preferences.addons:
+        return
+    importlib.import_module(package_name).register()
+    _addon_registered = True
+
+
+def import_addon_module(module_name):
+    """在工作进程中导入插件的模块，必要时注册其属性和操作符。"""
+    package_name = get_addon_package_name()
+    module = importlib.import_module(f"{package_name}.{module_name}")
+
+    # 插件未在该Blender中启用时，只注册需要的模块，保证场景属性可用
+    if (not _addon_registered and package_name not in bpy.context.preferences.addons
+            and hasattr(module, 'register')):
+        try:
+            module.register()
+        except ValueError:
+            # 已注册
+            pass
+    return module
+
+
+def run_job(job):
+    """在工作进程中执行一个任务，返回结果字典。"""
+    result = {'type': job.get('type'), 'success': True, 'items': [], 'error': None}
+    try:
+        # 需要调用任意插件操作符的任务先注册整个插件
+        if job.get('register_addon'):
+            ensure_addon_registered()
+        module_name, function_name = JOB_HANDLERS[job['type']]
+        handler = getattr(import_addon_module(module_name), function_name)
+        result['items'] = handler(job)
+    except Exception:
+        result['success'] = False
+        result['error'] = traceback.format_exc()
+    return result
+
+
+def worker_main(argv):
+    """工作进程入口：读取 '--' 之后的任务 JSON 路径并执行。"""
+    if "--" not in argv:
+        print("HeadlessWorker: 缺少任务文件参数")
+        return 2
+
+    job_path = argv[argv.index("--") + 1]
+    with open(job_path, 'r', encoding='utf-8') as f:
+        job = json.load(f)
+
+    global _addon_package
+    _addon_package = job.get('addon_package')
+
+    result = run_job(job)
+    with open(job['result_path'], 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+
+    return 0 if result['success'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(worker_main(sys.argv))
@@ -0,0 +1,165 @@
+"""
+MixTools 导入台账
+
+记录每个源文件（路径、大小、修改时间）导入后生成的顶级物体名称，保存在场景的自定义属性中，
+随 .blend 文件一起保存。同步导入时：
+
+- 新文件：正常导入；
+- 未变化的文件：跳过（台账记录的顶级物体必须仍在场景中，否则视为新文件）；
+- 变化的文件：删除上次导入的物体层级后重新导入，新的顶级物体沿用旧物体的变换和所在集合。
+"""
+
+import os
+import json
+
+import bpy
+
+
+# 场景自定义属性名
+LEDGER_PROPERTY = "mixtools_import_ledger"
+LEDGER_VERSION = 1
+
+# 工作进程导入的物体上记录源文件路径的自定义属性
+SOURCE_FILE_PROPERTY = "mixtools_source_file"
+
+
+def get_file_stamp(path):
+    """源文件的大小和修改时间"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def clear_source_tags(objects):
+    """移除工作进程写在物体上的源文件属性"""
+    for obj in objects:
+        if SOURCE_FILE_PROPERTY in obj:
+            del obj[SOURCE_FILE_PROPERTY]
+
+
+def get_root_objects(objects):
+    """导入物体中的顶级物体：没有父级，或父级不在导入物体中"""
+    imported = set(objects)
+    return [obj for obj in objects if obj.parent not in imported]
+
+
+class ImportLedger:
+    """场景导入台账，键为规范化的源文件绝对路径"""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.entries = {}
+        self.placements = {}
+
+        data = scene.get(LEDGER_PROPERTY)
+        if data:
+            try:
+                data = json.loads(data)
+                if data.get('version') == LEDGER_VERSION:
+                    self.entries = data.get('entries', {})
+            except ValueError as e:
+                print(f"读取导入台账失败，将重新建立: {e}")
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _existing_roots(self, entry):
+        objects = bpy.data.objects
+        return [objects[name] for name in entry.get('roots', []) if name in objects]
+
+    def classify(self, paths):
+        """把源文件分为 (新文件, 变化的文件, 未变化的文件)"""
+        new_paths, changed_paths, unchanged_paths = [], [], []
+        for path in paths:
+            entry = self.entries.get(self._key(path))
+            if entry is None or not entry.get('roots') or not self._existing_roots(entry):
+                new_paths.append(path)
+                continue
+            stamp = get_file_stamp(path)
+            if entry['size'] == stamp['size'] and entry['mtime'] == stamp['mtime']:
+                unchanged_paths.append(path)
+            else:
+                changed_paths.append(path)
+        return new_paths, changed_paths, unchanged_paths
+
+    def remove_imported(self, path):
+        """删除上次从该文件导入的物体层级，记下顶级物体的变换和集合以便原位替换"""
+        entry = self.entries.get(self._key(path))
+        if entry is None:
+            return 0
+
+        roots = self._existing_roots(entry)
+        self.placements[self._key(path)] = {
+            root.name: (root.matrix_world.copy(), list(root.users_collection)) for root in roots
+        }
+
+        to_remove = set()
+        for root in roots:
+            to_remove.add(root)
+            to_remove.update(root.children_recursive)
+        # 只被这些物体使用的数据一并删除
+        data_blocks = {obj.data for obj in to_remove if obj.data is not None and obj.data.users == 1}
+        bpy.data.batch_remove(list(to_remove) + list(data_blocks))
+        return len(to_remove)
+
+    def prepare_sync(self, paths):
+        """
+        同步导入前的准备：删除变化文件的旧物体。
+        返回 (需要导入的文件, 跳过的未变化文件数, 替换的变化文件数)
+        """
+        new_paths, changed_paths, unchanged_paths = self.classify(paths)
+        for path in changed_paths:
+            self.remove_imported(path)
+        unchanged = set(unchanged_paths)
+        to_import = [path for path in paths if path not in unchanged]
+        return to_import, len(unchanged_paths), len(changed_paths)
+
+    def _restore_placement(self, placement, roots):
+        """让替换后的顶级物体沿用旧物体的变换和所在集合"""
+        for root in roots:
+            previous = placement.get(root.name)
+            if previous is None and len(placement) == 1 and len(roots) == 1:
+                previous = next(iter(placement.values()))
+            if previous is None:
+                continue
+            matrix_world, collections = previous
+            root.matrix_world = matrix_world
+            for collection in collections:
+                if root.name not in collection.objects:
+                    collection.objects.link(root)
+            for collection in list(root.users_collection):
+                if collection not in collections:
+                    collection.objects.unlink(root)
+
+    def record(self, path, imported_objects):
+        """记录源文件本次导入的顶级物体"""
+        key = self._key(path)
+        roots = get_root_objects(imported_objects)
+        placement = self.placements.pop(key, None)
+        if placement:
+            self._restore_placement(placement, roots)
+        entry = get_file_stamp(path)
+        entry['roots'] = [root.name for root in roots]
+        self.entries[key] = entry
+
+    def record_tagged(self, objects):
+        """按工作进程写在物体上的源文件属性分组记录，记录后移除该属性"""
+        by_source = {}
+        for obj in objects:
+            source = obj.get(SOURCE_FILE_PROPERTY)
+            if source:
+                by_source.setdefault(source, []).append(obj)
+        for source, source_objects in by_source.items():
+            self.record(source, source_objects)
+        clear_source_tags(objects)
+
+    def save(self):
+        self.scene[LEDGER_PROPERTY] = json.dumps(
+            {'version': LEDGER_VERSION, 'entries': self.entries}, ensure_ascii=False)
+
+
+def create_import_ledger(scene):
+    """启用同步导入时返回场景的导入台账，否则返回None"""
+    if getattr(scene, 'import_sync_mode', False):
+        return ImportLedger(scene)
+    return None
@@ -1,8 +1,154 @@
 import bpy
 import os
-from bpy.props import StringProperty
+import time
+import shutil
+import tempfile
+from bpy.props import StringProperty, BoolProperty, IntProperty
 from bpy.types import Operator
 
+from . import HeadlessWorker
+from . import ImportLedger
+
+
+def collect_files(directory, extension):
+    """递归收集目录中指定扩展名的文件"""
+    found_files = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.lower().endswith(extension):
+                found_files.append(os.path.join(root, file))
+    return found_files
+
+def import_file(file_format, filepath):
+    """导入单个FBX/OBJ文件，返回新增的物体列表。OBJ导入的物体以文件名命名"""
+    existing_objects = set(bpy.data.objects)
+    if file_format == 'fbx':
+        bpy.ops.import_scene.fbx(filepath=filepath)
+    elif hasattr(bpy.ops.wm, "obj_import"):
+        # Blender 4.0 移除了旧的OBJ导入操作符
+        bpy.ops.wm.obj_import(filepath=filepath)
+    else:
+        bpy.ops.import_scene.obj(filepath=filepath)
+    imported_objects = [obj for obj in bpy.data.objects if obj not in existing_objects]
+
+    if file_format == 'obj':
+        # 获取文件名（不包含扩展名）作为物体名称
+        obj_name = os.path.splitext(os.path.basename(filepath))[0]
+        for obj in imported_objects:
+            obj.name = obj_name
+    return imported_objects
+
+def run_import_job(job):
+    """
+    后台工作进程中执行的导入任务：导入 job['files'] 中的文件，
+    把导入的物体（连同网格、材质等依赖数据）写入 job['shard_path'] 分片文件。
+    """
+    items = []
+    imported_objects = set()
+    for filepath in job['files']:
+        try:
+            new_objects = import_file(job['format'], filepath)
+            # 标记源文件，追加回界面会话后用于更新导入台账
+            for obj in new_objects:
+                obj[ImportLedger.SOURCE_FILE_PROPERTY] = filepath
+            imported_objects.update(new_objects)
+            items.append({'name': filepath, 'success': True,
+                          'objects': [obj.name for obj in new_objects]})
+        except Exception as e:
+            items.append({'name': filepath, 'success': False, 'error': str(e)})
+
+    if imported_objects:
+        bpy.data.libraries.write(job['shard_path'], imported_objects, path_remap='ABSOLUTE')
+    return items
+
+def append_shard(shard_path, collection):
+    """从分片文件一次追加全部物体并链接到目标集合，返回追加的物体"""
+    with bpy.data.libraries.load(shard_path, link=False) as (data_from, data_to):
+        data_to.objects = list(data_from.objects)
+
+    appended_objects = [obj for obj in data_to.objects if obj is not None]
+    for obj in appended_objects:
+        collection.objects.link(obj)
+    return appended_objects
+
+def import_with_worker_pool(context, file_format, files, worker_count=0, ledger=None):
+    """
+    把文件列表分发到多个后台Blender进程并行导入，每个进程把导入结果保存为分片 .blend，
+    最后在当前会话中逐个分片追加。传入导入台账时按源文件记录追加的物体。
+    返回 (成功条目, 失败条目, 追加的物体)。
+    """
+    shards = HeadlessWorker.split_into_shards(files, HeadlessWorker.resolve_worker_count(worker_count))
+    shard_dir = tempfile.mkdtemp(prefix="mixtools_import_")
+    appended_objects = []
+    try:
+        jobs = [{'type': 'import_files', 'format': file_format, 'files': shard,
+                 'shard_path': os.path.join(shard_dir, f"shard_{index:03d}.blend")}
+                for index, shard in enumerate(shards)]
+        results = HeadlessWorker.run_worker_pool(jobs, max_workers=len(jobs))
+        succeeded, failed = HeadlessWorker.collect_items(results)
+
+        collection = context.collection or context.scene.collection
+        for job in jobs:
+            if os.path.exists(job['shard_path']):
+                appended_objects.extend(append_shard(job['shard_path'], collection))
+        
+        if ledger is not None:
+            ledger.record_tagged(appended_objects)
+        else:
+            ImportLedger.clear_source_tags(appended_objects)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    return succeeded, failed, appended_objects
+
+def batch_import(operator, context, file_format):
+    """批量导入操作符的公共流程：串行逐个导入，或分发到后台进程并行导入"""
+    start_time = time.time()
+    files = collect_files(operator.directory, '.' + file_format)
+    if not files:
+        operator.report({'WARNING'}, f"目录中没有找到{file_format.upper()}文件")
+        return {'CANCELLED'}
+
+    # 同步导入：跳过未变化的文件，删除变化文件的旧物体
+    ledger = ImportLedger.create_import_ledger(context.scene)
+    sync_message = ""
+    if ledger is not None:
+        files, skipped_count, replaced_count = ledger.prepare_sync(files)
+        sync_message = f", 跳过未变化{skipped_count}个, 替换{replaced_count}个"
+        if not files:
+            ledger.save()
+            operator.report({'INFO'}, f"所有文件都没有变化{sync_message}")
+            return {'FINISHED'}
+
+    if operator.use_worker_pool:
+        succeeded, failed, appended_objects = import_with_worker_pool(
+            context, file_format, files, operator.worker_count, ledger)
+        if ledger is not None:
+            ledger.save()
+        for item in failed:
+            print(f"导入失败 {item['name']}: {item.get('error')}")
+        elapsed_time = time.time() - start_time
+        message = (f"并行导入完成! 耗时: {elapsed_time:.2f}秒, 成功{len(succeeded)}个文件, "
+                   f"失败{len(failed)}个, 共追加{len(appended_objects)}个物体{sync_message}")
+        operator.report({'WARNING'} if failed else {'INFO'}, message)
+        return {'FINISHED'}
+
+    # 导入每个文件
+    for filepath in files:
+        try:
+            imported_objects = import_file(file_format, filepath)
+            if ledger is not None:
+                ledger.record(filepath, imported_objects)
+            print(f"成功导入: {filepath}")
+        except Exception as e:
+            print(f"导入失败 {filepath}: {str(e)}")
+
+    if ledger is not None:
+        ledger.save()
+
+    elapsed_time = time.time() - start_time
+    operator.report({'INFO'}, f"导入完成! 耗时: {elapsed_time:.2f}秒, 共{len(files)}个文件{sync_message}")
+    return {'FINISHED'}
+
 class mian_OT_batch_import_fbx(Operator):
     """批量导入FBX文件"""
     bl_idname = "operation.batch_import_fbx"
@@ -15,24 +161,21 @@ class mian_OT_batch_import_fbx(Operator):
         description="选择包含FBX文件的目录",
         subtype='DIR_PATH'
     )
+    use_worker_pool: BoolProperty(
+        name="并行导入",
+        description="把文件分发到多个后台Blender进程导入，每个进程保存分片文件后再追加到当前场景",
+        default=False
+    )
+    worker_count: IntProperty(
+        name="进程数",
+        description="并行导入使用的后台Blender进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64
+    )
 
     def execute(self, context):
-        # 获取所有FBX文件
-        fbx_files = []
-        for root, dirs, files in os.walk(self.directory):
-            for file in files:
-                if file.lower().endswith('.fbx'):
-                    fbx_files.append(os.path.join(root, file))
-
-        # 导入每个FBX文件
-        for fbx_file in fbx_files:
-            try:
-                bpy.ops.import_scene.fbx(filepath=fbx_file)
-                print(f"成功导入: {fbx_file}")
-            except Exception as e:
-                print(f"导入失败 {fbx_file}: {str(e)}")
-
-        return {'FINISHED'}
+        return batch_import(self, context, 'fbx')
 
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
@@ -50,34 +193,21 @@ class mian_OT_batch_import_obj(Operator):
         description="选择包含OBJ文件的目录",
         subtype='DIR_PATH'
     )
+    use_worker_pool: BoolProperty(
+        name="并行导入",
+        description="把文件分发到多个后台Blender进程导入，每个进程保存分片文件后再追加到当前场景",
+        default=False
+    )
+    worker_count: IntProperty(
+        name="进程数",
+        description="并行导入使用的后台Blender进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64
+    )
 
     def execute(self, context):
-        # 获取所有OBJ文件
-        obj_files = []
-        for root, dirs, files in os.walk(self.directory):
-            for file in files:
-                if file.lower().endswith('.obj'):
-                    obj_files.append(os.path.join(root, file))
-
-        # 导入每个OBJ文件
-        for obj_file in obj_files:
-            try:
-                # 获取文件名（不包含扩展名）作为物体名称
-                obj_name = os.path.splitext(os.path.basename(obj_file))[0]
-                
-                # 导入OBJ文件
-                bpy.ops.import_scene.obj(filepath=obj_file)
-                
-                # 获取最后导入的物体并重命名
-                imported_objects = [obj for obj in context.selected_objects]
-                for obj in imported_objects:
-                    obj.name = obj_name
-                
-                print(f"成功导入: {obj_file}")
-            except Exception as e:
-                print(f"导入失败 {obj_file}: {str(e)}")
-
-        return {'FINISHED'}
+        return batch_import(self, context, 'obj')
 
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
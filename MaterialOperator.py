@@ -3,6 +3,8 @@ import random
 import math
 import re
 
+from . import utils
+
 
 # ---------------------------------------------------------------------------
 # 材质属性设置 - 基类与子类
@@ -227,9 +229,7 @@ class MergeMaterial(bpy.types.Operator):
         for obj in mesh_objs:
             print(obj.name)
             # Delete all materials in the mesh
-            for i in range(len(obj.material_slots)):
-                with bpy.context.temp_override(object=obj):
-                    bpy.ops.object.material_slot_remove()
+            obj.data.materials.clear()
             mat = bpy.data.materials.new(obj.name)
             obj.data.materials.append(mat)
         return {'FINISHED'}
@@ -470,76 +470,16 @@ class OBJECT_OT_MergeDuplicateMaterials(bpy.types.Operator):
     bl_description = "合并带有.001, .002等后缀的重复材质球以及参数完全相同的材质"
     bl_options = {'REGISTER', 'UNDO'}
     
-    def are_materials_identical(self, mat1, mat2):
-        """比较两个材质的参数是否完全相同"""
-        # 如果两个材质有不同的节点树设置（一个有节点树，一个没有）
-        if (mat1.use_nodes != mat2.use_nodes):
-            return False
-            
-        # 如果材质不使用节点，比较基本属性
-        if not mat1.use_nodes:
-            # 比较基本颜色和其他属性
-            if (mat1.diffuse_color != mat2.diffuse_color or
-                mat1.metallic != mat2.metallic or
-                mat1.roughness != mat2.roughness or
-                mat1.blend_method != mat2.blend_method):
-                return False
-            return True
-            
-        # 对于使用节点的材质，检查节点结构
-        if len(mat1.node_tree.nodes) != len(mat2.node_tree.nodes):
-            return False
-            
-        # 比较主要节点的关键参数
-        for node1 in mat1.node_tree.nodes:
-            if node1.type == 'BSDF_PRINCIPLED':
-                # 查找对应的节点
-                principled_found = False
-                for node2 in mat2.node_tree.nodes:
-                    if node2.type == 'BSDF_PRINCIPLED':
-                        principled_found = True
-                        # 比较关键输入参数
-                        if (node1.inputs['Base Color'].default_value[:] != node2.inputs['Base Color'].default_value[:] or
-                            node1.inputs['Metallic'].default_value != node2.inputs['Metallic'].default_value or
-                            node1.inputs['Roughness'].default_value != node2.inputs['Roughness'].default_value or
-                            node1.inputs['Specular'].default_value != node2.inputs['Specular'].default_value or
-                            node1.inputs['Emission Strength'].default_value != node2.inputs['Emission Strength'].default_value):
-                            return False
-                            
-                if not principled_found:
-                    return False
-                    
-            elif node1.type == 'TEX_IMAGE':
-                # 查找是否有对应的图像纹理节点
-                image_found = False
-                for node2 in mat2.node_tree.nodes:
-                    if node2.type == 'TEX_IMAGE':
-                        # 如果两者都有图像
-                        if node1.image and node2.image:
-                            if node1.image.name == node2.image.name:
-                                image_found = True
-                                break
-                        # 如果两者都没有图像
-                        elif not node1.image and not node2.image:
-                            image_found = True
-                            break
-                                
-                # 如果没有找到对应的图像节点
-                if not image_found and node1.image:
-                    return False
-        
-        # 检查材质的渲染设置
-        if (mat1.blend_method != mat2.blend_method or
-            mat1.shadow_method != mat2.shadow_method or
-            mat1.alpha_threshold != mat2.alpha_threshold):
-            return False
-            
-        # 通过所有检查，认为材质参数相同
-        return True
+    def get_merge_signature(self, material):
+        """材质的合并签名：节点内容签名加上渲染设置，签名相同的材质视为参数完全相同"""
+        return (utils.get_material_signature(material),
+                material.blend_method,
+                material.shadow_method,
+                round(material.alpha_threshold, 6))
     
     def execute(self, context):
         # 收集所有材质球
-        all_materials = bpy.data.materials
+        all_materials = list(bpy.data.materials)
         
         # 用于存储基础材质名称到材质对象的映射
         base_materials = {}
@@ -576,66 +516,40 @@ class OBJECT_OT_MergeDuplicateMaterials(bpy.types.Operator):
                 # 移除已处理的第一个材质
                 duplicates.pop(0)
         
-        # 计数器
-        replaced_count = 0
-        removed_count = 0
-        identical_count = 0
-        
-        # 第二遍：替换所有引用并删除重复材质
+        # 第二遍：同名材质映射到基础材质 {旧材质: 新材质}
+        name_map = {}
         for base_name, duplicates in materials_to_replace.items():
-            if base_name in base_materials:
-                base_mat = base_materials[base_name]
-                
-                # 遍历所有对象
-                for obj in bpy.data.objects:
-                    if obj.type == 'MESH' and obj.material_slots:
-                        # 检查每个材质槽
-                        for slot in obj.material_slots:
-                            if slot.material in duplicates:
-                                slot.material = base_mat
-                                replaced_count += 1
-                
-                # 删除不再使用的重复材质
+            base_mat = base_materials.get(base_name)
+            if base_mat:
                 for dup_mat in duplicates:
-                    # 确保材质不再被使用
-                    if dup_mat.users == 0:
-                        bpy.data.materials.remove(dup_mat)
-                        removed_count += 1
-        
-        # 第三遍：寻找并合并参数完全相同的材质（不限于同名）
-        for i, mat1 in enumerate(all_materials):
-            # 如果材质已被删除，跳过
-            if mat1.name not in bpy.data.materials:
+                    name_map[dup_mat] = base_mat
+        
+        # 第三遍：按签名分桶，参数完全相同的材质映射到桶内第一个材质（不限于同名）
+        identical_map = {}
+        signature_buckets = {}
+        for mat in all_materials:
+            if mat in name_map:
                 continue
-                
-            for j in range(i + 1, len(all_materials)):
-                # 获取第二个材质（如果它还存在）
-                if j >= len(all_materials):
-                    break
-                    
-                mat2_name = all_materials[j].name
-                if mat2_name not in bpy.data.materials:
-                    continue
-                    
-                mat2 = bpy.data.materials[mat2_name]
-                
-                # 如果两个材质参数完全相同
-                if self.are_materials_identical(mat1, mat2):
-                    print(f"发现完全相同的材质: {mat1.name} 和 {mat2.name}")
-                    
-                    # 遍历所有对象，将引用mat2的材质替换为mat1
-                    for obj in bpy.data.objects:
-                        if obj.type == 'MESH' and obj.material_slots:
-                            # 检查每个材质槽
-                            for slot in obj.material_slots:
-                                if slot.material == mat2:
-                                    slot.material = mat1
-                                    identical_count += 1
-                    
-                    # 如果mat2不再被使用，删除它
-                    if mat2.users == 0:
-                        bpy.data.materials.remove(mat2)
-                        removed_count += 1
+            kept_mat = signature_buckets.setdefault(self.get_merge_signature(mat), mat)
+            if kept_mat is not mat:
+                print(f"发现完全相同的材质: {kept_mat.name} 和 {mat.name}")
+                identical_map[mat] = kept_mat
+        
+        # 同名材质的基础材质也可能被合并到相同参数的材质
+        material_map = dict(identical_map)
+        for old_mat, base_mat in name_map.items():
+            material_map[old_mat] = identical_map.get(base_mat, base_mat)
+        
+        # 一次遍历替换所有材质槽，只访问实际使用这些材质的物体
+        slot_counts, _ = utils.remap_material_slots(material_map, use_user_map=True)
+        replaced_count = sum(count for mat, count in slot_counts.items() if mat in name_map)
+        identical_count = sum(slot_counts.values()) - replaced_count
+        
+        # 一次性删除不再使用的重复材质
+        unused_materials = [mat for mat in material_map if mat.users == 0]
+        if unused_materials:
+            bpy.data.batch_remove(unused_materials)
+        removed_count = len(unused_materials)
         
         self.report({'INFO'}, f"合并完成：替换了 {replaced_count} 个同名材质引用，{identical_count} 个相同参数材质引用，删除了 {removed_count} 个重复材质")
         return {'FINISHED'}
@@ -773,50 +687,26 @@ class CleanUnusedMaterials(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
-        selected_objects = context.selected_objects
         materials_removed = 0
         slots_removed = 0
         
-        for obj in selected_objects:
-            if obj.type != 'MESH' or not obj.data.materials:
-                continue
-                
+        # 共享同一网格的物体只处理一次
+        meshes = {obj.data.as_pointer(): obj.data for obj in utils.iter_selected_mesh_objects(context)
+                  if obj.data.materials}
+        
+        for mesh in meshes.values():
             # 获取每个多边形使用的材质索引
             used_indices = set()
-            for polygon in obj.data.polygons:
+            for polygon in mesh.polygons:
                 used_indices.add(polygon.material_index)
             
-            # 创建一个映射，将旧索引映射到新索引（考虑到删除后的偏移）
-            index_mapping = {}
-            current_new_index = 0
-            
-            # 标记要保留的材质
-            materials_to_keep = []
-            
-            # 遍历所有材质槽，确定哪些需要保留
-            for i, slot in enumerate(obj.material_slots):
-                if i in used_indices:
-                    index_mapping[i] = current_new_index
-                    materials_to_keep.append(slot.material)
-                    current_new_index += 1
-                else:
+            # 从后往前删除未使用的材质槽，Blender 会自动调整后面多边形的材质索引
+            for index in reversed(range(len(mesh.materials))):
+                if index not in used_indices:
+                    if mesh.materials[index] is not None:
+                        materials_removed += 1
+                    mesh.materials.pop(index=index)
                     slots_removed += 1
-            
-            # 调整多边形的材质索引
-            for polygon in obj.data.polygons:
-                if polygon.material_index in index_mapping:
-                    polygon.material_index = index_mapping[polygon.material_index]
-            
-            # 清除所有材质槽
-            while len(obj.material_slots) > 0:
-                obj.active_material_index = 0
-                bpy.ops.object.material_slot_remove({'object': obj})
-            
-            # 重新添加需要保留的材质
-            for mat in materials_to_keep:
-                obj.data.materials.append(mat)
-            
-            materials_removed += len(obj.material_slots) - len(materials_to_keep)
         
         self.report({'INFO'}, f"已清理 {slots_removed} 个未使用的材质槽，移除了 {materials_removed} 个未使用的材质")
         return {'FINISHED'}
@@ -840,28 +730,14 @@ class ReplaceMaterialOperator(bpy.types.Operator):
                 self.report({'WARNING'}, "目标材质不能是源材质之一")
                 return {'CANCELLED'}
             
-        replaced_count = 0
-        affected_objects = 0
-        
-        # 遍历所有选中的物体
-        for obj in context.selected_objects:
-            if obj.type not in {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT'}:
-                continue
-                
-            material_changed = False
-            
-            # 遍历物体的所有材质槽
-            for slot in obj.material_slots:
-                # 检查材质是否在源材质列表中
-                for item in context.scene.source_materials:
-                    if item.material == slot.material:
-                        slot.material = context.scene.target_material
-                        replaced_count += 1
-                        material_changed = True
-                        break
-            
-            if material_changed:
-                affected_objects += 1
+        # 所有源材质映射到目标材质，一次遍历选中物体的材质槽
+        target_material = context.scene.target_material
+        material_map = {item.material: target_material for item in context.scene.source_materials}
+        objects = [obj for obj in context.selected_objects
+                   if obj.type in {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT'}]
+        slot_counts, affected = utils.remap_material_slots(material_map, objects)
+        replaced_count = sum(slot_counts.values())
+        affected_objects = len(affected)
         
         if replaced_count > 0:
             self.report({'INFO'}, f"已在 {affected_objects} 个物体中替换了 {replaced_count} 个材质槽")
@@ -890,9 +766,6 @@ class ReplaceMaterialByKeywordOperator(bpy.types.Operator):
             self.report({'ERROR'}, "请选择目标材质")
             return {'CANCELLED'}
         
-        replaced_count = 0
-        affected_objects = set()
-        
         # 获取选中的物体
         selected_objects = context.selected_objects
         if not selected_objects:
@@ -906,14 +779,10 @@ class ReplaceMaterialByKeywordOperator(bpy.types.Operator):
             self.report({'WARNING'}, "选中的物体中没有MESH类型的物体")
             return {'CANCELLED'}
         
-        # 遍历选中的MESH物体
-        for obj in mesh_objects:
-            for slot in obj.material_slots:
-                # 检查材质是否包含关键字
-                if slot.material and keyword in slot.material.name:
-                    slot.material = target_material
-                    replaced_count += 1
-                    affected_objects.add(obj.name)
+        # 名称包含关键字的材质映射到目标材质，一次遍历选中物体的材质槽
+        material_map = {mat: target_material for mat in bpy.data.materials if keyword in mat.name}
+        slot_counts, affected_objects = utils.remap_material_slots(material_map, mesh_objects)
+        replaced_count = sum(slot_counts.values())
         
         # 显示结果
         if replaced_count > 0:
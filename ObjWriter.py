@@ -0,0 +1,347 @@
+"""
+MixTools OBJ/MTL 直接写出
+
+不经过 ``bpy.ops.export_scene.obj``，也不需要逐个切换选择：
+
+- 在主线程中用 ``foreach_get`` 读取求值后网格的顶点、面角、法线和UV数组，
+  用 NumPy 完成坐标变换和UV/法线去重；
+- 把数组按固定格式整块格式化为文本，写入 OBJ/MTL 文件。
+  格式化和写文件阶段不访问 bpy，可以交给线程池并行。
+
+支持每个物体一个文件，或把多个物体写入同一个 OBJ 文件。
+"""
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+import numpy as np
+from bpy_extras.io_utils import axis_conversion
+
+
+# 可以通过 to_mesh 转换为网格的物体类型
+OBJ_EXPORT_TYPES = {'MESH', 'CURVE', 'SURFACE', 'FONT', 'META'}
+
+# 写文件的缓冲区大小
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+# ---------------------------------------------------------------------------
+# 主线程：读取网格数组
+# ---------------------------------------------------------------------------
+
+def _get_array(collection, attribute, size, dtype):
+    """用 foreach_get 读取整块属性数组。
+
+    dtype 必须与 RNA 的存储类型一致（整数为 np.int32，布尔为 np.bool_），
+    否则 foreach_get 会退回逐个元素转换的慢速路径；需要更宽的类型时读取后再转换。
+    """
+    data = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attribute, data)
+    return data.reshape(-1, size) if size > 1 else data
+
+
+def _get_corner_normals(mesh):
+    """读取面角法线，兼容 Blender 4.1 前后的API"""
+    if hasattr(mesh, "corner_normals"):
+        return _get_array(mesh.corner_normals, "vector", 3, np.float32)
+    mesh.calc_normals_split()
+    return _get_array(mesh.loops, "normal", 3, np.float32)
+
+
+def _deduplicate(rows, decimals):
+    """按写出精度去重，返回 (唯一值, 每行对应的索引)"""
+    if len(rows) == 0:
+        return rows, np.zeros(0, dtype=np.int64)
+    unique, inverse = np.unique(np.round(rows, decimals), axis=0, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+
+def get_material_info(material):
+    """读取写出MTL需要的材质参数：漫反射颜色、透明度和基础色贴图路径"""
+    info = {
+        'name': material.name,
+        'diffuse': tuple(material.diffuse_color[:3]),
+        'alpha': material.diffuse_color[3],
+        'texture': None,
+    }
+    if material.use_nodes and material.node_tree:
+        for node in material.node_tree.nodes:
+            if node.type != 'BSDF_PRINCIPLED':
+                continue
+            base_color = node.inputs.get('Base Color')
+            if base_color is not None:
+                if base_color.is_linked:
+                    from_node = base_color.links[0].from_node
+                    if from_node.type == 'TEX_IMAGE' and from_node.image:
+                        image = from_node.image
+                        info['texture'] = bpy.path.abspath(image.filepath, library=image.library)
+                else:
+                    info['diffuse'] = tuple(base_color.default_value[:3])
+            alpha = node.inputs.get('Alpha')
+            if alpha is not None and not alpha.is_linked:
+                info['alpha'] = alpha.default_value
+            break
+    return info
+
+
+def _normal_matrix(linear):
+    """法线变换矩阵：3x3 变换的余子式矩阵，行列式为负时取反以保持法线朝向"""
+    cofactor = np.array([np.cross(linear[1], linear[2]),
+                         np.cross(linear[2], linear[0]),
+                         np.cross(linear[0], linear[1])])
+    return -cofactor if np.linalg.det(linear) < 0 else cofactor
+
+
+def extract_mesh_arrays(obj, depsgraph, axis_matrix):
+    """读取物体求值后（含修改器）的网格数组，坐标转换到导出坐标系。
+
+    Returns:
+        dict | None - 网格数组；物体没有几何数据时返回None
+    """
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+    if mesh is None:
+        return None
+    try:
+        matrix = np.array(axis_matrix @ eval_obj.matrix_world, dtype=np.float64)
+        linear = matrix[:3, :3]
+
+        vertices = _get_array(mesh.vertices, "co", 3, np.float32) @ linear.T + matrix[:3, 3]
+
+        # 面角按多边形顺序排列
+        loop_starts = _get_array(mesh.polygons, "loop_start", 1, np.int32).astype(np.int64)
+        poly_sizes = _get_array(mesh.polygons, "loop_total", 1, np.int32).astype(np.int64)
+        poly_materials = _get_array(mesh.polygons, "material_index", 1, np.int32)
+        poly_offsets = np.cumsum(poly_sizes) - poly_sizes
+        loop_order = (np.repeat(loop_starts - poly_offsets, poly_sizes) +
+                      np.arange(int(poly_sizes.sum()), dtype=np.int64))
+
+        # 写出时会加上多个物体累计的顶点偏移，转换为 int64 避免溢出
+        loop_vertices = _get_array(mesh.loops, "vertex_index", 1, np.int32).astype(np.int64)[loop_order]
+        loop_edges = _get_array(mesh.loops, "edge_index", 1, np.int32)
+
+        # 法线使用余子式矩阵（逆转置矩阵乘以行列式）变换后重新归一化，
+        # 某个轴缩放为0（如压扁的贴花）时矩阵不可逆，余子式矩阵仍然有定义
+        normals = _get_corner_normals(mesh)[loop_order] @ _normal_matrix(linear).T
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = normals / np.where(lengths > 0, lengths, 1.0)
+        normals, normal_index = _deduplicate(normals, 4)
+
+        uv_layer = mesh.uv_layers.active
+        if uv_layer is not None:
+            uvs, uv_index = _deduplicate(_get_array(uv_layer.data, "uv", 2, np.float32)[loop_order], 6)
+        else:
+            uvs, uv_index = None, None
+
+        # 不属于任何面的松散边
+        edges = _get_array(mesh.edges, "vertices", 2, np.int32).astype(np.int64)
+        loose_mask = np.ones(len(edges), dtype=bool)
+        loose_mask[loop_edges] = False
+
+        return {
+            'name': obj.name,
+            'vertices': vertices,
+            'normals': normals,
+            'uvs': uvs,
+            'loop_vertices': loop_vertices,
+            'loop_normals': normal_index,
+            'loop_uvs': uv_index,
+            'poly_sizes': poly_sizes,
+            'poly_materials': poly_materials,
+            'loose_edges': edges[loose_mask],
+            'materials': [slot.material.name if slot.material else None
+                          for slot in obj.material_slots],
+        }
+    finally:
+        eval_obj.to_mesh_clear()
+
+
+# ---------------------------------------------------------------------------
+# 可在线程中执行：格式化与写文件
+# ---------------------------------------------------------------------------
+
+def _format_rows(row_format, rows):
+    """把二维数组整块格式化为文本，每行使用同一个格式"""
+    if len(rows) == 0:
+        return ""
+    return (row_format * len(rows)) % tuple(np.asarray(rows).ravel().tolist())
+
+
+def format_object(data, offsets, use_materials=True):
+    """格式化一个物体的OBJ文本。
+
+    Args:
+        data: dict - extract_mesh_arrays 的结果
+        offsets: tuple - 此前已写出的 (顶点数, UV数, 法线数)，合并写出时用于索引偏移
+
+    Returns:
+        str - OBJ 文本
+    """
+    vertex_offset, uv_offset, normal_offset = offsets
+    parts = [f"o {data['name']}\n",
+             _format_rows("v %.6f %.6f %.6f\n", data['vertices'])]
+    has_uvs = data['uvs'] is not None
+    if has_uvs:
+        parts.append(_format_rows("vt %.6f %.6f\n", data['uvs']))
+    parts.append(_format_rows("vn %.4f %.4f %.4f\n", data['normals']))
+
+    if has_uvs:
+        corners = np.stack([data['loop_vertices'] + vertex_offset + 1,
+                            data['loop_uvs'] + uv_offset + 1,
+                            data['loop_normals'] + normal_offset + 1], axis=1)
+        corner_format = "%d/%d/%d"
+    else:
+        corners = np.stack([data['loop_vertices'] + vertex_offset + 1,
+                            data['loop_normals'] + normal_offset + 1], axis=1)
+        corner_format = "%d//%d"
+
+    poly_sizes = data['poly_sizes']
+    poly_materials = data['poly_materials']
+    poly_starts = np.cumsum(poly_sizes) - poly_sizes
+    materials = data['materials']
+
+    # 按材质分组，组内按边数分组，同边数的面整块格式化
+    for material_index in np.unique(poly_materials):
+        material_mask = poly_materials == material_index
+        if use_materials and 0 <= material_index < len(materials) and materials[material_index]:
+            parts.append(f"usemtl {materials[material_index]}\n")
+        for size in np.unique(poly_sizes[material_mask]):
+            starts = poly_starts[material_mask & (poly_sizes == size)]
+            loop_indices = starts[:, None] + np.arange(size)
+            rows = corners[loop_indices].reshape(len(starts), -1)
+            face_format = "f " + " ".join([corner_format] * int(size)) + "\n"
+            parts.append(_format_rows(face_format, rows))
+
+    if len(data['loose_edges']):
+        parts.append(_format_rows("l %d %d\n", data['loose_edges'] + vertex_offset + 1))
+    return "".join(parts)
+
+
+def format_mtl(material_infos, copy_textures=True):
+    """格式化MTL文本，贴图已复制到输出目录时使用相对路径引用"""
+    parts = ["# MixTools MTL\n"]
+    for info in material_infos:
+        parts.append(f"\nnewmtl {info['name']}\n")
+        parts.append("Kd %.6f %.6f %.6f\n" % tuple(info['diffuse']))
+        parts.append("d %.6f\n" % info['alpha'])
+        parts.append("illum 1\n")
+        texture = info['texture']
+        if texture and os.path.exists(texture):
+            if copy_textures:
+                texture = os.path.basename(texture)
+            parts.append(f"map_Kd {texture}\n")
+    return "".join(parts)
+
+
+def write_obj_file(job):
+    """写出一个OBJ文件及其MTL文件，不访问 bpy，可在线程池中执行。
+
+    Returns:
+        str - OBJ 文件路径
+    """
+    obj_path = job['obj_path']
+    mtl_path = job.get('mtl_path')
+
+    with open(obj_path, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write("# MixTools OBJ\n")
+        if mtl_path:
+            f.write(f"mtllib {os.path.basename(mtl_path)}\n")
+        for data, offsets in job['objects']:
+            f.write(format_object(data, offsets, use_materials=mtl_path is not None))
+
+    if mtl_path:
+        with open(mtl_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(format_mtl(job['materials'], job.get('copy_textures', True)))
+    return obj_path
+
+
+# ---------------------------------------------------------------------------
+# 对外接口
+# ---------------------------------------------------------------------------
+
+def copy_textures_to(material_infos, output_dir):
+    """把材质引用的贴图复制到输出目录，每个目标文件只复制一次。
+
+    在启动写文件线程之前于当前线程执行，共享同一贴图的任务不会同时写同一个文件。
+    """
+    destinations = {}
+    for info in material_infos:
+        texture = info['texture']
+        if texture and os.path.exists(texture):
+            destinations.setdefault(os.path.join(output_dir, os.path.basename(texture)), texture)
+    for destination, texture in destinations.items():
+        if not os.path.exists(destination):
+            shutil.copy2(texture, destination)
+
+
+def _build_job(obj_path, mesh_data, material_infos, use_materials, copy_textures):
+    """计算每个物体的索引偏移，组装写文件任务"""
+    objects = []
+    vertex_count = uv_count = normal_count = 0
+    used_materials = []
+    for data in mesh_data:
+        objects.append((data, (vertex_count, uv_count, normal_count)))
+        vertex_count += len(data['vertices'])
+        uv_count += len(data['uvs']) if data['uvs'] is not None else 0
+        normal_count += len(data['normals'])
+        for name in data['materials']:
+            if name and name not in used_materials:
+                used_materials.append(name)
+
+    mtl_path = os.path.splitext(obj_path)[0] + ".mtl" if use_materials else None
+    return {
+        'obj_path': obj_path,
+        'mtl_path': mtl_path,
+        'objects': objects,
+        'materials': [material_infos[name] for name in used_materials],
+        'copy_textures': copy_textures,
+    }
+
+
+def export_objects(objects, output_dir, combined_name=None, axis_forward='-Z', axis_up='Y',
+                   use_materials=True, copy_textures=True, max_threads=0):
+    """把物体直接写出为OBJ文件。
+
+    Args:
+        objects: 要导出的物体，非几何类型的物体会被跳过
+        output_dir: str - 输出目录
+        combined_name: str | None - 指定时所有物体写入同一个 <combined_name>.obj，否则每个物体一个文件
+        max_threads: int - 格式化和写文件阶段使用的线程数，0或1为在当前线程写出
+
+    Returns:
+        list[str] - 写出的OBJ文件路径
+    """
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    axis_matrix = axis_conversion(to_forward=axis_forward, to_up=axis_up).to_4x4()
+
+    mesh_data = []
+    material_infos = {}
+    for obj in objects:
+        if obj.type not in OBJ_EXPORT_TYPES:
+            continue
+        data = extract_mesh_arrays(obj, depsgraph, axis_matrix)
+        if data is None:
+            continue
+        mesh_data.append(data)
+        if use_materials:
+            for slot in obj.material_slots:
+                if slot.material and slot.material.name not in material_infos:
+                    material_infos[slot.material.name] = get_material_info(slot.material)
+
+    if combined_name:
+        jobs = [_build_job(os.path.join(output_dir, combined_name + ".obj"),
+                           mesh_data, material_infos, use_materials, copy_textures)] if mesh_data else []
+    else:
+        jobs = [_build_job(os.path.join(output_dir, data['name'] + ".obj"),
+                           [data], material_infos, use_materials, copy_textures)
+                for data in mesh_data]
+
+    if use_materials and copy_textures and jobs:
+        copy_textures_to(material_infos.values(), output_dir)
+
+    if max_threads and max_threads > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            return list(executor.map(write_obj_file, jobs))
+    return [write_obj_file(job) for job in jobs]
@@ -4,7 +4,11 @@ import bpy
 import bmesh
 import random
 import os
+import re
+import json
 import time
+import hashlib
+import tempfile
 from bpy.props import StringProperty, EnumProperty, BoolProperty
 
 # 物体分类关键词定义
@@ -12,6 +16,24 @@ GENDER_KEYWORDS = ['male', 'female']
 BODY_PART_KEYWORDS = ['upper', 'lower', 'feet', 'mouth', 'top', 'bottom', 'hair', 'nose', 'eyes', 'eyebrow', 'head', 'pieces', 'mouse']
 SET_KEYWORDS = ['sets']
 
+# 存放导入目标物体的隐藏集合
+HIDDEN_COLLECTION_NAME = "Hidden_Imported_Objects"
+
+# Blender自动添加的序号后缀（如 .001）
+SERIAL_SUFFIX_PATTERN = re.compile(r'\.\d{3}$')
+
+# 目标库目录文件：与 .blend 同目录的 <文件名>.mixtools_catalog.json，目录不可写时存放在临时目录
+LIBRARY_CATALOG_SUFFIX = ".mixtools_catalog.json"
+LIBRARY_CATALOG_VERSION = 1
+
+# 逐个候选目标输出匹配/不匹配信息（调试用，目标库较大时会产生大量输出）
+DEBUG_MATCHING = False
+
+def debug_log(message):
+    """仅在 DEBUG_MATCHING 开启时输出"""
+    if DEBUG_MATCHING:
+        print(message)
+
 def diagnose_object_parsing(obj_name):
     """诊断物体名称解析过程
     
@@ -23,10 +45,8 @@ def diagnose_object_parsing(obj_name):
     """
     print(f"\n🔍 诊断物体名称解析: {obj_name}")
     
-    import re
-    
     # 去除Blender自动添加的序号
-    base_name = re.sub(r'\.\d{3}$', '', obj_name)
+    base_name = SERIAL_SUFFIX_PATTERN.sub('', obj_name)
     print(f"  基础名称: {base_name}")
     
     name_parts = base_name.split('_')
@@ -101,15 +121,7 @@ def find_matching_random_target(source_gender, source_parts, target_objects):
     Returns:
         dict or None: 匹配的目标物体，如果没有匹配则返回None
     """
-    matching_targets = []
-    
-    for target_obj in target_objects:
-        target_parsed = parse_object_name(target_obj['name'])
-        
-        # 检查性别和部件是否匹配
-        if (target_parsed['gender'] == source_gender and 
-            is_exact_part_match(source_parts, target_parsed['parts'])):
-            matching_targets.append(target_obj)
+    matching_targets = get_target_index(target_objects).find(source_gender, source_parts)
     
     if matching_targets:
         target_obj = random.choice(matching_targets)
@@ -515,10 +527,8 @@ def parse_object_name(obj_name):
             - original_name: 原始名称
             - base_name: 去除序号的基础名称
     """
-    import re
-    
     # 去除Blender自动添加的序号（如 .001, .002 等）
-    base_name = re.sub(r'\.\d{3}$', '', obj_name)
+    base_name = SERIAL_SUFFIX_PATTERN.sub('', obj_name)
     
     name_parts = base_name.split('_')
     result = {
@@ -546,13 +556,77 @@ def parse_object_name(obj_name):
     
     return result
 
+def get_set_member_base_name(obj_name, gender):
+    """套装成员的基础名称：去掉部位和套装关键词后的名称部分"""
+    set_parts = [part for part in obj_name.split('_')
+                 if part.lower() not in BODY_PART_KEYWORDS + SET_KEYWORDS]
+    if set_parts:
+        return '_'.join(set_parts)
+    return f"{gender}_sets"
+
+class TargetIndex:
+    """目标物体索引，每个目标库只建立一次
+    
+    - by_parts: (性别, 部位集合) -> 目标列表，用于精确部位匹配
+    - by_name: 名称 -> 目标
+    - sets_by_gender: 性别 -> [(套装ID, 套装信息)]
+    - set_members: (性别, 套装成员基础名称) -> 目标列表
+    
+    各列表保持目标在 target_objects 中的顺序，匹配结果与逐个扫描一致。
+    """
+    
+    def __init__(self, target_objects):
+        self.target_objects = target_objects
+        self.size = len(target_objects)
+        self.by_parts = {}
+        self.by_name = {}
+        self.set_members = {}
+        
+        for target_obj in target_objects:
+            parsed = target_obj['parsed_info']
+            self.by_name.setdefault(target_obj['name'], target_obj)
+            parts_key = frozenset(part.lower() for part in parsed['parts'])
+            if parts_key:
+                self.by_parts.setdefault((parsed['gender'], parts_key), []).append(target_obj)
+            member_key = (parsed['gender'], get_set_member_base_name(target_obj['name'], parsed['gender']))
+            self.set_members.setdefault(member_key, []).append(target_obj)
+        
+        self.sets_by_gender = {}
+        for set_id, set_info in group_objects_by_sets_smart(target_objects).items():
+            self.sets_by_gender.setdefault(set_info['gender'], []).append((set_id, set_info))
+    
+    def find(self, gender, parts):
+        """性别相同且部位精确匹配的目标列表"""
+        parts_key = frozenset(part.lower() for part in parts)
+        if not parts_key:
+            return []
+        return self.by_parts.get((gender, parts_key), [])
+    
+    def find_in_set(self, gender, set_base_name, parts):
+        """指定套装中性别相同且部位精确匹配的第一个目标"""
+        for target_obj in self.set_members.get((gender, set_base_name), []):
+            if is_exact_part_match(parts, target_obj['parsed_info']['parts']):
+                return target_obj
+        return None
+
+# 最近一次建立的目标索引（同一次替换中各匹配函数共用同一个 target_objects 列表）
+_target_index = None
+
+def get_target_index(target_objects):
+    """获取目标物体列表的索引，同一列表只建立一次"""
+    global _target_index
+    if (_target_index is None or _target_index.target_objects is not target_objects
+            or _target_index.size != len(target_objects)):
+        _target_index = TargetIndex(target_objects)
+    return _target_index
+
 def create_hidden_import_collection():
     """创建不可见不可渲染的固定集合来存储导入的物体
     
     Returns:
         bpy.types.Collection: 隐藏的导入集合
     """
-    collection_name = "Hidden_Imported_Objects"
+    collection_name = HIDDEN_COLLECTION_NAME
     hidden_collection = bpy.data.collections.get(collection_name)
     
     if not hidden_collection:
@@ -658,6 +732,21 @@ def classify_and_organize_objects():
     
     return f"分类完成：{classified_count} 个物体已分类，{unclassified_count} 个物体无法分类"
 
+# 隐藏集合的 名称 -> 物体 映射，集合或其物体数量变化时重建
+_hidden_object_map = {'key': None, 'objects': {}}
+
+def get_hidden_object_map():
+    """获取隐藏集合中物体的名称映射"""
+    hidden_collection = bpy.data.collections.get(HIDDEN_COLLECTION_NAME)
+    if not hidden_collection:
+        return {}
+    
+    key = (hidden_collection.as_pointer(), len(hidden_collection.objects))
+    if _hidden_object_map['key'] != key:
+        _hidden_object_map['objects'] = {obj.name: obj for obj in hidden_collection.objects}
+        _hidden_object_map['key'] = key
+    return _hidden_object_map['objects']
+
 def check_object_exists_in_hidden_collection(obj_name):
     """检查物体是否已存在于隐藏集合中
     
@@ -667,17 +756,91 @@ def check_object_exists_in_hidden_collection(obj_name):
     Returns:
         bpy.types.Object or None: 如果存在返回物体对象，否则返回None
     """
-    hidden_collection = bpy.data.collections.get("Hidden_Imported_Objects")
-    if not hidden_collection:
-        return None
-    
-    # 检查隐藏集合中是否存在同名物体
-    for obj in hidden_collection.objects:
+    obj = get_hidden_object_map().get(obj_name)
+    if obj is None:
+        # 删除一个物体又加入另一个物体时数量不变，映射可能已过期：
+        # 直接在集合中按名称确认一次，找到时让映射在下次使用时重建
+        hidden_collection = bpy.data.collections.get(HIDDEN_COLLECTION_NAME)
+        obj = hidden_collection.objects.get(obj_name) if hidden_collection else None
+        if obj is not None:
+            _hidden_object_map['key'] = None
+        return obj
+    
+    # 物体被删除或改名后映射失效，重建后再查一次
+    try:
         if obj.name == obj_name:
             return obj
-    
+    except ReferenceError:
+        pass
+    _hidden_object_map['key'] = None
+    return get_hidden_object_map().get(obj_name)
+
+def get_library_catalog_paths(file_path):
+    """目录文件的候选路径：优先与 .blend 同目录，其次临时目录"""
+    key = hashlib.md5(os.path.normcase(file_path).encode('utf-8')).hexdigest()
+    return [
+        file_path + LIBRARY_CATALOG_SUFFIX,
+        os.path.join(tempfile.gettempdir(), "mixtools_catalogs", key + ".json"),
+    ]
+
+def read_library_catalog(file_path):
+    """读取与 .blend 文件路径、大小、修改时间都一致的目录，没有则返回None"""
+    stat = os.stat(file_path)
+    for catalog_path in get_library_catalog_paths(file_path):
+        if not os.path.exists(catalog_path):
+            continue
+        try:
+            with open(catalog_path, 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (catalog.get('version') == LIBRARY_CATALOG_VERSION and
+            catalog.get('path') == os.path.normcase(file_path) and
+            catalog.get('size') == stat.st_size and
+            catalog.get('mtime') == stat.st_mtime):
+            return catalog
     return None
 
+def write_library_catalog(file_path, catalog):
+    """保存目录文件，同目录不可写时改存到临时目录"""
+    for catalog_path in get_library_catalog_paths(file_path):
+        try:
+            os.makedirs(os.path.dirname(catalog_path), exist_ok=True)
+            with open(catalog_path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f, ensure_ascii=False)
+            return catalog_path
+        except OSError as e:
+            print(f"无法写入目录文件 {catalog_path}: {e}")
+    return None
+
+def build_library_catalog(file_path):
+    """打开 .blend 读取网格物体名称并解析，生成目录并保存"""
+    stat = os.stat(file_path)
+    with bpy.data.libraries.load(file_path, link=False) as (data_from, data_to):
+        mesh_objects = [name for name in data_from.objects if name in data_from.meshes]
+    
+    catalog = {
+        'version': LIBRARY_CATALOG_VERSION,
+        'path': os.path.normcase(file_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'mesh_objects': mesh_objects,
+        'parsed': {name: parse_object_name(name) for name in mesh_objects},
+    }
+    catalog_path = write_library_catalog(file_path, catalog)
+    if catalog_path:
+        print(f"已保存目标库目录: {catalog_path}")
+    return catalog
+
+def get_library_catalog(file_path):
+    """获取目标库目录：文件未变化时直接读取目录文件，不打开 .blend"""
+    catalog = read_library_catalog(file_path)
+    if catalog is not None:
+        print(f"使用目标库目录缓存: {len(catalog['mesh_objects'])} 个网格物体")
+        return catalog
+    print(f"正在读取文件信息: {file_path}")
+    return build_library_catalog(file_path)
+
 def load_objects_from_blend(file_path):
     """从.blend文件加载物体信息（改进版本 - 检查重复导入）
     
@@ -698,47 +861,44 @@ def load_objects_from_blend(file_path):
     objects_info = []
     
     try:
-        # 新方法：只读取文件信息，不导入到场景
-        print(f"正在读取文件信息: {file_path}")
-        
-        # 使用 bpy.data.libraries.load 只读取信息，不导入
-        with bpy.data.libraries.load(file_path, link=False) as (data_from, data_to):
-            # 只处理网格物体
-            mesh_objects = [name for name in data_from.objects if name in data_from.meshes]
-            print(f"找到 {len(mesh_objects)} 个网格物体")
-            
-            # 为每个网格物体创建信息，检查是否已存在
-            for obj_name in mesh_objects:
-                try:
-                    # 检查物体是否已存在于隐藏集合中
-                    existing_obj = check_object_exists_in_hidden_collection(obj_name)
+        # 只读取网格物体名称和解析结果，不导入到场景；文件未变化时使用目录缓存
+        catalog = get_library_catalog(file_path)
+        mesh_objects = catalog['mesh_objects']
+        parsed_names = catalog['parsed']
+        print(f"找到 {len(mesh_objects)} 个网格物体")
+        
+        # 为每个网格物体创建信息，检查是否已存在
+        for obj_name in mesh_objects:
+            try:
+                # 检查物体是否已存在于隐藏集合中
+                existing_obj = check_object_exists_in_hidden_collection(obj_name)
+                
+                # 解析物体名称
+                parsed_info = parsed_names.get(obj_name) or parse_object_name(obj_name)
+                
+                # 检查是否包含有效信息
+                if parsed_info['gender'] and parsed_info['parts']:
+                    # 创建物体信息
+                    obj_info = {
+                        'name': obj_name,
+                        'object': existing_obj,  # 如果已存在则使用现有物体
+                        'parsed_info': parsed_info,
+                        'location': (0, 0, 0),  # 默认位置
+                        'rotation': (0, 0, 0),  # 默认旋转
+                        'scale': (1, 1, 1),     # 默认缩放
+                        'already_imported': existing_obj is not None  # 标记是否已导入
+                    }
                     
-                    # 解析物体名称
-                    parsed_info = parse_object_name(obj_name)
+                    objects_info.append(obj_info)
                     
-                    # 检查是否包含有效信息
-                    if parsed_info['gender'] and parsed_info['parts']:
-                        # 创建物体信息
-                        obj_info = {
-                            'name': obj_name,
-                            'object': existing_obj,  # 如果已存在则使用现有物体
-                            'parsed_info': parsed_info,
-                            'location': (0, 0, 0),  # 默认位置
-                            'rotation': (0, 0, 0),  # 默认旋转
-                            'scale': (1, 1, 1),     # 默认缩放
-                            'already_imported': existing_obj is not None  # 标记是否已导入
-                        }
-                        
-                        objects_info.append(obj_info)
+                    if existing_obj:
+                        print(f"  ✓ 物体 '{obj_name}' 已存在，直接引用")
+                    else:
+                        print(f"  + 物体 '{obj_name}' 需要导入")
                         
-                        if existing_obj:
-                            print(f"  ✓ 物体 '{obj_name}' 已存在，直接引用")
-                        else:
-                            print(f"  + 物体 '{obj_name}' 需要导入")
-                            
-                except Exception as e:
-                    print(f"处理物体 {obj_name} 时出错: {e}")
-                    continue
+            except Exception as e:
+                print(f"处理物体 {obj_name} 时出错: {e}")
+                continue
         
         print(f"文件读取完成: 总网格物体 {len(mesh_objects)} 个，有效物体 {len(objects_info)} 个")
         
@@ -801,6 +961,7 @@ def find_matching_objects(source_objects, target_objects):
         dict: 匹配结果字典
     """
     matches = {}
+    target_index = get_target_index(target_objects)
     
     print(f"\n🔍 开始匹配: 源物体 {len(source_objects)} 个，目标物体 {len(target_objects)} 个")
     
@@ -820,39 +981,23 @@ def find_matching_objects(source_objects, target_objects):
         print(f"      性别: {source_info['gender']}, 部位: {source_info['parts']}")
         
         # 如果是 mouth 部件，进行详细诊断
-        if 'mouth' in source_info['parts']:
+        if DEBUG_MATCHING and 'mouth' in source_info['parts']:
             print(f"      🔍 检测到 mouth 部件，进行详细诊断...")
             diagnose_object_parsing(source_obj.name)
         
-        # 找到匹配的目标物体
-        matching_targets = []
-        best_match_score = 0
+        # 通过索引查找性别和部位精确匹配的目标物体
+        matching_targets = list(target_index.find(source_info['gender'], source_info['parts']))
         
-        for target_obj in target_objects:
-            target_info = target_obj['parsed_info']
-            
-            # 检查性别是否匹配
-            gender_match = source_info['gender'] == target_info['gender']
-            
-            if not gender_match:
-                print(f"      ❌ 性别不匹配: {target_obj['name']} (源: {source_info['gender']}, 目标: {target_info['gender']})")
-                continue
-            
-            # 检查部件是否精确匹配
-            is_exact_match = is_exact_part_match(source_info['parts'], target_info['parts'])
-            
-            if is_exact_match:
-                source_parts = set(source_info['parts'])
-                target_parts = set(target_info['parts'])
-                exact_matches = source_parts.intersection(target_parts)
-                
-                print(f"      ✅ 精确匹配: {target_obj['name']} (匹配部件: {list(exact_matches)})")
-                matching_targets.append(target_obj)
-            else:
-                source_parts = set(source_info['parts'])
-                target_parts = set(target_info['parts'])
-                print(f"      ❌ 部位不匹配: {target_obj['name']} (源: {list(source_parts)}, 目标: {list(target_parts)})")
-                print(f"         💡 不是精确匹配")
+        if DEBUG_MATCHING:
+            matched_names = {target_obj['name'] for target_obj in matching_targets}
+            for target_obj in target_objects:
+                target_info = target_obj['parsed_info']
+                if target_obj['name'] in matched_names:
+                    print(f"      ✅ 精确匹配: {target_obj['name']} (匹配部件: {target_info['parts']})")
+                elif source_info['gender'] != target_info['gender']:
+                    print(f"      ❌ 性别不匹配: {target_obj['name']} (源: {source_info['gender']}, 目标: {target_info['gender']})")
+                else:
+                    print(f"      ❌ 部位不匹配: {target_obj['name']} (源: {source_info['parts']}, 目标: {target_info['parts']})")
         
         if matching_targets:
             print(f"      📊 找到 {len(matching_targets)} 个精确匹配目标")
@@ -1000,11 +1145,8 @@ def safe_copy_mesh_data(source_mesh, target_mesh, new_name):
             _ = len(new_mesh.polygons)
         except Exception as new_mesh_error:
             print(f"✗ 新网格无效: {new_mesh_error}")
-            # 清理无效的网格
-            try:
-                bpy.data.meshes.remove(new_mesh)
-            except:
-                pass
+            # 记录无效的网格，替换结束时统一清理
+            get_replacement_allocations().add(new_mesh)
             return None
             
         return new_mesh
@@ -1090,9 +1232,8 @@ def replace_whole_set(source_objects, target_objects, used_targets=None):
                 else:
                     source_obj.name = target_obj['name']
                 
-                # 清理旧网格
-                if old_mesh and old_mesh.users == 0:
-                    bpy.data.meshes.remove(old_mesh)
+                # 记录旧网格，整套替换完成后统一清理
+                get_replacement_allocations().add(old_mesh)
                 
                 successful_replacements.append((source_obj, target_obj))
                 print(f"  ✓ 替换: {source_obj.name}")
@@ -1102,6 +1243,9 @@ def replace_whole_set(source_objects, target_objects, used_targets=None):
         else:
             print(f"      ⏭️ 跳过 {source_obj.name}：无精确匹配目标（避免错误替换）")
     
+    # 一次性删除被替换下来的旧网格及随之孤立的材质等数据
+    purge_replacement_allocations()
+    
     print(f"\n📊 整套替换完成: 成功 {len(successful_replacements)} 个")
     
     # 打印批量替换的详细对应关系
@@ -1313,50 +1457,50 @@ def import_target_objects(replacement_plan, file_path):
     # 确保隐藏集合存在
     hidden_collection = create_hidden_import_collection()
     
-    # 批量导入
-    for target_name in unique_targets:
+    # 已在隐藏集合中的物体直接引用，其余的一次性从源文件追加
+    names_to_load = []
+    for target_name in sorted(unique_targets):
+        existing_obj = check_object_exists_in_hidden_collection(target_name)
+        if existing_obj:
+            imported_objects[target_name] = existing_obj
+            print(f"  ✓ 已存在，直接引用: {target_name}")
+        else:
+            names_to_load.append(target_name)
+    
+    if names_to_load:
         try:
-            # 检查是否已存在
-            existing_obj = check_object_exists_in_hidden_collection(target_name)
-            if existing_obj:
-                imported_objects[target_name] = existing_obj
-                print(f"  ✓ 已存在，直接引用: {target_name}")
+            # 只打开一次源文件，按名称列表追加全部目标物体
+            with bpy.data.libraries.load(file_path, link=False) as (data_from, data_to):
+                available_names = set(data_from.objects)
+                requested_names = [name for name in names_to_load if name in available_names]
+                data_to.objects = list(requested_names)
+            loaded_objects = dict(zip(requested_names, data_to.objects))
+        except Exception as e:
+            print(f"  ✗ 导入错误: {file_path} - {e}")
+            loaded_objects = {}
+        
+        for target_name in names_to_load:
+            # 追加时如有同名物体会被重命名，因此使用返回的物体而不是按名称查找
+            imported_obj = loaded_objects.get(target_name)
+            if imported_obj is None:
+                print(f"  ✗ 导入失败: {target_name}")
                 continue
             
-            # 导入新物体
-            bpy.ops.wm.append(
-                filepath=file_path,
-                directory=file_path + "/Object/",
-                filename=target_name
-            )
+            # 验证导入的物体
+            is_valid = log_imported_object_validation(target_name, imported_obj, "  ")
+            if not is_valid:
+                print(f"  ✗ 导入的物体无效: {target_name}")
+                continue
             
-            if target_name in bpy.data.objects:
-                imported_obj = bpy.data.objects[target_name]
-                
-                # 验证导入的物体
-                is_valid = log_imported_object_validation(target_name, imported_obj, "  ")
-                if not is_valid:
-                    print(f"  ✗ 导入的物体无效: {target_name}")
-                    continue
-                
-                # 将物体移动到隐藏集合
-                # 先从当前集合中移除
-                for collection in imported_obj.users_collection:
-                    collection.objects.unlink(imported_obj)
-                
-                # 添加到隐藏集合
-                hidden_collection.objects.link(imported_obj)
-                
-                # 标记为导入的物体
-                imported_obj['is_imported_temp'] = True
-                imported_obj['is_in_hidden_collection'] = True
-                
-                imported_objects[target_name] = imported_obj
-                print(f"  ✓ 导入到隐藏集合: {target_name}")
-            else:
-                print(f"  ✗ 导入失败: {target_name}")
-        except Exception as e:
-            print(f"  ✗ 导入错误: {target_name} - {e}")
+            # 先标记为导入的物体，链接中断时遗留的物体也能被识别和清理
+            imported_obj['is_imported_temp'] = True
+            
+            # 追加的物体不属于任何集合，直接链接到隐藏集合
+            hidden_collection.objects.link(imported_obj)
+            imported_obj['is_in_hidden_collection'] = True
+            
+            imported_objects[target_name] = imported_obj
+            print(f"  ✓ 导入到隐藏集合: {target_name}")
     
     print(f"\n📊 导入统计:")
     print(f"  总目标数: {len(unique_targets)}")
@@ -1452,13 +1596,9 @@ def execute_replacements(replacement_plan, imported_objects):
                 source_obj.name = target_name
             log_replacement_step("名称更新完成", obj_name, f"新名称: {source_obj.name}")
             
-            # 步骤7: 清理旧网格
-            log_replacement_step("清理旧网格", obj_name, f"检查 {old_mesh.name} 使用情况")
-            if old_mesh and old_mesh.users == 0:
-                bpy.data.meshes.remove(old_mesh)
-                log_replacement_step("旧网格已删除", obj_name, f"删除 {old_mesh.name}")
-            else:
-                log_replacement_step("保留旧网格", obj_name, f"{old_mesh.name} 仍被 {old_mesh.users} 个对象使用")
+            # 步骤7: 记录旧网格，全部替换完成后统一清理
+            get_replacement_allocations().add(old_mesh)
+            log_replacement_step("记录旧网格", obj_name, f"{old_mesh.name} 待替换完成后清理")
             
             # 步骤8: 检查替换后状态
             after_state = snapshot_object_state(source_obj)
@@ -1543,22 +1683,12 @@ def cleanup_imported_objects(imported_objects):
     Args:
         imported_objects (dict): 导入的物体映射
     """
-    removed_count = 0
-    for target_name, imported_obj in imported_objects.items():
-        try:
-            # 只清理不在隐藏集合中的临时物体
-            if (imported_obj.name in bpy.data.objects and 
-                not imported_obj.get('is_in_hidden_collection', False)):
-                bpy.data.objects.remove(imported_obj, do_unlink=True)
-                removed_count += 1
-        except Exception as e:
-            pass
-    
-    if removed_count > 0:
-        print(f"清理完成: 删除了 {removed_count} 个临时物体")
+    allocations = get_replacement_allocations()
+    for imported_obj in imported_objects.values():
+        allocations.add_temp_object(imported_obj)
     
-    # 执行递归清理
-    recursive_cleanup_unused_data()
+    # 只删除记录过的临时物体及其变为孤立的数据
+    purge_replacement_allocations()
 
 def find_reference_body_part(source_obj, gender):
     """按照优先级顺序查找参考部件：上身 > 下身 > 头发
@@ -1631,18 +1761,12 @@ def find_matching_target_set(reference_parsed, target_objects):
     print(f"   参考部件性别: {reference_parsed['gender']}")
     print(f"   参考部件套装: {reference_parsed['is_set']}")
     
-    # 按套装分组目标物体
-    target_sets = group_objects_by_sets_smart([{'name': obj['name'], 'parsed_info': obj['parsed_info']} for obj in target_objects])
-    
-    matching_sets = []
-    
-    for target_set_id, target_set_info in target_sets.items():
-        # 检查性别匹配
-        if target_set_info['gender'] != reference_parsed['gender']:
-            continue
-        
-        matching_sets.append((target_set_id, target_set_info))
-        print(f"   ✅ 找到匹配套装: {target_set_id}")
+    # 同性别的目标套装
+    target_index = get_target_index(target_objects)
+    matching_sets = target_index.sets_by_gender.get(reference_parsed['gender'], [])
+    if DEBUG_MATCHING:
+        for target_set_id, target_set_info in matching_sets:
+            print(f"   ✅ 找到匹配套装: {target_set_id}")
     
     if matching_sets:
         # 随机选择一个匹配的套装
@@ -1658,9 +1782,9 @@ def find_matching_target_set(reference_parsed, target_objects):
                 obj_name = first_obj['name']
             
             # 在target_objects中找到对应的物体
-            for target_obj in target_objects:
-                if target_obj['name'] == obj_name:
-                    return target_obj
+            target_obj = target_index.by_name.get(obj_name)
+            if target_obj:
+                return target_obj
     
     print(f"   ❌ 未找到匹配的目标套装")
     return None
@@ -1686,45 +1810,13 @@ def find_matching_part_in_set(source_obj, target_set_obj, target_objects):
     # 获取目标套装的基础名称
     target_base_name = target_set_parsed['base_name']
     
-    # 查找目标套装中的所有物体
-    target_set_objects = []
-    for target_obj in target_objects:
-        target_obj_parsed = parse_object_name(target_obj['name'])
-        
-        # 检查性别匹配
-        if target_obj_parsed['gender'] == source_parsed['gender']:
-            # 检查基础名称是否匹配
-            target_obj_name_parts = target_obj['name'].split('_')
-            target_obj_set_parts = []
-            
-            for part in target_obj_name_parts:
-                part_lower = part.lower()
-                if part_lower not in BODY_PART_KEYWORDS + SET_KEYWORDS:
-                    target_obj_set_parts.append(part)
-            
-            if target_obj_set_parts:
-                target_obj_base_name = '_'.join(target_obj_set_parts)
-            else:
-                target_obj_base_name = f"{target_obj_parsed['gender']}_sets"
-            
-            if target_obj_base_name == target_base_name:
-                target_set_objects.append(target_obj)
-                print(f"      ✅ 性别和套装匹配: {target_obj['name']}")
-            else:
-                print(f"      ❌ 套装不匹配: {target_obj['name']}")
-        else:
-            print(f"      ❌ 性别不匹配: {target_obj['name']}")
-    
-    print(f"   目标套装物体数量: {len(target_set_objects)}")
-    
-    # 查找精确匹配的部件
-    for target_obj in target_set_objects:
-        target_obj_parsed = parse_object_name(target_obj['name'])
-        
-        # 检查部位是否严格匹配
-        if is_exact_part_match(source_parsed['parts'], target_obj_parsed['parts']):
-            print(f"   ✅ 找到精确匹配: {target_obj['name']}")
-            return target_obj
+    # 通过索引查找目标套装中部位精确匹配的部件
+    target_index = get_target_index(target_objects)
+    debug_log(f"   目标套装物体数量: {len(target_index.set_members.get((source_parsed['gender'], target_base_name), []))}")
+    target_obj = target_index.find_in_set(source_parsed['gender'], target_base_name, source_parsed['parts'])
+    if target_obj:
+        print(f"   ✅ 找到精确匹配: {target_obj['name']}")
+        return target_obj
     
     # 如果没有精确匹配，返回None（不进行随机选择）
     print(f"   ❌ 目标套装中无匹配部件")
@@ -1963,6 +2055,108 @@ def find_matching_sets(source_sets, target_sets):
     
     return matches
 
+class ReplacementAllocations:
+    """记录替换过程中创建或变为孤立的数据块，最后一次性删除
+    
+    只检查记录过的数据块及其依赖（网格 -> 材质 -> 图像/节点组），
+    清理耗时与替换数量相关，而不是与整个文件的数据量相关。
+    """
+    
+    def __init__(self):
+        self.candidates = {}  # session_uid -> 数据块
+        self.temp_objects = {}  # session_uid -> 需要删除的临时物体
+    
+    def add(self, *id_blocks):
+        """记录可能变为孤立的数据块（如被替换下来的旧网格）"""
+        for id_block in id_blocks:
+            if id_block is not None:
+                self.candidates[id_block.session_uid] = id_block
+    
+    def add_temp_object(self, obj):
+        """记录替换结束后需要删除的临时物体"""
+        self.temp_objects[obj.session_uid] = obj
+    
+    @staticmethod
+    def get_dependencies(id_block):
+        """数据块删除后可能随之变为孤立的依赖数据"""
+        dependencies = []
+        if isinstance(id_block, bpy.types.Object):
+            dependencies.append(id_block.data)
+        elif isinstance(id_block, bpy.types.Mesh):
+            dependencies.extend(id_block.materials)
+        elif isinstance(id_block, (bpy.types.Material, bpy.types.NodeTree)):
+            node_tree = id_block.node_tree if isinstance(id_block, bpy.types.Material) else id_block
+            if node_tree:
+                for node in node_tree.nodes:
+                    if getattr(node, 'image', None) is not None:
+                        dependencies.append(node.image)
+                    if node.type == 'GROUP' and node.node_tree:
+                        dependencies.append(node.node_tree)
+        return [dependency for dependency in dependencies if dependency is not None]
+    
+    def remove_temp_objects(self):
+        """删除记录的临时物体（已完成导入且实际位于隐藏集合中的物体保留），返回删除数量"""
+        hidden_collection = bpy.data.collections.get(HIDDEN_COLLECTION_NAME)
+        hidden_objects = set(hidden_collection.objects) if hidden_collection else set()
+        objects_to_remove = []
+        for obj in self.temp_objects.values():
+            try:
+                if obj not in hidden_objects or not obj.get('is_in_hidden_collection', False):
+                    objects_to_remove.append(obj)
+            except ReferenceError:
+                pass
+        self.temp_objects.clear()
+        
+        # 物体的网格随之成为清理候选
+        for obj in objects_to_remove:
+            self.add(*self.get_dependencies(obj))
+        if objects_to_remove:
+            bpy.data.batch_remove(objects_to_remove)
+        return len(objects_to_remove)
+    
+    def purge(self):
+        """删除记录中已没有用户的数据块及随之变为孤立的依赖，返回删除数量"""
+        total_removed = 0
+        while self.candidates:
+            removable = []
+            for uid, id_block in list(self.candidates.items()):
+                try:
+                    if id_block.users == 0:
+                        removable.append(id_block)
+                    else:
+                        continue
+                except ReferenceError:
+                    pass
+                del self.candidates[uid]
+            
+            if not removable:
+                break
+            
+            # 删除前记录依赖，删除后其中没有用户的会在下一轮被清理
+            for id_block in removable:
+                self.add(*self.get_dependencies(id_block))
+            bpy.data.batch_remove(removable)
+            total_removed += len(removable)
+        
+        # 仍有用户的数据块不再跟踪
+        self.candidates.clear()
+        return total_removed
+
+# 当前会话的替换数据记录
+_replacement_allocations = ReplacementAllocations()
+
+def get_replacement_allocations():
+    return _replacement_allocations
+
+def purge_replacement_allocations():
+    """删除记录的临时物体和孤立数据块"""
+    allocations = get_replacement_allocations()
+    objects_removed = allocations.remove_temp_objects()
+    data_removed = allocations.purge()
+    if objects_removed or data_removed:
+        print(f"清理完成: 删除了 {objects_removed} 个临时物体, {data_removed} 个无用数据块")
+    return objects_removed, data_removed
+
 def recursive_cleanup_unused_data():
     """递归清理所有无用的数据块"""
     print("开始递归清理无用数据...")
@@ -2062,66 +2256,40 @@ def final_cleanup_after_replacement():
     import gc
     gc.collect()
     
-    # 只清理标记为导入的临时物体，但不清理隐藏集合中的物体
-    objects_cleaned = 0
-    
-    for obj in list(bpy.data.objects):
-        if (obj.type == 'MESH' and 
-            obj.get('is_imported_temp', False) and
-            not obj.get('is_in_hidden_collection', False)):  # 不清理隐藏集合中的物体
-            try:
-                if obj.name in bpy.data.objects:
-                    bpy.data.objects.remove(obj, do_unlink=True)
-                    objects_cleaned += 1
-                    print(f"清理临时物体: {obj.name}")
-            except Exception as e:
-                print(f"清理临时物体 '{obj.name}' 时出错: {e}")
-    
-    # 多次递归清理所有数据
-    for i in range(3):  # 进行3轮深度清理
-        recursive_cleanup_unused_data()
-    
-    # 最终检查：清理所有孤立的网格
-    final_meshes_cleaned = 0
-    for mesh in bpy.data.meshes:
-        if mesh.users == 0:
-            try:
-                if mesh.name in bpy.data.meshes:
-                    bpy.data.meshes.remove(mesh)
-                    final_meshes_cleaned += 1
-            except Exception as e:
-                print(f"最终清理网格 '{mesh.name}' 时出错: {e}")
+    # 只清理记录过的临时物体和孤立数据，不扫描整个文件
+    objects_cleaned, data_cleaned = purge_replacement_allocations()
     
-    print(f"最终清理完成: 清理了 {objects_cleaned} 个物体, {final_meshes_cleaned} 个网格")
+    print(f"最终清理完成: 清理了 {objects_cleaned} 个物体, {data_cleaned} 个数据块")
     
     # 最后一次垃圾回收
     gc.collect()
 
+def collect_leftover_temp_objects():
+    """找出之前会话、重新加载的文件或中断的替换遗留的临时物体
+    
+    只检查隐藏集合和场景根集合中直接链接的物体，不扫描整个文件：
+    导入的物体追加后会立即标记并链接到隐藏集合，未链接的物体保存文件时不会被写入。
+    隐藏集合中缺少 is_in_hidden_collection 标记的物体是中断的导入留下的。
+    """
+    leftovers = []
+    hidden_collection = bpy.data.collections.get(HIDDEN_COLLECTION_NAME)
+    if hidden_collection:
+        leftovers.extend(obj for obj in hidden_collection.objects
+                         if obj.get('is_imported_temp', False) and
+                         not obj.get('is_in_hidden_collection', False))
+    # 被移出隐藏集合、落在场景根集合中的临时物体
+    leftovers.extend(obj for obj in bpy.context.scene.collection.objects
+                     if obj.get('is_imported_temp', False))
+    return leftovers
+
 def clean_imported_objects():
     """清理之前导入的临时物体，避免累积（不清理隐藏集合中的物体）"""
-    # 只清理标记为导入的临时物体，但不清理隐藏集合中的物体
-    objects_to_remove = []
-    for obj in bpy.data.objects:
-        if (obj.type == 'MESH' and 
-            obj.get('is_imported_temp', False) and
-            not obj.get('is_in_hidden_collection', False)):  # 不清理隐藏集合中的物体
-            objects_to_remove.append(obj)
-    
-    # 安全删除物体
-    removed_count = 0
-    for obj in objects_to_remove:
-        try:
-            if obj.name in bpy.data.objects:
-                bpy.data.objects.remove(obj, do_unlink=True)
-                removed_count += 1
-        except Exception as e:
-            pass
+    allocations = get_replacement_allocations()
+    for obj in collect_leftover_temp_objects():
+        allocations.add_temp_object(obj)
     
-    if removed_count > 0:
-        print(f"已清理 {removed_count} 个临时物体")
-    
-    # 执行递归清理
-    recursive_cleanup_unused_data()
+    # 清理遗留的和上一次替换记录的临时物体及孤立数据
+    purge_replacement_allocations()
 
 def replace_objects_from_file():
     """从文件替换物体的主函数
@@ -2251,6 +2419,9 @@ def execute_replacement():
     print("执行替换操作...")
     replaced_count = execute_replacements(replacement_plan, imported_objects)
     
+    # 一次性删除被替换下来的旧网格及随之孤立的材质等数据
+    purge_replacement_allocations()
+    
     # 设置选中状态：选中所有已经替换的物体
     try:
         bpy.ops.object.select_all(action='DESELECT')
@@ -2336,7 +2507,7 @@ class mian_OT_ManageHiddenCollection(bpy.types.Operator):
     
     def execute(self, context):
         try:
-            hidden_collection = bpy.data.collections.get("Hidden_Imported_Objects")
+            hidden_collection = bpy.data.collections.get(HIDDEN_COLLECTION_NAME)
             
             if not hidden_collection:
                 self.report({'WARNING'}, "隐藏导入集合不存在")
@@ -2693,16 +2864,12 @@ def find_matching_target_set_excluding_used(reference_parsed, target_objects, us
     Returns:
         dict or None: 匹配的目标套装信息
     """
-    # 按套装分组目标物体
-    target_sets = group_objects_by_sets_smart([{'name': obj['name'], 'parsed_info': obj['parsed_info']} for obj in target_objects])
+    # 同性别的目标套装
+    target_sets = get_target_index(target_objects).sets_by_gender.get(reference_parsed['gender'], [])
     
     # 查找匹配的套装
     matching_sets = []
-    for set_id, set_info in target_sets.items():
-        # 检查性别是否匹配
-        if set_info['gender'] != reference_parsed['gender']:
-            continue
-        
+    for set_id, set_info in target_sets:
         # 检查套装中是否有未使用的物体
         has_unused_objects = False
         for obj_info in set_info['objects']:
@@ -2730,17 +2897,11 @@ def get_target_set_objects(target_set_obj, target_objects):
     Returns:
         list: 目标套装中的物体列表
     """
-    set_objects = []
+    by_name = get_target_index(target_objects).by_name
     set_info = target_set_obj['set_info']
     
-    for obj_info in set_info['objects']:
-        # 在目标物体列表中查找对应的物体
-        for target_obj in target_objects:
-            if target_obj['name'] == obj_info['name']:
-                set_objects.append(target_obj)
-                break
-    
-    return set_objects
+    # 在目标物体列表中查找对应的物体
+    return [by_name[obj_info['name']] for obj_info in set_info['objects'] if obj_info['name'] in by_name]
 
 def find_matching_part_in_target_set(source_obj, target_set_objects, used_target_objects):
     """在目标套装中查找匹配的部件（排除已使用的）
@@ -2782,17 +2943,8 @@ def find_matching_random_target_excluding_used(gender, parts, target_objects, us
     Returns:
         dict or None: 匹配的目标物体
     """
-    matching_targets = []
-    
-    for target_obj in target_objects:
-        if target_obj['name'] in used_target_objects:
-            continue
-            
-        target_parsed = parse_object_name(target_obj['name'])
-        
-        if (target_parsed['gender'] == gender and 
-            is_exact_part_match(parts, target_parsed['parts'])):
-            matching_targets.append(target_obj)
+    matching_targets = [target_obj for target_obj in get_target_index(target_objects).find(gender, parts)
+                        if target_obj['name'] not in used_target_objects]
     
     if matching_targets:
         return random.choice(matching_targets)
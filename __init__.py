@@ -473,6 +473,11 @@ plugin_initialization_success = None
 #------------------------------------------------------------------------------------------
 
 from . import utils
+from . import HeadlessWorker
+from . import ObjWriter
+from . import ImportLedger
+from . import FileIndex
+from . import BatchJobRunner
 from . import update
 from . import operators
 from . import panels
@@ -568,6 +573,7 @@ def register_full_mode():
         CurveOperators.register()
         Random.register()
         MeshEditer.register()
+        BatchJobRunner.register()
         
         # 最后注册UI面板
         panels.register()
@@ -629,7 +635,8 @@ def register_limited_mode():
             (CompositorNodeLibrary, "CompositorNodeLibrary"),
             (CurveOperators, "CurveOperators"),
             (Random, "Random"),
-            (MeshEditer, "MeshEditer")
+            (MeshEditer, "MeshEditer"),
+            (BatchJobRunner, "BatchJobRunner")
         ]
         
         # 尝试注册AutoRender模块（即使PIL不可用，也要注册UI属性）
@@ -702,6 +709,7 @@ def unregister():
         CurveOperators.unregister()
         Random.unregister()
         MeshEditer.unregister()
+        BatchJobRunner.unregister()
         
         # 最后注销基础模块
         operators.unregister()
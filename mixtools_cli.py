@@ -0,0 +1,431 @@
+"""
+MixTools 命令行入口
+
+在后台Blender中运行插件的主要功能，不需要界面面板::
+
+    blender -b scene.blend -P mixtools_cli.py -- export --mode parent --output D:/export
+    blender -b scene.blend -P mixtools_cli.py -- dedup --kind all --save
+    blender -b scene.blend -P mixtools_cli.py -- auto-render --collection Props --camera Camera --output D:/render
+    blender -b -P mixtools_cli.py -- voxelize --input D:/obj --color
+    blender -b rig.blend -P mixtools_cli.py -- anim-import a.anim b.anim --save
+    blender -b -P mixtools_cli.py -- batch --dir D:/scenes --operator outliner.orphans_purge --save-mode COPY --output-dir D:/cleaned --manifest result.json
+
+每条命令执行后输出一行以 ``MIXTOOLS_RESULT`` 开头的 JSON 结果（也可用 ``--result-json`` 写入文件），
+并以退出码表示结果：
+
+- 0：成功
+- 1：命令执行失败（操作符未完成或有条目失败）
+- 2：参数错误
+- 3：执行时发生异常
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import traceback
+
+import bpy
+
+
+RESULT_PREFIX = "MIXTOOLS_RESULT "
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
+
+# 导出方式 -> 导出操作符
+EXPORT_OPERATORS = {
+    'parent': 'scene.export_fbx_by_parent',
+    'parent_max': 'scene.export_fbx_by_parent_max',
+    'mesh': 'scene.export_fbx_by_mesh',
+    'col_mark': 'scene.export_fbx_by_col_mark',
+    'collection': 'object.mian_output_fbx_as_collection',
+    'obj': 'object.export_objs',
+}
+
+# 去重类型 -> 操作符
+DEDUP_OPERATORS = {
+    'materials': 'object.merge_duplicate_materials',
+    'instances': 'object.remove_instance_duplicates',
+}
+
+
+class CommandError(Exception):
+    """命令参数或执行前检查失败"""
+
+
+# ---------------------------------------------------------------------------
+# 插件加载与通用工具
+# ---------------------------------------------------------------------------
+
+def find_loaded_package(addon_dir):
+    """Blender 已经加载的本插件包（如 bl_ext.<仓库>.<名称> 形式的扩展），没有时返回None"""
+    init_path = os.path.normcase(os.path.join(addon_dir, "__init__.py"))
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None)
+        if module_file and os.path.normcase(os.path.abspath(module_file)) == init_path:
+            return module
+    return None
+
+
+def import_addon_package():
+    """导入插件包（不注册），返回插件包模块"""
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    # 插件已作为扩展启用时复用同一个包，避免以目录名再导入一份并重复注册
+    package = find_loaded_package(addon_dir)
+    if package is None:
+        parent_dir = os.path.dirname(addon_dir)
+        if parent_dir not in sys.path:
+            sys.path.insert(0, parent_dir)
+        package = importlib.import_module(os.path.basename(addon_dir))
+    return package
+
+
+def call_operator(idname, **properties):
+    """调用操作符，返回操作符结果列表"""
+    category, name = idname.split('.', 1)
+    operator = getattr(getattr(bpy.ops, category), name)
+    return sorted(operator(**properties))
+
+
+def list_new_files(directory, since, extensions=None):
+    """递归列出目录中修改时间不早于 since 的文件"""
+    found_files = []
+    if not directory or not os.path.isdir(directory):
+        return found_files
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if extensions and not file.lower().endswith(extensions):
+                continue
+            path = os.path.join(root, file)
+            if os.path.getmtime(path) >= since:
+                found_files.append(path)
+    return sorted(found_files)
+
+
+def require_directory(path, create=False):
+    path = os.path.abspath(bpy.path.abspath(path))
+    if create:
+        os.makedirs(path, exist_ok=True)
+    if not os.path.isdir(path):
+        raise CommandError(f"目录不存在: {path}")
+    return path
+
+
+def select_objects(objects):
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(obj in objects)
+    if objects:
+        bpy.context.view_layer.objects.active = objects[0]
+
+
+def save_blend_file(args):
+    """按 --save / --save-as 参数保存当前文件，返回保存路径"""
+    if args.save_as:
+        path = os.path.abspath(args.save_as)
+        bpy.ops.wm.save_as_mainfile(filepath=path, check_existing=False)
+        return path
+    if args.save:
+        if not bpy.data.filepath:
+            raise CommandError("当前没有打开的.blend文件，无法使用 --save，请改用 --save-as")
+        bpy.ops.wm.save_mainfile()
+        return bpy.data.filepath
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 命令
+# ---------------------------------------------------------------------------
+
+def command_export(args, package):
+    scene = bpy.context.scene
+    output_dir = require_directory(args.output, create=True)
+    scene.export_directory = output_dir
+    scene.export_config = args.config
+    scene.export_incremental = args.incremental
+    scene.export_use_worker_pool = args.workers is not None
+    if args.workers is not None:
+        scene.export_worker_count = args.workers
+
+    if args.mode == 'obj':
+        scene.obj_export_combined = args.combined
+        objects = [obj for obj in scene.objects
+                   if obj.type == 'MESH' and (not args.objects or obj.name in args.objects)]
+        if not objects:
+            raise CommandError("没有可导出的网格物体")
+        select_objects(objects)
+
+    start_time = time.time()
+    result = call_operator(EXPORT_OPERATORS[args.mode])
+    extensions = ('.obj', '.mtl') if args.mode == 'obj' else ('.fbx',)
+    return {
+        'success': 'FINISHED' in result,
+        'operator_result': result,
+        'output_dir': output_dir,
+        'files': list_new_files(output_dir, start_time, extensions),
+    }
+
+
+def command_dedup(args, package):
+    kinds = list(DEDUP_OPERATORS) if args.kind == 'all' else [args.kind]
+    before = {'materials': len(bpy.data.materials), 'objects': len(bpy.data.objects)}
+
+    results = {}
+    for kind in kinds:
+        if kind == 'instances':
+            select_objects([obj for obj in bpy.context.view_layer.objects if obj.type == 'MESH'])
+        results[kind] = call_operator(DEDUP_OPERATORS[kind])
+
+    after = {'materials': len(bpy.data.materials), 'objects': len(bpy.data.objects)}
+    return {
+        'success': all('FINISHED' in result for result in results.values()),
+        'operator_result': results,
+        'removed_materials': before['materials'] - after['materials'],
+        'removed_objects': before['objects'] - after['objects'],
+    }
+
+
+def command_auto_render(args, package):
+    settings = bpy.context.scene.auto_render_settings
+    collection = bpy.data.collections.get(args.collection)
+    if collection is None:
+        raise CommandError(f"集合不存在: {args.collection}")
+    camera = bpy.data.objects.get(args.camera)
+    if camera is None or camera.type != 'CAMERA':
+        raise CommandError(f"相机不存在: {args.camera}")
+
+    output_dir = require_directory(args.output, create=True)
+    settings.output_path = output_dir
+    settings.collections = collection
+    settings.cameras = camera
+    settings.output_format = args.format
+    settings.naming_mode = args.naming_mode
+    if args.name:
+        settings.output_name = args.name
+    settings.focus_each_object = args.focus_each_object
+    settings.focus_only_faces = args.focus_only_faces
+    settings.render_as_animation = args.animation
+
+    start_time = time.time()
+    result = call_operator('auto_render.execute')
+    return {
+        'success': 'FINISHED' in result,
+        'operator_result': result,
+        'output_dir': output_dir,
+        'files': list_new_files(output_dir, start_time, ('.png', '.tga')),
+    }
+
+
+def command_voxelize(args, package):
+    scene = bpy.context.scene
+    input_dir = require_directory(args.input)
+    # 操作符按字符串拼接路径，需要以分隔符结尾
+    scene.voxelizer_tool.path = os.path.join(input_dir, "")
+    if args.voxelizer_path:
+        scene.voxelizer_tool.voxelizer_path = os.path.join(require_directory(args.voxelizer_path), "")
+    scene.generate_solid = args.solid
+
+    start_time = time.time()
+    idname = 'object.convert_voxelizer_color' if args.color else 'object.convert_voxelizer'
+    result = call_operator(idname)
+    return {
+        'success': 'FINISHED' in result,
+        'operator_result': result,
+        'files': list_new_files(input_dir, start_time, ('.vox',)),
+    }
+
+
+def command_anim_import(args, package):
+    items = []
+    for path in args.files:
+        path = os.path.abspath(path)
+        existing_actions = set(bpy.data.actions)
+        try:
+            result = call_operator('animation.import_anim', filepath=path)
+            actions = [action.name for action in bpy.data.actions if action not in existing_actions]
+            item = {'name': path, 'success': 'FINISHED' in result, 'actions': actions}
+            if not item['success']:
+                item['error'] = f"操作符返回 {result}"
+        except Exception as e:
+            item = {'name': path, 'success': False, 'error': str(e)}
+        items.append(item)
+
+    return {
+        'success': all(item['success'] for item in items),
+        'items': items,
+    }
+
+
+def command_batch(args, package):
+    source_root = None
+    if args.files:
+        blend_files = [os.path.abspath(path) for path in args.files]
+    elif args.dir:
+        source_root = require_directory(args.dir)
+        blend_files = package.BatchJobRunner.collect_blend_files(source_root, args.recursive)
+    else:
+        raise CommandError("需要指定 --dir 或 --files")
+    if not blend_files:
+        raise CommandError("没有找到.blend文件")
+
+    try:
+        properties = json.loads(args.properties)
+        scene_properties = json.loads(args.scene_properties)
+    except ValueError as e:
+        raise CommandError(f"JSON参数格式错误: {e}")
+
+    try:
+        summary = package.BatchJobRunner.run_batch_operator(
+            blend_files, args.operator, properties, scene_properties,
+            save_mode=args.save_mode,
+            output_dir=os.path.abspath(args.output_dir) if args.output_dir else None,
+            max_workers=args.workers or None, timeout=args.timeout or None,
+            retries=args.retries, manifest_path=args.manifest, source_root=source_root)
+    except ValueError as e:
+        raise CommandError(str(e))
+    return {
+        'success': not summary['failed'],
+        'succeeded': summary['succeeded'],
+        'failed': summary['failed'],
+        'manifest': args.manifest,
+    }
+
+
+COMMANDS = {
+    'export': command_export,
+    'dedup': command_dedup,
+    'auto-render': command_auto_render,
+    'voxelize': command_voxelize,
+    'anim-import': command_anim_import,
+    'batch': command_batch,
+}
+
+
+# ---------------------------------------------------------------------------
+# 参数解析与入口
+# ---------------------------------------------------------------------------
+
+def add_save_arguments(parser):
+    parser.add_argument('--save', action='store_true', help="完成后保存当前.blend文件")
+    parser.add_argument('--save-as', help="完成后另存为指定.blend文件")
+
+
+def build_parser(export_configs):
+    """构建命令行解析器
+
+    Args:
+        export_configs: list[str] - 可用的导出配置名，用于校验 --config
+    """
+    parser = argparse.ArgumentParser(
+        prog="blender -b [file.blend] -P mixtools_cli.py --",
+        description="MixTools 命令行工具")
+    parser.add_argument('--result-json', help="把JSON结果同时写入该文件")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help="批量导出FBX/OBJ")
+    export.add_argument('--mode', choices=sorted(EXPORT_OPERATORS), default='parent')
+    export.add_argument('--output', required=True, help="导出目录")
+    export.add_argument('--config', choices=export_configs, default='Unity', help="导出配置名")
+    export.add_argument('--incremental', action='store_true', help="跳过未变化的导出条目")
+    export.add_argument('--workers', type=int, help="使用后台进程并行导出，0为自动进程数")
+    export.add_argument('--combined', action='store_true', help="OBJ导出时合并为单个文件")
+    export.add_argument('--objects', nargs='*', help="OBJ导出的物体名称，默认全部网格物体")
+    add_save_arguments(export)
+
+    dedup = subparsers.add_parser('dedup', help="合并重复材质、删除重复实例物体")
+    dedup.add_argument('--kind', choices=sorted(DEDUP_OPERATORS) + ['all'], default='all')
+    add_save_arguments(dedup)
+
+    auto_render = subparsers.add_parser('auto-render', help="按集合自动渲染")
+    auto_render.add_argument('--collection', required=True)
+    auto_render.add_argument('--camera', required=True)
+    auto_render.add_argument('--output', required=True, help="渲染输出目录")
+    auto_render.add_argument('--format', choices=['PNG', 'TARGA'], default='PNG')
+    auto_render.add_argument('--naming-mode', choices=['AUTO', 'CUSTOM', 'HYBRID', 'OBJECT'], default='AUTO')
+    auto_render.add_argument('--name', help="自定义名称")
+    auto_render.add_argument('--focus-each-object', action='store_true')
+    auto_render.add_argument('--focus-only-faces', action='store_true')
+    auto_render.add_argument('--animation', action='store_true', help="作为单次动画任务渲染")
+    add_save_arguments(auto_render)
+
+    voxelize = subparsers.add_parser('voxelize', help="把目录中的OBJ转换为体素")
+    voxelize.add_argument('--input', required=True, help="OBJ文件目录")
+    voxelize.add_argument('--voxelizer-path', help="体素化程序所在目录")
+    voxelize.add_argument('--color', action='store_true', help="使用 obj2voxel 生成带颜色的体素")
+    voxelize.add_argument('--solid', action='store_true', help="生成实心体素")
+
+    anim_import = subparsers.add_parser('anim-import', help="导入Unity .anim动画")
+    anim_import.add_argument('files', nargs='+', help=".anim文件")
+    add_save_arguments(anim_import)
+
+    batch = subparsers.add_parser('batch', help="在后台进程中对多个.blend文件执行操作符")
+    batch.add_argument('--operator', required=True, help="操作符 bl_idname")
+    batch.add_argument('--properties', default="{}", help="操作符参数(JSON对象)")
+    batch.add_argument('--scene-properties', default="{}", help="执行前设置的场景属性(JSON对象)")
+    batch.add_argument('--dir', help=".blend文件目录")
+    batch.add_argument('--recursive', action='store_true')
+    batch.add_argument('--files', nargs='*', help=".blend文件列表")
+    batch.add_argument('--save-mode', choices=['NONE', 'COPY', 'OVERWRITE'], default='NONE',
+                       help="处理后的保存方式，默认不保存；OVERWRITE 会覆盖原文件")
+    batch.add_argument('--output-dir', help="另存时的输出目录")
+    batch.add_argument('--workers', type=int, default=0, help="进程数，0为自动")
+    batch.add_argument('--timeout', type=int, default=0, help="单文件超时秒数，0为不限制")
+    batch.add_argument('--retries', type=int, default=1, help="进程崩溃后的重试次数")
+    batch.add_argument('--manifest', help="JSON结果清单路径")
+
+    return parser
+
+
+def emit_result(result, result_path=None):
+    """输出一行JSON结果，便于从Blender日志中解析"""
+    text = json.dumps(result, ensure_ascii=False, default=str)
+    print(RESULT_PREFIX + text)
+    sys.stdout.flush()
+    if result_path:
+        with open(result_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def main(argv):
+    cli_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    # 导出配置名来自插件的 Exporter 模块，解析参数前先导入插件包
+    try:
+        package = import_addon_package()
+    except Exception:
+        emit_result({'command': None, 'success': False, 'error': traceback.format_exc(),
+                     'exit_code': EXIT_ERROR}, None)
+        return EXIT_ERROR
+    parser = build_parser(list(package.Exporter.EXPORT_CONFIGS))
+    try:
+        args = parser.parse_args(cli_args)
+    except SystemExit as e:
+        # argparse 在 --help 时以0退出，参数错误时以2退出
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+
+    start_time = time.time()
+    result = {'command': args.command, 'blend_file': bpy.data.filepath, 'success': False}
+    try:
+        package.HeadlessWorker.ensure_addon_registered()
+        result.update(COMMANDS[args.command](args, package))
+        if result['success'] and hasattr(args, 'save'):
+            result['saved'] = save_blend_file(args)
+        exit_code = EXIT_OK if result['success'] else EXIT_FAILED
+    except CommandError as e:
+        result['error'] = str(e)
+        exit_code = EXIT_USAGE
+    except Exception:
+        result['error'] = traceback.format_exc()
+        exit_code = EXIT_ERROR
+
+    result['exit_code'] = exit_code
+    result['elapsed'] = time.time() - start_time
+    emit_result(result, args.result_json)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -925,6 +925,7 @@ class CustomFunctionsPanel(Panel):
         # 批量导入
         import_box = col.box()
         import_box.label(text="批量导入:", icon='IMPORT')
+        import_box.prop(scene, "import_sync_mode", text="同步导入(只导入新增或变化的文件)", icon='FILE_REFRESH')
         import_box.operator("operation.batch_import_fbx", text="批量导入FBX（原生）", icon='FILE_3D')
         import_box.operator("operation.batch_import_obj", text="批量导入OBJ（原生）", icon='FILE_3D')
 
@@ -951,6 +952,7 @@ class CustomFunctionsPanel(Panel):
         if scene.fbx_temp_names_file_path:
             input_row.operator("object.read_names_from_temp_file", text="加载", icon='IMPORT')
         name_list_box.prop(scene, "fbx_search_directory", text="搜索目录", icon='FILE_FOLDER')
+        name_list_box.prop(scene, "fbx_name_match_mode", text="匹配方式")
         rename_row = name_list_box.row()
         rename_row.prop(scene, "fbx_rename_top_level", text="重命名顶级父级为文件名称", icon='OUTLINER_OB_EMPTY')
         name_format_row = name_list_box.row(align=True)
@@ -961,6 +963,10 @@ class CustomFunctionsPanel(Panel):
         better_fbx_export_box = import_box.box()
         better_fbx_export_box.label(text="Better FBX导出:", icon='EXPORT')
         better_fbx_export_box.prop(scene, "better_fbx_export_directory", text="FBX导出目录", icon='FILE_FOLDER')
+        better_fbx_pool_row = better_fbx_export_box.row(align=True)
+        better_fbx_pool_row.prop(scene, "export_use_worker_pool", text="并行导出", icon='SYSTEM')
+        if scene.export_use_worker_pool:
+            better_fbx_pool_row.prop(scene, "export_worker_count", text="进程数")
         better_fbx_export_box.operator("better_fbx.batch_export_by_top_level", text="按顶级物体批量导出", icon='EXPORT')
 
         # 批量导出
@@ -972,12 +978,20 @@ class CustomFunctionsPanel(Panel):
         export_config_box.label(text="导出配置:", icon='SETTINGS')
         export_config_box.prop(scene, "export_config", text="")
         export_config_box.prop(scene, "clear_parent_on_export", text="清除父级关系", icon='UNLINKED')
+        export_config_box.prop(scene, "export_incremental", text="增量导出(跳过未变化)", icon='FILE_REFRESH')
+        export_pool_row = export_config_box.row(align=True)
+        export_pool_row.prop(scene, "export_use_worker_pool", text="并行导出", icon='SYSTEM')
+        if scene.export_use_worker_pool:
+            export_pool_row.prop(scene, "export_worker_count", text="进程数")
 
         export_col = export_box.column(align=True)
         export_col.operator("scene.export_fbx_by_parent", text="按顶级父物体导出FBX", icon='OUTLINER_OB_EMPTY')
         export_col.operator("scene.export_fbx_by_col_mark", text="按.col标记导出FBX", icon='BOOKMARKS')
         export_col.operator("object.mian_output_fbx_as_collection", text="按集合分文件夹导出FBX", icon='OUTLINER_COLLECTION')
         export_col.operator("object.export_objs", text="批量导出OBJ", icon='EXPORT')
+        obj_export_row = export_col.row(align=True)
+        obj_export_row.prop(scene, "obj_export_combined", text="合并为单个OBJ")
+        obj_export_row.prop(scene, "obj_export_use_threads", text="多线程写出")
 
         # 批量关联场景
         link_scenes_batch_box = col.box()
@@ -1118,6 +1132,7 @@ class CustomFunctionsPanel(Panel):
             options_row.prop(bpy.context.scene.auto_render_settings, "focus_each_object", text="聚焦到物体")
             options_row.prop(bpy.context.scene.auto_render_settings, "focus_only_faces", text="仅聚焦可渲染")
             options_row.prop(bpy.context.scene.auto_render_settings, "auto_keyframe", text="自动关键帧")
+            camera_col.prop(bpy.context.scene.auto_render_settings, "render_as_animation", text="单次动画渲染")
 
             if bpy.context.scene.auto_render_settings.focus_each_object:
                 perspective_row = camera_col.row()
@@ -1165,6 +1180,11 @@ class CustomFunctionsPanel(Panel):
         row2.prop(change_resolution_prop, "resolution_percentage", text="质量百分比")
         row2.prop(change_resolution_prop, "output_frame_rate", text="帧率")
 
+        pool_row = box_renderadj.row(align=True)
+        pool_row.prop(change_resolution_prop, "use_worker_pool", text="并行处理", icon='SYSTEM')
+        if change_resolution_prop.use_worker_pool:
+            pool_row.prop(change_resolution_prop, "worker_count", text="进程数")
+
         operator_instance = box_renderadj.operator(BATCH_RESOLUTION_OT_ExecuteButton.bl_idname, text="执行批量设置", icon='PLAY')
         operator_instance.output_file = change_resolution_prop.output_file
         operator_instance.render_engine = change_resolution_prop.render_engine
@@ -1176,6 +1196,11 @@ class CustomFunctionsPanel(Panel):
         operator_instance.resolution_percentage = str(change_resolution_prop.resolution_percentage)
         operator_instance.output_frame_rate = str(change_resolution_prop.output_frame_rate)
 
+        # 通用后台批处理
+        box_batch_job = col.box()
+        box_batch_job.label(text="后台批量执行操作符:", icon='CONSOLE')
+        box_batch_job.operator("mixtools.batch_run_operator", text="批量执行操作符", icon='PLAY')
+
 
 # 清除搜索操作符
 class TOOL_OT_clear_search(bpy.types.Operator):
@@ -1354,6 +1379,18 @@ def register():
         default="",
     )
 
+    bpy.types.Scene.fbx_name_match_mode = bpy.props.EnumProperty(
+        name="匹配方式",
+        description="按名称列表查找文件时的匹配方式，搜索目录的文件名索引只建立一次并缓存",
+        items=[
+            ('CONTAINS', "包含", "文件名包含该名称（不区分大小写）"),
+            ('EXACT', "完全一致", "文件名与该名称完全一致（不区分大小写），速度最快"),
+            ('PREFIX', "前缀", "文件名以该名称开头（不区分大小写）"),
+            ('FUZZY', "模糊", "没有完全一致的文件时，查找最相近的文件名"),
+        ],
+        default='CONTAINS',
+    )
+
     # 临时文件路径属性
     bpy.types.Scene.fbx_temp_names_file_path = bpy.props.StringProperty(
         name="临时文件路径",
@@ -1380,6 +1417,13 @@ def register():
         default='FBX'
     )
 
+    # 同步导入选项
+    bpy.types.Scene.import_sync_mode = bpy.props.BoolProperty(
+        name="同步导入",
+        description="按场景中的导入台账（源文件路径、大小、修改时间）只导入新增或变化的文件，变化的文件原位替换上次导入的物体",
+        default=False
+    )
+
     # FBX重命名选项
     bpy.types.Scene.fbx_rename_top_level = bpy.props.BoolProperty(
         name="重命名顶级父级为文件名称",
@@ -1605,12 +1649,14 @@ def unregister():
         # FBX相关属性
         "fbx_name_list_text",
         "fbx_search_directory",
+        "fbx_name_match_mode",
         "fbx_temp_names_file_path",
 
         # Better FBX导入导出属性
         "better_fbx_import_directory",
         "batch_import_file_format",
         "fbx_rename_top_level",
+        "import_sync_mode",
         "better_fbx_export_directory",
 
         # 工具搜索功能
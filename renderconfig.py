@@ -1,5 +1,8 @@
 import bpy
 import os
+import time
+
+from . import HeadlessWorker
 
 class ChangeResolutionProperties(bpy.types.PropertyGroup):
     
@@ -78,6 +81,62 @@ class ChangeResolutionProperties(bpy.types.PropertyGroup):
         subtype='FILE_PATH',# type: ignore
     )
 
+    use_worker_pool: bpy.props.BoolProperty(
+        name="并行处理",
+        description="每个.blend文件在单独的后台Blender进程中处理，不打开、不影响当前会话",
+        default=False,# type: ignore
+    )
+
+    worker_count: bpy.props.IntProperty(
+        name="进程数",
+        description="同时运行的后台Blender进程数，0为自动（CPU核心数-1）",
+        default=0,
+        min=0,
+        max=64,# type: ignore
+    )
+
+
+def clean_blend_file():
+    """清理孤立数据"""
+    if hasattr(bpy.data, "orphans_purge"):
+        bpy.data.orphans_purge(do_recursive=True)
+    else:
+        bpy.ops.outliner.orphans_purge(do_recursive=True)
+
+def apply_resolution_settings(settings, input_path, output_path):
+    """对当前打开的文件清理、打包、应用渲染设置并另存到 output_path"""
+    clean_blend_file()
+
+    # 尝试进行打包，如果遇到问题则忽略
+    try:
+        bpy.ops.file.pack_all()
+    except Exception:
+        pass
+    scene = bpy.context.scene
+
+    scene.render.resolution_x = int(settings['resolution_x'])
+    scene.render.resolution_y = int(settings['resolution_y'])
+    scene.render.resolution_percentage = int(settings['resolution_percentage'])
+    scene.render.fps = int(settings['frame_rate'])
+    scene.render.engine = settings['render_engine']
+    scene.render.image_settings.file_format = settings['output_format']
+
+    # 设置输出路径为 output_file 和文件名称
+    blend_file_name = os.path.splitext(os.path.basename(input_path))[0]
+    scene.render.filepath = os.path.join(bpy.path.abspath(settings['output_file']), blend_file_name)
+    
+    # 保存修改后的.blend文件
+    bpy.ops.wm.save_mainfile(filepath=output_path)
+
+def run_resolution_job(job):
+    """后台工作进程中执行的任务：工作进程已打开 job['input_path']，应用设置后另存"""
+    input_path = job['input_path']
+    try:
+        apply_resolution_settings(job['settings'], input_path, job['output_path'])
+        return [{'name': input_path, 'success': True, 'file': job['output_path']}]
+    except Exception as e:
+        return [{'name': input_path, 'success': False, 'error': str(e)}]
+
 
 class BATCH_RESOLUTION_OT_ExecuteButton(bpy.types.Operator):
     bl_idname = "batch_resolution.execute_button"
@@ -94,56 +153,63 @@ class BATCH_RESOLUTION_OT_ExecuteButton(bpy.types.Operator):
     output_file: bpy.props.StringProperty()# type: ignore
     change_resolution_prop: bpy.props.PointerProperty(type=ChangeResolutionProperties)# type: ignore
 
+    def get_settings(self):
+        return {
+            'resolution_x': self.output_resolution_x,
+            'resolution_y': self.output_resolution_y,
+            'resolution_percentage': self.resolution_percentage,
+            'frame_rate': self.output_frame_rate,
+            'render_engine': self.render_engine,
+            'output_format': self.output_format,
+            'output_file': self.output_file,
+        }
+
     def change_resolution(self, input_path, output_path):
         bpy.ops.wm.open_mainfile(filepath=input_path)
-        
-        self.clean_blend_file()
-
-        # 尝试进行打包，如果遇到问题则忽略
-        try:
-            bpy.ops.file.pack_all()
-        except Exception:
-            pass
-        scene = bpy.context.scene
-
-        scene.render.resolution_x = int(self.output_resolution_x)
-        scene.render.resolution_y = int(self.output_resolution_y)
-        scene.render.resolution_percentage = int(self.resolution_percentage)
-        scene.render.fps = int(self.output_frame_rate)
-        scene.render.engine = self.render_engine
-        scene.render.image_settings.file_format = self.output_format
-        
-        # 设置输出路径为 output_dir 和场景名称
-        # scene.render.filepath = os.path.join(bpy.path.abspath(self.output_file), scene.name)
-
-        # bpy.ops.wm.save_mainfile(filepath=output_path)
-
-        blend_file_name = os.path.splitext(os.path.basename(input_path))[0]
-        scene.render.filepath = os.path.join(bpy.path.abspath(self.output_file), blend_file_name)
-        
-        # 保存修改后的.blend文件
-        bpy.ops.wm.save_mainfile(filepath=output_path)
-
-    def clean_blend_file(self):
-        bpy.ops.outliner.orphans_purge(do_recursive=True)
-
-        
+        apply_resolution_settings(self.get_settings(), input_path, output_path)
+
+    def change_resolution_with_worker_pool(self, file_paths, worker_count):
+        """每个文件一个后台Blender进程，返回 (成功条目, 失败条目)"""
+        settings = self.get_settings()
+        jobs = [{'type': 'batch_resolution', 'settings': settings,
+                 'input_path': input_path, 'output_path': output_path,
+                 'blend_path': input_path}
+                for input_path, output_path in file_paths]
+        results = HeadlessWorker.run_worker_pool(
+            jobs, max_workers=HeadlessWorker.resolve_worker_count(worker_count))
+        return HeadlessWorker.collect_items(results)
 
     def execute(self, context):
+        start_time = time.time()
+        
         # 存储当前打开的 .blend 文件的路径
         current_filepath = bpy.data.filepath
 
         prop = context.scene.change_resolution_prop
 
-        absolute_input_dir = os.path.abspath(prop.input_dir)
-        absolute_output_dir = os.path.abspath(prop.output_dir)
+        absolute_input_dir = os.path.abspath(bpy.path.abspath(prop.input_dir))
+        absolute_output_dir = os.path.abspath(bpy.path.abspath(prop.output_dir))
 
+        file_paths = []
         with os.scandir(absolute_input_dir) as entries:
             for entry in entries:
                 if entry.is_file() and entry.name.endswith(".blend"):
-                    input_path = entry.path
-                    output_path = os.path.join(absolute_output_dir, entry.name)
-                    self.change_resolution(input_path, output_path)
+                    file_paths.append((entry.path, os.path.join(absolute_output_dir, entry.name)))
+
+        # 并行模式：当前会话不打开任何文件，处理完也不需要重新加载
+        if prop.use_worker_pool:
+            succeeded, failed = self.change_resolution_with_worker_pool(file_paths, prop.worker_count)
+            for item in failed:
+                print(f"处理失败: {item['name']}: {item.get('error')}")
+            elapsed_time = time.time() - start_time
+            if failed:
+                self.report({"WARNING"}, f"并行处理完成! 耗时: {elapsed_time:.2f}秒, 成功{len(succeeded)}个, 失败{len(failed)}个")
+            else:
+                self.report({"INFO"}, f"并行处理完成! 耗时: {elapsed_time:.2f}秒, 共处理{len(succeeded)}个文件")
+            return {"FINISHED"}
+
+        for input_path, output_path in file_paths:
+            self.change_resolution(input_path, output_path)
 
         self.report({"INFO"}, "All files successfully modified!")
 
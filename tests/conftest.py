@@ -0,0 +1,182 @@
+"""
+测试公共设置
+
+插件模块依赖 bpy，测试在普通 Python 环境中运行时注入一个最小的 bpy 替身，
+并以 ``mixtools`` 包名加载仓库中的模块（不执行 __init__.py 的注册逻辑）。
+"""
+
+import os
+import sys
+import types
+import importlib
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "mixtools"
+
+
+class FakeID:
+    """模拟 Blender 的 ID 数据块，删除后访问属性抛出 ReferenceError"""
+
+    def __init__(self, name):
+        self._removed = False
+        self.name = name
+        self.users = 0
+
+    def __getattribute__(self, attr):
+        if attr not in ('_removed', '__class__', '__dict__') and object.__getattribute__(self, '_removed'):
+            raise ReferenceError(f"{attr}: 数据块已被删除")
+        return object.__getattribute__(self, attr)
+
+
+class FakeMaterial(FakeID):
+    def copy(self):
+        return FakeMaterial(self.name + ".copy")
+
+
+class FakeMaterialList(list):
+    def clear(self):
+        del self[:]
+
+
+class FakeMesh(FakeID):
+    def __init__(self, name, materials=()):
+        super().__init__(name)
+        self.materials = FakeMaterialList(materials)
+
+    def copy(self):
+        return FakeMesh(self.name + ".copy", self.materials)
+
+
+class FakeObject(FakeID):
+    def __init__(self, name, data=None, parent=None):
+        super().__init__(name)
+        self.type = 'MESH'
+        self.parent = parent
+        self._data = None
+        self.data = data
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, mesh):
+        if self._data is not None:
+            self._data.users -= 1
+        self._data = mesh
+        if mesh is not None:
+            mesh.users += 1
+
+
+class FakeCollection(dict):
+    """bpy.data 中的数据块集合"""
+
+    def remove(self, id_block, do_unlink=True):
+        self.pop(id_block.name, None)
+        id_block._removed = True
+
+
+class FakeLibraryLoad:
+    """bpy.data.libraries.load 替身：data_to.objects 中的名称在退出时被替换为新对象"""
+
+    def __init__(self, data, library_objects):
+        self.data = data
+        self.library_objects = library_objects
+
+    def __enter__(self):
+        self.data_from = types.SimpleNamespace(objects=list(self.library_objects),
+                                               meshes=list(self.library_objects))
+        self.data_to = types.SimpleNamespace(objects=[])
+        return self.data_from, self.data_to
+
+    def __exit__(self, *exc):
+        appended = []
+        for name in self.data_to.objects:
+            material = FakeMaterial(f"{name}_mat")
+            mesh = FakeMesh(f"{name}_mesh", [material])
+            obj = FakeObject(name, mesh)
+            self.data.meshes[mesh.name] = mesh
+            self.data.materials[material.name] = material
+            self.data.objects[obj.name] = obj
+            self.data.load_count += 1
+            appended.append(obj)
+        self.data_to.objects = appended
+        return False
+
+
+class FakeData:
+    def __init__(self):
+        self.objects = FakeCollection()
+        self.meshes = FakeCollection()
+        self.materials = FakeCollection()
+        self.library_objects = []
+        self.load_count = 0
+        self.libraries = types.SimpleNamespace(
+            load=lambda filepath, link=False: FakeLibraryLoad(self, self.library_objects))
+
+    def batch_remove(self, ids):
+        for id_block in ids:
+            for collection in (self.objects, self.meshes, self.materials):
+                if collection.get(id_block.name) is id_block:
+                    collection.remove(id_block)
+            id_block._removed = True
+
+
+class _TypeNamespace(types.ModuleType):
+    """bpy.types / bpy.props：任意属性访问都返回可继承的类或可调用的属性工厂"""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if self.__name__ == 'bpy.types':
+            value = type(name, (), {})
+        else:
+            value = lambda *args, **kwargs: None
+        setattr(self, name, value)
+        return value
+
+
+def make_fake_bpy():
+    bpy = types.ModuleType('bpy')
+    bpy.__path__ = []
+    bpy.types = _TypeNamespace('bpy.types')
+    bpy.props = _TypeNamespace('bpy.props')
+    bpy.data = FakeData()
+    bpy.context = types.SimpleNamespace(
+        scene=types.SimpleNamespace(),
+        view_layer=types.SimpleNamespace(update=lambda: None))
+    bpy.app = types.SimpleNamespace(handlers=types.SimpleNamespace(persistent=lambda func: func))
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None,
+                                      unregister_class=lambda cls: None)
+    return bpy
+
+
+@pytest.fixture
+def fake_bpy(monkeypatch):
+    bpy = make_fake_bpy()
+    monkeypatch.setitem(sys.modules, 'bpy', bpy)
+    # 支持 from bpy.props import ... 形式的导入
+    monkeypatch.setitem(sys.modules, 'bpy.types', bpy.types)
+    monkeypatch.setitem(sys.modules, 'bpy.props', bpy.props)
+    return bpy
+
+
+@pytest.fixture
+def load_module(fake_bpy, monkeypatch):
+    """以 mixtools.<name> 加载仓库模块，每个测试重新加载以绑定新的 bpy 替身"""
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [REPO_DIR]
+    monkeypatch.setitem(sys.modules, PACKAGE_NAME, package)
+
+    def load(name):
+        full_name = f"{PACKAGE_NAME}.{name}"
+        monkeypatch.delitem(sys.modules, full_name, raising=False)
+        return importlib.import_module(full_name)
+
+    yield load
+
+    for name in list(sys.modules):
+        if name.startswith(PACKAGE_NAME + "."):
+            del sys.modules[name]
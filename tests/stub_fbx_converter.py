@@ -0,0 +1,32 @@
+"""
+fbx-utility 替身转换脚本，用于在没有 BetterFBX 的环境中验证转换阶段。
+
+参数与 fbx-utility 相同：<输入FBX> <输出文件> <其余设置...>。
+输入文件的内容决定行为：
+    fail  - 写出错误信息并以返回码 1 退出
+    sleep - 长时间不退出（用于超时测试）
+    其他  - 把输入内容和参数个数写到输出文件
+"""
+
+import sys
+import time
+
+
+def main(argv):
+    input_path, output_path = argv[1], argv[2]
+    with open(input_path, 'r', encoding='utf-8') as f:
+        content = f.read().strip()
+
+    if content == "fail":
+        sys.stderr.write("stub converter failure\n")
+        return 1
+    if content == "sleep":
+        time.sleep(60)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(f"{content}\n{len(argv) - 1}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
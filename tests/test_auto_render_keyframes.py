@@ -0,0 +1,98 @@
+import sys
+import types
+
+import pytest
+
+# 存储值：CONSTANT 为 0，BEZIER 为 2；FREE 手柄为 0，AUTO_CLAMPED 为 4
+CONSTANT, BEZIER = 0, 2
+FREE, AUTO_CLAMPED = 0, 4
+
+
+class FakeKeyframe:
+    def __init__(self):
+        self.co = [0.0, 0.0]
+        self.handle_left = [0.0, 0.0]
+        self.handle_right = [0.0, 0.0]
+        self.interpolation = BEZIER
+        self.handle_left_type = AUTO_CLAMPED
+        self.handle_right_type = AUTO_CLAMPED
+
+
+class FakeKeyframePoints(list):
+    def add(self, count):
+        self.extend(FakeKeyframe() for _ in range(count))
+
+    def foreach_get(self, attribute, values):
+        flat = []
+        for key in self:
+            value = getattr(key, attribute)
+            flat.extend(value if isinstance(value, list) else [value])
+        values[:] = flat
+
+    def foreach_set(self, attribute, values):
+        values = list(values)
+        size = len(values) // len(self) if self else 0
+        for i, key in enumerate(self):
+            chunk = values[i * size:(i + 1) * size]
+            setattr(key, attribute, chunk if size > 1 else chunk[0])
+
+
+class FakeFCurve:
+    def __init__(self):
+        self.keyframe_points = FakeKeyframePoints()
+
+    def update(self):
+        pass
+
+
+class FakeFCurves(dict):
+    def find(self, data_path, index=0):
+        return self.get((data_path, index))
+
+    def new(self, data_path, index=0, action_group=None):
+        fcurve = self[(data_path, index)] = FakeFCurve()
+        return fcurve
+
+
+@pytest.fixture
+def renderer(load_module, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'mathutils', types.ModuleType('mathutils'))
+    auto_render = load_module('AutoRender')
+    return object.__new__(auto_render.AutoRenderer)
+
+
+def make_user_curve(action):
+    fcurve = action.fcurves.new("location", 0)
+    fcurve.keyframe_points.add(2)
+    for key, frame in zip(fcurve.keyframe_points, (1.0, 100.0)):
+        key.co = [frame, 5.0]
+        key.handle_left = [frame - 3.0, 7.0]
+        key.handle_right = [frame + 3.0, 3.0]
+        key.handle_left_type = key.handle_right_type = FREE
+    return fcurve
+
+
+def test_batch_merge_keeps_user_keys(renderer):
+    action = types.SimpleNamespace(fcurves=FakeFCurves())
+    fcurve = make_user_curve(action)
+
+    renderer._write_fcurve_keys(action, "location", 0, [1, 2, 3], [10.0, 20.0, 30.0])
+
+    keys = {key.co[0]: key for key in fcurve.keyframe_points}
+    assert sorted(keys) == [1.0, 2.0, 3.0, 100.0]
+    assert [keys[frame].co[1] for frame in (1.0, 2.0, 3.0)] == [10.0, 20.0, 30.0]
+    assert all(keys[frame].interpolation == CONSTANT for frame in (1.0, 2.0, 3.0))
+    # 未被替换的用户关键帧保留插值和手柄
+    user_key = keys[100.0]
+    assert user_key.interpolation == BEZIER
+    assert user_key.handle_left == [97.0, 7.0] and user_key.handle_right == [103.0, 3.0]
+    assert user_key.handle_left_type == FREE
+
+
+def test_replace_discards_existing_keys(renderer):
+    action = types.SimpleNamespace(fcurves=FakeFCurves())
+    fcurve = make_user_curve(action)
+
+    renderer._write_fcurve_keys(action, "location", 0, [1, 2], [0.0, 1.0], replace=True)
+
+    assert [key.co[0] for key in fcurve.keyframe_points] == [1, 2]
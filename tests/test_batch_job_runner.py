@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+
+def test_copy_mirrors_subfolders(load_module, tmp_path):
+    runner = load_module('BatchJobRunner')
+    files = [str(tmp_path / "src" / "a" / "shot.blend"), str(tmp_path / "src" / "b" / "shot.blend")]
+    jobs = runner.build_operator_jobs(files, "outliner.orphans_purge", save_mode='COPY',
+                                      output_dir=str(tmp_path / "out"), source_root=str(tmp_path / "src"))
+
+    assert [job['output_path'] for job in jobs] == [
+        os.path.join(str(tmp_path / "out"), "a", "shot.blend"),
+        os.path.join(str(tmp_path / "out"), "b", "shot.blend"),
+    ]
+    runner.check_copy_output_paths(jobs)
+
+
+def test_copy_rejects_output_onto_sources(load_module, tmp_path):
+    runner = load_module('BatchJobRunner')
+    source_dir = tmp_path / "src"
+    files = [str(source_dir / "shot.blend")]
+
+    with pytest.raises(ValueError):
+        runner.run_batch_operator(files, "outliner.orphans_purge", save_mode='COPY',
+                                  output_dir=str(source_dir))
+
+
+def test_copy_rejects_duplicate_outputs(load_module, tmp_path):
+    runner = load_module('BatchJobRunner')
+    files = [str(tmp_path / "a" / "shot.blend"), str(tmp_path / "b" / "shot.blend")]
+    jobs = runner.build_operator_jobs(files, "outliner.orphans_purge", save_mode='COPY',
+                                      output_dir=str(tmp_path / "out"),
+                                      source_root=str(tmp_path / "a"))
+    jobs[1]['output_path'] = jobs[0]['output_path']
+
+    with pytest.raises(ValueError):
+        runner.check_copy_output_paths(jobs)
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+STUB_CONVERTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_fbx_converter.py")
+
+
+@pytest.fixture
+def converter(load_module, monkeypatch):
+    monkeypatch.delenv("MIXTOOLS_BETTER_FBX_EXECUTABLE", raising=False)
+    return load_module('BetterFbxConverter')
+
+
+def write_input(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def run_conversions(converter, file_paths, output_dir, executable, timeout=None):
+    results = converter.iter_converted_files(
+        file_paths, converter.merge_import_settings(), executable, str(output_dir),
+        max_workers=3, timeout=timeout)
+    return {os.path.basename(result['file']): result for result in results}
+
+
+def test_iter_converted_files_success_failure_and_timeout(converter, tmp_path):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    file_paths = [write_input(tmp_path, "ok.fbx", "mesh"),
+                  write_input(tmp_path, "bad.fbx", "fail"),
+                  write_input(tmp_path, "slow.fbx", "sleep"),
+                  str(tmp_path / "missing.fbx")]
+
+    results = run_conversions(converter, file_paths, output_dir,
+                              [sys.executable, STUB_CONVERTER], timeout=2)
+
+    ok = results["ok.fbx"]
+    assert ok['success'] and ok['error'] is None
+    with open(ok['output'], encoding='utf-8') as f:
+        content, argument_count = f.read().split()
+    assert content == "mesh"
+    assert int(argument_count) == len(converter.build_converter_command(
+        "x", "in", "out", converter.merge_import_settings())) - 1
+
+    bad = results["bad.fbx"]
+    assert not bad['success'] and "stub converter failure" in bad['error']
+    assert "超时" in results["slow.fbx"]['error']
+    assert "文件不存在" in results["missing.fbx"]['error']
+
+    # 失败的转换不留下中间文件
+    assert sorted(os.listdir(output_dir)) == [os.path.basename(ok['output'])]
+
+
+def test_python_script_path_runs_with_current_interpreter(converter, tmp_path, monkeypatch):
+    monkeypatch.setenv("MIXTOOLS_BETTER_FBX_EXECUTABLE", STUB_CONVERTER)
+    executable = converter.resolve_executable("/nonexistent/fbx-utility")
+    assert converter.get_executable_prefix(executable) == [sys.executable, STUB_CONVERTER]
+
+    results = run_conversions(converter, [write_input(tmp_path, "ok.fbx", "mesh")], tmp_path, executable)
+    assert results["ok.fbx"]['success']
@@ -0,0 +1,45 @@
+from conftest import FakeObject, FakeMesh
+
+GENDERS = ['male', 'female']
+BODY_PARTS = ['Upper', 'Lower', 'Hair', 'Nose', 'Eyes', 'Mouse', 'Bottom', 'Feet', 'Eyebrow', 'Top']
+
+
+def make_replacer(module, fake_bpy, variant_names):
+    fake_bpy.data.library_objects = list(variant_names)
+    replacer = module.CharacterPartReplacer("/nonexistent/source.blend")
+    for name in variant_names:
+        replacer.source_objects.setdefault(replacer.extract_keywords(name), []).append(
+            {'name': name, 'mesh_data': None, 'materials': None})
+    return replacer
+
+
+def test_replace_all_keeps_planned_variants_loaded_beyond_lru_limit(load_module, fake_bpy):
+    module = load_module('CharacterPartReplacer')
+    keys = [(gender, part) for gender in GENDERS for part in BODY_PARTS]
+    assert len(keys) > module.MAX_LOADED_VARIANTS
+
+    replacer = make_replacer(module, fake_bpy, [f"{gender}_{part}_src" for gender, part in keys])
+    targets = [FakeObject(f"{gender}_{part}_old", FakeMesh(f"{gender}_{part}_old_mesh"))
+               for gender, part in keys]
+
+    success_count, total_count = replacer.replace_objects_batch(targets, replace_name=False)
+
+    assert (success_count, total_count) == (len(keys), len(keys))
+    for target, (gender, part) in zip(targets, keys):
+        assert target.data.name == f"{gender}_{part}_src_mesh.copy"
+    # 执行完后取消固定，已加载部件数回到上限以内
+    assert not replacer.pinned_variants
+    assert len(replacer.loaded_variants) <= module.MAX_LOADED_VARIANTS
+
+
+def test_lru_still_evicts_unpinned_variants(load_module, fake_bpy):
+    module = load_module('CharacterPartReplacer')
+    names = [f"male_{part}_{index}" for part in BODY_PARTS for index in range(2)]
+    replacer = make_replacer(module, fake_bpy, names)
+
+    for key in list(replacer.source_objects):
+        for obj_data in replacer.source_objects[key]:
+            replacer.load_variant(obj_data)
+
+    assert len(replacer.loaded_variants) == module.MAX_LOADED_VARIANTS
+    assert replacer.source_objects[('male', 'Upper')][0]['mesh_data'] is None
@@ -0,0 +1,33 @@
+import random
+
+
+def make_directory(tmp_path, names):
+    for index, name in enumerate(names):
+        folder = tmp_path / f"dir{index % 4}"
+        folder.mkdir(exist_ok=True)
+        (folder / f"{name}.fbx").write_text("")
+    return str(tmp_path)
+
+
+def test_contains_lookup_matches_linear_scan(load_module, tmp_path):
+    file_index = load_module('FileIndex')
+    rng = random.Random(7)
+    names = sorted({"".join(rng.choice("abcxyz_") for _ in range(rng.randint(2, 12)))
+                    for _ in range(300)})
+    index = file_index.FileNameIndex(make_directory(tmp_path, names), ".fbx")
+
+    queries = ["a", "ab", "abc", "x_y", "zzzz", "c_a", "ABC", " xyz "] + names[:20]
+    for query in queries:
+        key = file_index.normalize_name(query)
+        expected = sorted(path for name in index.names if key in name for path in index.entries[name])
+        assert sorted(index.lookup(query, file_index.MATCH_CONTAINS)) == expected, query
+
+
+def test_exact_and_prefix_lookup(load_module, tmp_path):
+    file_index = load_module('FileIndex')
+    index = file_index.FileNameIndex(make_directory(tmp_path, ["Hero_Body", "hero_head", "Villain"]), ".fbx")
+
+    assert len(index.lookup("HERO_BODY", file_index.MATCH_EXACT)) == 1
+    assert len(index.lookup("hero", file_index.MATCH_PREFIX)) == 2
+    paths, missing = index.lookup_many(["hero", "nobody"], file_index.MATCH_CONTAINS)
+    assert len(paths) == 2 and missing == ["nobody"]
@@ -0,0 +1,45 @@
+import types
+
+
+def prop(identifier, prop_type):
+    return types.SimpleNamespace(identifier=identifier, type=prop_type)
+
+
+# 节点基类的界面属性
+NODE_BASE_PROPERTIES = [prop('name', 'STRING'), prop('location', 'FLOAT'), prop('select', 'BOOLEAN'),
+                        prop('mute', 'BOOLEAN')]
+
+
+class FakeNode:
+    bl_rna = types.SimpleNamespace(properties=NODE_BASE_PROPERTIES + [
+        prop('operation', 'ENUM'), prop('use_clamp', 'BOOLEAN')])
+
+    def __init__(self, operation, location=(0.0, 0.0)):
+        self.name = "Math"
+        self.bl_idname = "ShaderNodeMath"
+        self.type = 'MATH'
+        self.location = location
+        self.select = False
+        self.mute = False
+        self.operation = operation
+        self.use_clamp = False
+        self.inputs = []
+
+
+def make_material(node):
+    node_tree = types.SimpleNamespace(nodes=[node], links=[])
+    return types.SimpleNamespace(use_nodes=True, node_tree=node_tree)
+
+
+def test_signature_includes_node_settings(load_module, fake_bpy):
+    fake_bpy.types.Node = type('Node', (), {
+        'bl_rna': types.SimpleNamespace(properties=NODE_BASE_PROPERTIES)})
+    utils = load_module('utils')
+
+    add = utils.get_material_signature(make_material(FakeNode('ADD')))
+    multiply = utils.get_material_signature(make_material(FakeNode('MULTIPLY')))
+    moved = utils.get_material_signature(make_material(FakeNode('ADD', location=(300.0, 40.0))))
+
+    assert add != multiply
+    # 节点位置等界面状态不影响签名
+    assert add == moved
@@ -94,6 +94,182 @@ def group_objects_by_mesh_hash(mesh_objects):
     return [g for g in groups.values() if len(g) > 1]
 
 
+# ---------------------------------------------------------------------------
+# 材质工具
+# ---------------------------------------------------------------------------
+
+def _socket_value_repr(value):
+    """把节点输入的默认值转换为稳定的字符串，浮点数保留6位小数。"""
+    try:
+        return repr(tuple(round(v, 6) for v in value))
+    except TypeError:
+        if isinstance(value, float):
+            return repr(round(value, 6))
+        return repr(value)
+
+
+# 计入签名的节点设置属性类型
+NODE_SETTING_PROPERTY_TYPES = {'BOOLEAN', 'INT', 'FLOAT', 'ENUM'}
+
+
+def _get_node_ui_properties():
+    """节点基类上的界面属性（位置、尺寸、选择和折叠状态等），不影响渲染结果。
+    静音（mute）会让节点直通输入，仍计入签名。"""
+    return {prop.identifier for prop in bpy.types.Node.bl_rna.properties} - {'mute'}
+
+
+def _node_settings_repr(node, ui_properties):
+    """节点自身设置（非输入接口）的文本表示：运算类型、混合模式、插值方式、颜色渐变等"""
+    parts = []
+    for prop in node.bl_rna.properties:
+        if prop.identifier in ui_properties or prop.type not in NODE_SETTING_PROPERTY_TYPES:
+            continue
+        value = getattr(node, prop.identifier, None)
+        if isinstance(value, set):
+            # 多选枚举返回集合，排序后才稳定
+            value = sorted(value)
+        parts.append(f"{prop.identifier}={_socket_value_repr(value)}")
+
+    color_ramp = getattr(node, 'color_ramp', None)
+    if color_ramp is not None:
+        parts.append(f"ramp={color_ramp.color_mode},{color_ramp.interpolation},{color_ramp.hue_interpolation}")
+        for element in color_ramp.elements:
+            parts.append(f"ramp_element={_socket_value_repr(element.position)},"
+                         f"{_socket_value_repr(element.color)}")
+
+    mapping = getattr(node, 'mapping', None)
+    if mapping is not None and hasattr(mapping, 'curves'):
+        # 曲线节点（RGB曲线、浮点曲线等）的控制点
+        for curve in mapping.curves:
+            parts.append("curve=" + ";".join(
+                f"{_socket_value_repr(point.location)},{point.handle_type}" for point in curve.points))
+
+    image = getattr(node, 'image', None)
+    if image is not None:
+        parts.append(f"colorspace={image.colorspace_settings.name},alpha_mode={image.alpha_mode}")
+    return "|".join(parts)
+
+
+def get_material_signature(material):
+    """获取材质的内容签名，用于判断材质是否相同或是否发生变化。
+
+    签名包含节点名称和类型、节点设置（运算类型、混合模式、颜色渐变、图像插值和色彩空间等）、
+    未连接输入的默认值、图像路径、节点组引用以及节点连接，不包含材质名称和节点的界面状态。不使用节点的材质比较基础颜色、金属度、粗糙度和混合模式。
+
+    Args:
+        material: bpy.types.Material | None
+
+    Returns:
+        str - MD5 哈希字符串
+    """
+    if material is None:
+        return "None"
+
+    parts = [f"use_nodes={material.use_nodes}"]
+    if not material.use_nodes or not material.node_tree:
+        parts.append(_socket_value_repr(material.diffuse_color))
+        parts.append(_socket_value_repr(material.metallic))
+        parts.append(_socket_value_repr(material.roughness))
+        parts.append(material.blend_method)
+    else:
+        node_tree = material.node_tree
+        ui_properties = _get_node_ui_properties()
+        for node in sorted(node_tree.nodes, key=lambda n: n.name):
+            parts.append(f"{node.name}:{node.bl_idname}")
+            parts.append(_node_settings_repr(node, ui_properties))
+            image = getattr(node, 'image', None)
+            if image is not None:
+                parts.append(f"image={image.filepath or image.name}")
+            if node.type == 'GROUP' and node.node_tree:
+                parts.append(f"group={node.node_tree.name}")
+            for socket in node.inputs:
+                if not socket.is_linked and hasattr(socket, 'default_value'):
+                    parts.append(f"{socket.identifier}={_socket_value_repr(socket.default_value)}")
+        parts.extend(sorted(
+            f"{link.from_node.name}.{link.from_socket.identifier}>{link.to_node.name}.{link.to_socket.identifier}"
+            for link in node_tree.links
+        ))
+
+    return hashlib.md5("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+def get_material_user_objects(materials):
+    """用 bpy.data.user_map 找出实际使用这些材质的物体（包括通过网格等数据使用的物体）。
+
+    Args:
+        materials: iterable[bpy.types.Material]
+
+    Returns:
+        set[bpy.types.Object]
+    """
+    material_users = bpy.data.user_map(subset=list(materials))
+    owners = set()
+    for users in material_users.values():
+        owners.update(users)
+
+    objects = {owner for owner in owners if isinstance(owner, bpy.types.Object)}
+    data_owners = [owner for owner in owners if not isinstance(owner, bpy.types.Object)]
+    if data_owners:
+        for users in bpy.data.user_map(subset=data_owners).values():
+            objects.update(user for user in users if isinstance(user, bpy.types.Object))
+    return objects
+
+
+def remap_material_slots(material_map, objects=None, use_user_map=False):
+    """按 {旧材质: 新材质} 映射一次遍历替换所有材质槽。
+
+    物体级链接（link='OBJECT'）的槽在物体上替换，数据级链接的槽在网格等数据上替换，
+    多个物体共享的数据只处理一次。
+
+    Args:
+        material_map: dict[bpy.types.Material, bpy.types.Material | None]
+        objects: iterable[bpy.types.Object] | None - 要处理的物体，None 时处理所有使用旧材质的物体
+        use_user_map: bool - objects 为 None 时用 bpy.data.user_map 只访问实际用户，否则遍历所有物体
+
+    Returns:
+        tuple[dict, set] - ({旧材质: 替换的槽数}, 受影响的物体名称集合)
+    """
+    material_map = {old: new for old, new in material_map.items()
+                    if old is not None and old != new}
+    slot_counts = {}
+    affected_objects = set()
+    if not material_map:
+        return slot_counts, affected_objects
+
+    if objects is None:
+        objects = get_material_user_objects(material_map) if use_user_map else bpy.data.objects
+
+    visited_data = set()
+    changed_data = set()
+    for obj in objects:
+        if not obj.material_slots:
+            continue
+        data = obj.data
+        data_key = data.as_pointer()
+        remap_data = data_key not in visited_data
+        visited_data.add(data_key)
+
+        object_changed = False
+        for index, slot in enumerate(obj.material_slots):
+            if slot.link == 'OBJECT':
+                old_material = slot.material
+                if old_material in material_map:
+                    slot.material = material_map[old_material]
+                    slot_counts[old_material] = slot_counts.get(old_material, 0) + 1
+                    object_changed = True
+            elif remap_data:
+                old_material = data.materials[index]
+                if old_material in material_map:
+                    data.materials[index] = material_map[old_material]
+                    slot_counts[old_material] = slot_counts.get(old_material, 0) + 1
+                    changed_data.add(data_key)
+
+        if object_changed or data_key in changed_data:
+            affected_objects.add(obj.name)
+
+    return slot_counts, affected_objects
+
+
 # ---------------------------------------------------------------------------
 # 选择与过滤工具
 # ---------------------------------------------------------------------------